@@ -1,13 +1,21 @@
+import contextlib
 import copy
+import functools
 import os
+import signal
+import tempfile
+import threading
+import time
 
 import flask
 from flask import jsonify, request
 from flask_cors import CORS
 
-from chowlk.transformations import transform_ontology
-from chowlk.utils import read_drawio_xml
+from chowlk.utils import DiagramLimits, DiagramTooComplex, DiagramTooLarge
+from compression import compress_response
 from config import config
+from jobs import DONE, FAILED, Jobs, create_job_store
+from workers import ConversionPool, PoolFull
 
 config_name = os.getenv("APP_MODE", "development")
 
@@ -15,32 +23,339 @@ app = flask.Flask(__name__)
 app.config.from_object(config[config_name])
 CORS(app)
 
+pool = ConversionPool(
+    app.config["CONVERSION_WORKERS"],
+    app.config["CONVERSION_QUEUE_SIZE"],
+    DiagramLimits(
+        inflated_bytes=app.config["MAX_INFLATED_BYTES"],
+        cells=app.config["MAX_CELLS"],
+        depth=app.config["MAX_DEPTH"],
+    ),
+    app.config["MEMORY_PROFILE_FOLDER"],
+)
+
+# rdflib formats in which the ontology can be requested and their media types
+MEDIA_TYPES = {
+    "turtle": "text/turtle",
+    "xml": "application/rdf+xml",
+    "nt": "application/n-triples",
+    "json-ld": "application/ld+json",
+}
+# Other names accepted in the format parameter
+FORMAT_ALIASES = {"ttl": "turtle", "rdf": "xml", "jsonld": "json-ld"}
+
+
+@functools.lru_cache(maxsize=None)
+def serializable(format):
+    """Whether the installed rdflib has a serializer for the format. Without
+    one (json-ld in rdflib 5 without the rdflib-jsonld plugin) the conversion
+    would fail and return the turtle of the diagram instead."""
+    import rdflib.plugin
+    from rdflib.serializer import Serializer
+
+    try:
+        rdflib.plugin.get(format, Serializer)
+    except rdflib.plugin.PluginException:
+        return False
+    return True
+
+
+if app.config["WARM_UP"]:
+    pool.start([format for format in MEDIA_TYPES if serializable(format)])
+if app.config["WORKER_CHECK_INTERVAL"] > 0:
+    pool.supervise(app.config["WORKER_CHECK_INTERVAL"])
+
+
+# Requests being answered. They are counted until their response is closed,
+# so the server is not stopped while a response is still being sent
+requests_finished = threading.Condition()
+requests_in_flight = 0
+
+
+def wait_for_requests(timeout=None):
+    """Wait until the responses of all the requests have been sent, or until
+    the timeout (in seconds) expires. Returns whether all of them were sent."""
+    with requests_finished:
+        return requests_finished.wait_for(
+            lambda: requests_in_flight == 0, timeout
+        )
+
+
+def drain(signum, frame):
+    # New conversions are rejected (and /readyz fails) at once, and the
+    # server is stopped (as with Ctrl+C) when the conversions in flight have
+    # finished and their responses have been sent
+    def stop():
+        deadline = time.time() + app.config["DRAIN_TIMEOUT"]
+        pool.drain(app.config["DRAIN_TIMEOUT"])
+        wait_for_requests(max(0, deadline - time.time()))
+        os.kill(os.getpid(), signal.SIGINT)
+
+    threading.Thread(target=stop, daemon=True).start()
+
+
+if app.config["DRAIN_TIMEOUT"] > 0:
+    signal.signal(signal.SIGTERM, drain)
+
+
+def clean_errors(errors):
+    # Eliminating keys that do not contain errors
+    new_errors = copy.copy(errors)
+    for key, error in errors.items():
+        if len(error) == 0:
+            del new_errors[key]
+
+    return new_errors
+
+
+def conversion_response(turtle_file_string, new_namespaces, errors):
+    return {
+        "ttl_data": turtle_file_string,
+        "errors": clean_errors(errors),
+        "new_namespaces": new_namespaces,
+    }
+
+
+def requested_format(default):
+    """Format of the ontology requested with the format parameter or, if there
+    is none, with the Accept header. When nothing else is accepted the default
+    is returned, and None means the json response of /api."""
+    if "format" in request.values:
+        format = request.values["format"]
+        return FORMAT_ALIASES.get(format, format)
+
+    media_types = list(MEDIA_TYPES.values())
+    if default is None:
+        media_types.insert(0, "application/json")
+    media_type = request.accept_mimetypes.best_match(media_types)
+    for format, format_media_type in MEDIA_TYPES.items():
+        if format_media_type == media_type:
+            return format
+
+    return default
+
+
+# Size (in bytes) of the pieces in which the ontology is streamed
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def stream_file(path):
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(STREAM_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+def remove_file(path):
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(path)
+
+
+def busy_response():
+    response = jsonify({"error": "The service is busy, try again later"})
+    response.headers["Retry-After"] = str(app.config["RETRY_AFTER"])
+    return response, 503
+
+
+jobs = Jobs(
+    pool,
+    create_job_store(app.config["JOB_STORE"], app.config["TEMPORAL_FOLDER"]),
+    conversion_response,
+    app.config["JOB_EXPIRATION"],
+)
+
+
+def ontology_response(format):
+    if format not in MEDIA_TYPES:
+        return jsonify({"error": "Unknown format: " + format}), 400
+    if not serializable(format):
+        message = "The format is not available in this server: " + format
+        return jsonify({"error": message}), 406
+
+    file = request.files["data"]
+
+    # The worker writes the ontology to a temporal file, which is streamed
+    # (and compressed as it is sent) and removed once the response is closed,
+    # so the server never holds the whole ontology in memory
+    descriptor, path = tempfile.mkstemp(prefix="chowlk-", suffix="." + format)
+    os.close(descriptor)
+    try:
+        result, wait = pool.run(file.read(), format, path)
+    except PoolFull:
+        remove_file(path)
+        return busy_response()
+    except:
+        remove_file(path)
+        raise
+    _, _, errors = result
+
+    # The ontology is sent as is instead of inside a json. Only the number
+    # of errors is sent, the errors themselves are returned by /api
+    new_errors = clean_errors(errors)
+
+    response = flask.Response(stream_file(path), mimetype=MEDIA_TYPES[format])
+    response.call_on_close(lambda: remove_file(path))
+    response.vary.add("Accept")
+    response.headers["X-Error-Count"] = str(
+        sum(
+            len(error) if isinstance(error, list) else 1
+            for error in new_errors.values()
+        )
+    )
+    response.headers["X-Queue-Wait"] = f"{wait:.3f}"
+    response.headers["X-Queue-Depth"] = str(pool.queue_depth())
+    return response
+
 
 @app.route("/api", methods=["GET", "POST"])
 def api():
     if request.method == "POST":
+        # The ontology is returned in the json unless another format is asked
+        format = requested_format(None)
+        if format is not None:
+            return ontology_response(format)
+
         file = request.files["data"]
 
-        # Reading and transforming the diagram
-        root = read_drawio_xml(file)
-        (
-            turtle_file_string,
-            xml_file_string,
-            new_namespaces,
-            errors,
-        ) = transform_ontology(root)
-
-        # Eliminating keys that do not contain errors
-        new_errors = copy.copy(errors)
-        for key, error in errors.items():
-            if len(error) == 0:
-                del new_errors[key]
-
-        return {
-            "ttl_data": turtle_file_string,
-            "errors": new_errors,
-            "new_namespaces": new_namespaces,
-        }
+        # Reading and transforming the diagram in a worker process
+        try:
+            result, wait = pool.run(file.read())
+        except PoolFull:
+            return busy_response()
+
+        response = jsonify(conversion_response(*result))
+        response.vary.add("Accept")
+        response.headers["X-Queue-Wait"] = f"{wait:.3f}"
+        response.headers["X-Queue-Depth"] = str(pool.queue_depth())
+        return response
+
+
+@app.route("/api/ontology", methods=["POST"])
+def api_ontology():
+    return ontology_response(requested_format("turtle"))
+
+
+@app.route("/api/queue", methods=["GET"])
+def api_queue():
+    return pool.stats()
+
+
+@app.route("/healthz", methods=["GET"])
+def healthz():
+    return {"status": "alive"}
+
+
+@app.route("/readyz", methods=["GET"])
+def readyz():
+    reasons = []
+    if pool.draining:
+        reasons.append("draining")
+    if pool.broken():
+        # A worker has died. The executor is replaced by the next conversion
+        # or by the supervisor of the pool, not by this probe
+        reasons.append("conversion workers broken")
+    max_queue_depth = app.config["READY_MAX_QUEUE_DEPTH"]
+    if max_queue_depth > 0 and pool.queue_depth() >= max_queue_depth:
+        reasons.append("queue depth over the limit")
+    if app.config["READY_MAX_MEMORY"] > 0:
+        memory = pool.memory()
+        if memory is not None and memory > app.config["READY_MAX_MEMORY"]:
+            reasons.append("memory over the limit")
+
+    if reasons:
+        return jsonify({"status": "not ready", "reasons": reasons}), 503
+    return {"status": "ready"}
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    return flask.Response(
+        pool.metrics.render(), mimetype="text/plain; version=0.0.4"
+    )
+
+
+@app.route("/api/jobs", methods=["POST"])
+def api_jobs():
+    file = request.files["data"]
+
+    try:
+        job = jobs.submit(file.read())
+    except PoolFull:
+        return busy_response()
+
+    response = jsonify({"job_id": job["id"], "status": job["status"]})
+    response.headers["Location"] = flask.url_for("api_job", job_id=job["id"])
+    return response, 202
+
+
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+def api_job(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "submitted": job["submitted"],
+        "finished": job["finished"],
+    }
+
+
+@app.route("/api/jobs/<job_id>/result", methods=["GET"])
+def api_job_result(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    elif job["status"] == DONE:
+        return job["result"]
+    elif job["status"] == FAILED:
+        return jsonify({"error": job["error"]}), job["error_status"]
+    else:
+        response = jsonify({"job_id": job["id"], "status": job["status"]})
+        response.headers["Retry-After"] = str(app.config["RETRY_AFTER"])
+        return response, 202
+
+
+@app.before_request
+def before_request():
+    global requests_in_flight
+    with requests_finished:
+        requests_in_flight += 1
+
+
+def finish_request():
+    global requests_in_flight
+    with requests_finished:
+        requests_in_flight -= 1
+        requests_finished.notify_all()
+
+
+@app.after_request
+def after_request(response):
+    response = compress_response(response, request.accept_encodings)
+    response.call_on_close(finish_request)
+    return response
+
+
+@app.errorhandler(413)
+def handle_413_error(e):
+    message = "The diagram is larger than {} bytes".format(
+        app.config["MAX_CONTENT_LENGTH"]
+    )
+    return jsonify({"error": message}), 413
+
+
+@app.errorhandler(DiagramTooLarge)
+def handle_diagram_too_large(e):
+    return jsonify({"error": str(e)}), 413
+
+
+@app.errorhandler(DiagramTooComplex)
+def handle_diagram_too_complex(e):
+    return jsonify({"error": str(e)}), 422
 
 
 @app.errorhandler(500)
@@ -0,0 +1,112 @@
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chowlk.utils import clean_html_tags, clean_uri, read_drawio_xml  # noqa
+
+
+def clean_uri_reference(uri):
+    # Implementation of clean_uri before the patterns were precompiled
+    uri = re.sub(r"\(([0-9][^)]+)\)", "", uri).strip()
+    uri = re.sub(r"\(([^)]+)\)", "", uri).strip()
+    uri = re.sub(r"\(all\)", "", uri).strip()
+    uri = re.sub(r"\(some\)", "", uri).strip()
+    uri = re.sub(r"\(∀\)", "", uri).strip()
+    uri = re.sub(r"\(∃\)", "", uri).strip()
+    uri = re.sub(r"\(F\)", "", uri).strip()
+    uri = re.sub(r"\(IF\)", "", uri).strip()
+    uri = re.sub(r"\(S\)", "", uri).strip()
+    uri = re.sub(r"\(T\)", "", uri).strip()
+
+    return uri
+
+
+def find_labels(diagram_paths):
+    # Relation labels are the values of the edges, attribute labels are
+    # each line of the rest of the shapes
+    relation_labels = []
+    attribute_labels = []
+    for diagram_path in diagram_paths:
+        for child in read_drawio_xml(diagram_path):
+            if "value" not in child.attrib:
+                continue
+            value = clean_html_tags(child.attrib["value"])
+            if "edge" in child.attrib:
+                relation_labels.append(value)
+            else:
+                attribute_labels.extend(value.split("|"))
+
+    return relation_labels, attribute_labels
+
+
+def run(labels, repeat):
+    for label in labels:
+        if clean_uri(label) != clean_uri_reference(label):
+            raise AssertionError("clean_uri differs for " + repr(label))
+
+    reference = min(
+        timeit.repeat(
+            lambda: [clean_uri_reference(label) for label in labels],
+            number=1,
+            repeat=repeat,
+        )
+    )
+    current = min(
+        timeit.repeat(
+            lambda: [clean_uri(label) for label in labels],
+            number=1,
+            repeat=repeat,
+        )
+    )
+
+    return reference, current
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Micro-benchmark of clean_uri over the labels of diagrams."
+    )
+    parser.add_argument(
+        "paths",
+        type=str,
+        nargs="+",
+        help="diagrams or folders of diagrams to take the labels from",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=20, help="number of timed repetitions"
+    )
+    args = parser.parse_args()
+
+    diagram_paths = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            diagram_paths.extend(
+                os.path.join(path, filename)
+                for filename in sorted(os.listdir(path))
+            )
+        else:
+            diagram_paths.append(path)
+
+    relation_labels, attribute_labels = find_labels(diagram_paths)
+
+    for kind, labels in [
+        ("relation", relation_labels),
+        ("attribute", attribute_labels),
+    ]:
+        reference, current = run(labels, args.repeat)
+        print(
+            "{} labels ({}): {:.2f} us -> {:.2f} us per label".format(
+                kind,
+                len(labels),
+                reference / len(labels) * 1e6,
+                current / len(labels) * 1e6,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
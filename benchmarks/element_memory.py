@@ -0,0 +1,105 @@
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chowlk.finding import Finder  # noqa: E402
+from chowlk.utils import read_drawio_xml  # noqa: E402
+
+
+def element_sizes(element):
+    """Size in bytes of an element record and of the equivalent dict."""
+    as_dict = dict(element.items())
+    return sys.getsizeof(element), sys.getsizeof(as_dict)
+
+
+def measure(diagram_paths):
+    sizes = {}
+    for diagram_path in diagram_paths:
+        finder = Finder(read_drawio_xml(diagram_path))
+        (
+            concepts,
+            attribute_blocks,
+            relations,
+            individuals,
+            ellipses,
+            hexagons,
+            _,
+            _,
+            rhombuses,
+            _,
+            anonimous_classes,
+        ) = finder.find_elements()
+        values = finder.find_attribute_values()
+
+        attributes = [
+            attribute
+            for attribute_block in attribute_blocks.values()
+            for attribute in attribute_block.attributes
+        ]
+        groups = {
+            "relation": relations.values(),
+            "concept": concepts.values(),
+            "attribute block": attribute_blocks.values(),
+            "attribute": attributes,
+            "individual": individuals.values(),
+            "value": values.values(),
+            "ellipse": ellipses.values(),
+            "hexagon": hexagons.values(),
+            "rhombus": rhombuses.values(),
+            "anonymous class": anonimous_classes.values(),
+        }
+        for kind, elements in groups.items():
+            count, record_bytes, dict_bytes = sizes.get(kind, (0, 0, 0))
+            for element in elements:
+                record_size, dict_size = element_sizes(element)
+                count += 1
+                record_bytes += record_size
+                dict_bytes += dict_size
+            sizes[kind] = (count, record_bytes, dict_bytes)
+
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure the memory used per element found in diagrams."
+    )
+    parser.add_argument(
+        "paths",
+        type=str,
+        nargs="+",
+        help="diagrams or folders of diagrams to measure",
+    )
+    args = parser.parse_args()
+
+    diagram_paths = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            diagram_paths.extend(
+                os.path.join(path, filename)
+                for filename in sorted(os.listdir(path))
+            )
+        else:
+            diagram_paths.append(path)
+
+    sizes = measure(diagram_paths)
+
+    print(
+        "{:<16}{:>8}{:>14}{:>14}".format(
+            "element", "count", "record bytes", "dict bytes"
+        )
+    )
+    for kind, (count, record_bytes, dict_bytes) in sizes.items():
+        if count == 0:
+            continue
+        print(
+            "{:<16}{:>8}{:>14.1f}{:>14.1f}".format(
+                kind, count, record_bytes / count, dict_bytes / count
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
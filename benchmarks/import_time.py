@@ -0,0 +1,78 @@
+import argparse
+import os
+import subprocess
+import sys
+
+REPOSITORY_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(module):
+    """Run `python -X importtime` on a module in a new interpreter. Returns
+    the self and cumulative microseconds of every module it imported."""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + module],
+        cwd=REPOSITORY_PATH,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+
+    times = {}
+    for line in process.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_time, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = (int(self_time), int(cumulative))
+
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure the time spent importing the chowlk modules."
+    )
+    parser.add_argument(
+        "modules",
+        type=str,
+        nargs="*",
+        default=["chowlk.converter", "app"],
+        help="modules to import",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="number of timed imports"
+    )
+    parser.add_argument(
+        "--top", type=int, default=10, help="number of slowest modules shown"
+    )
+    args = parser.parse_args()
+
+    for module in args.modules:
+        # The fastest run is kept, as it is the least disturbed by the rest
+        # of the machine
+        runs = [import_times(module) for _ in range(args.repeat)]
+        times = min(runs, key=lambda times: times[module][1])
+
+        print(
+            "{}: {:.1f} ms, {} modules".format(
+                module, times[module][1] / 1000, len(times)
+            )
+        )
+        for heavy in ["rdflib", "bs4", "flask"]:
+            if heavy in times:
+                print(
+                    "  {} imported: {:.1f} ms".format(
+                        heavy, times[heavy][1] / 1000
+                    )
+                )
+        slowest = sorted(times.items(), key=lambda item: -item[1][0])
+        for name, (self_time, cumulative) in slowest[: args.top]:
+            print(
+                "  {:<40}{:>10.1f} ms self{:>10.1f} ms cumulative".format(
+                    name, self_time / 1000, cumulative / 1000
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+import argparse
+import io
+import os
+import re
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic_diagram import diagram_counts, generate_diagram  # noqa: E402
+
+from chowlk.utils import (  # noqa: E402
+    BASE_PREFIX,
+    clean_html_tags,
+    clean_uri,
+    find_cardinality,
+    read_drawio_xml,
+    split_datatype,
+    split_qname,
+)
+
+REPOSITORY_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INPUTS_PATH = os.path.join(REPOSITORY_PATH, "unit-tests", "inputs")
+
+
+# The parsing of the labels as it was written in each find_* method of the
+# Finder, before split_qname, find_cardinality and split_datatype
+
+
+def legacy_split_qname(text, last=False):
+    text_split = text.split(":")
+    if len(text_split) > 1:
+        prefix = text_split[0].strip()
+        if prefix == "":
+            prefix = "cambiar_a_prefijo_vacio"
+        uri = text_split[-1 if last else 1].strip()
+    else:
+        prefix = "<cambiar_a_base"
+        uri = text_split[0].strip() + ">"
+    uri = re.sub(" ", "", uri)
+
+    return prefix, uri
+
+
+def legacy_find_cardinality(text):
+    max_min_card = re.findall(r"\((\S*[.][.]\S*)\)", text)
+    max_min_card = max_min_card[-1] if len(max_min_card) > 0 else None
+    if max_min_card is None:
+        return None, None
+    max_min_card = max_min_card.split("..")
+
+    return max_min_card[0], max_min_card[1]
+
+
+def legacy_split_datatype(text, base=False):
+    prefix_datatype = None
+    if not base:
+        if len(text.split(":")) > 2:
+            final_datatype = text.split(":")[-1].strip()
+            final_datatype = final_datatype[0].lower() + final_datatype[1:]
+            datatype = final_datatype
+            if len(text.split(":")) > 3:
+                prefix_datatype = text.split(":")[2].strip()
+                if prefix_datatype == "":
+                    prefix_datatype = "cambiar_a_prefijo_vacio"
+            else:
+                prefix_datatype = "xsd"
+        else:
+            datatype = None
+    else:
+        if len(text.split(":")) > 1:
+            final_datatype = text.split(":")[-1].strip()
+            final_datatype = final_datatype[0].lower() + final_datatype[1:]
+            datatype = final_datatype
+            if len(text.split(":")) > 2:
+                prefix_datatype = text.split(":")[1].strip()
+            else:
+                prefix_datatype = "xsd"
+        else:
+            datatype = None
+
+    return prefix_datatype, datatype
+
+
+def collect_labels(diagram_paths):
+    """Lines of the labels of every cell of the diagrams, like the Finder
+    reads them, with and without the restrictions in parentheses."""
+    labels = []
+    for diagram_path in diagram_paths:
+        for cell in read_drawio_xml(diagram_path):
+            value = cell.attrib.get("value")
+            if not value:
+                continue
+            for line in clean_html_tags(value).split("|"):
+                labels.append(line)
+                labels.append(clean_uri(line).split(">>")[-1].strip())
+
+    return labels
+
+
+def parsers():
+    """Pairs of the current and the legacy parser of each kind of text."""
+
+    def qname(text):
+        return split_qname(text)
+
+    def qname_last(text):
+        return split_qname(text, last=True)
+
+    def datatype(text):
+        base = split_qname(text)[0] == BASE_PREFIX
+        return split_datatype(text, base)
+
+    def legacy_qname_last(text):
+        return legacy_split_qname(text, last=True)
+
+    def legacy_datatype(text):
+        base = legacy_split_qname(text)[0] == "<cambiar_a_base"
+        return legacy_split_datatype(text, base)
+
+    return {
+        "prefix:uri": (qname, legacy_split_qname),
+        "prefix:uri (last colon)": (qname_last, legacy_qname_last),
+        "cardinality": (find_cardinality, legacy_find_cardinality),
+        "datatype": (datatype, legacy_datatype),
+    }
+
+
+def outcome(parse, text):
+    try:
+        return parse(text)
+    except IndexError:
+        return IndexError
+
+
+def clear_caches():
+    for function in (split_qname, find_cardinality, split_datatype):
+        function.cache_clear()
+
+
+def timed(parse, labels, repeat, cold):
+    best = None
+    for _ in range(repeat):
+        if cold:
+            clear_caches()
+        start = time.perf_counter()
+        for text in labels:
+            outcome(parse, text)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the parsing of the prefixes, uris, "
+        "cardinalities and datatypes of the labels with the code it replaced, "
+        "on the labels of the unit-tests inputs and a synthetic diagram."
+    )
+    parser.add_argument(
+        "--cells",
+        type=int,
+        default=10000,
+        help="approximate number of cells of the synthetic diagram",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="number of timed runs"
+    )
+    args = parser.parse_args()
+
+    diagram_paths = [
+        os.path.join(INPUTS_PATH, filename)
+        for filename in sorted(os.listdir(INPUTS_PATH))
+    ]
+    labels = collect_labels(diagram_paths)
+    diagram = generate_diagram(**diagram_counts(args.cells))
+    labels += collect_labels([io.BytesIO(diagram.to_xml().encode("utf-8"))])
+    print(f"{len(labels)} labels, {len(set(labels))} distinct\n")
+
+    print(
+        "{:<26}{:>12}{:>12}{:>12}".format(
+            "ms", "legacy", "cold cache", "cached"
+        )
+    )
+    different = 0
+    for name, (parse, legacy_parse) in parsers().items():
+        for text in labels:
+            if outcome(parse, text) != outcome(legacy_parse, text):
+                different += 1
+                print(f"Different {name} of {text!r}")
+        print(
+            "{:<26}{:>12.2f}{:>12.2f}{:>12.2f}".format(
+                name,
+                timed(legacy_parse, labels, args.repeat, False) * 1000,
+                timed(parse, labels, args.repeat, True) * 1000,
+                timed(parse, labels, args.repeat, False) * 1000,
+            )
+        )
+
+    if different:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
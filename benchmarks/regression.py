@@ -0,0 +1,277 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic_diagram import diagram_counts, generate_diagram  # noqa: E402
+
+from chowlk import stages  # noqa: E402
+from chowlk.transformations import transform_ontology  # noqa: E402
+from chowlk.utils import read_drawio_xml  # noqa: E402
+
+REPOSITORY_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INPUTS_PATH = os.path.join(REPOSITORY_PATH, "unit-tests", "inputs")
+
+# Sizes (in cells) of the synthetic diagrams measured
+SIZES = [100, 1000]
+
+# Differences smaller than this (in seconds) are noise, whatever the
+# tolerance, and stages faster than this in the baseline are not compared
+MIN_SECONDS = 0.005
+
+
+def convert(diagram_path, format):
+    transform_ontology([read_drawio_xml(diagram_path)], formats=(format,))
+
+
+def measure(diagram_paths, format="turtle", repeat=5):
+    """
+    Convert the diagrams `repeat` times. Returns the median time of the
+    whole run and of each stage (reading the diagram, each find_* method,
+    enrich_properties and the rest of the associations, each write_*
+    function, and the rdflib parse and serialization), and the peak memory
+    traced in one more run.
+    """
+    totals = []
+    runs = []
+    for _ in range(repeat):
+        profile = stages.StageTimes()
+        start = time.perf_counter()
+        with stages.recording(profile):
+            for diagram_path in diagram_paths:
+                convert(diagram_path, format)
+        totals.append(time.perf_counter() - start)
+        runs.append(profile.times)
+
+    # The memory of a conversion is released before the next one, so the
+    # peak of the run is the peak of the largest conversion
+    tracemalloc.start()
+    try:
+        for diagram_path in diagram_paths:
+            convert(diagram_path, format)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    names = list(runs[-1])
+    return {
+        "median_seconds": statistics.median(totals),
+        "peak_bytes": peak,
+        "stages": {
+            name: statistics.median(run.get(name, 0.0) for run in runs)
+            for name in names
+        },
+    }
+
+
+def write_cases(folder, sizes, compressed):
+    """Diagrams of each case: one synthetic diagram per size, and all the
+    inputs of the unit tests together."""
+    cases = {}
+    for size in sizes:
+        diagram = generate_diagram(**diagram_counts(size))
+        diagram_path = os.path.join(folder, f"{size}.xml")
+        with open(diagram_path, "w", encoding="utf-8") as f:
+            f.write(diagram.to_xml(compressed))
+        cases[f"synthetic {diagram.cells} cells"] = [diagram_path]
+
+    cases["unit-tests inputs"] = [
+        os.path.join(INPUTS_PATH, filename)
+        for filename in sorted(os.listdir(INPUTS_PATH))
+    ]
+
+    return cases
+
+
+def compare(baseline, results, tolerance, memory_tolerance):
+    """Lines of the comparison of the results with the baseline, and the
+    regressions found: slower runs or stages, or a higher peak memory."""
+    lines = [
+        "{:<44}{:>14}{:>14}{:>9}".format("", "baseline", "current", "change")
+    ]
+    regressions = []
+
+    def check(
+        case, name, base, current, unit, scale, tolerance, min_difference
+    ):
+        change = (current - base) / base if base else 0.0
+        regressed = change > tolerance and current - base > min_difference
+        lines.append(
+            "{:<44}{:>10.1f} {:<3}{:>10.1f} {:<3}{:>+8.1f}%{}".format(
+                "    " + name[:39],
+                base * scale,
+                unit,
+                current * scale,
+                unit,
+                change * 100,
+                "  <- regression" if regressed else "",
+            )
+        )
+        if regressed:
+            regressions.append(
+                "{}, {}: {:.1f} {} -> {:.1f} {} ({:+.1f}%)".format(
+                    case,
+                    name,
+                    base * scale,
+                    unit,
+                    current * scale,
+                    unit,
+                    change * 100,
+                )
+            )
+
+    for case, result in results.items():
+        if case not in baseline:
+            lines.append(case + ": not in the baseline")
+            continue
+        base = baseline[case]
+        lines.append(case)
+        check(
+            case,
+            "total",
+            base["median_seconds"],
+            result["median_seconds"],
+            "ms",
+            1000,
+            tolerance,
+            MIN_SECONDS,
+        )
+        check(
+            case,
+            "peak memory",
+            base["peak_bytes"],
+            result["peak_bytes"],
+            "KiB",
+            1 / 1024,
+            memory_tolerance,
+            0,
+        )
+        for name, seconds in result["stages"].items():
+            if base["stages"].get(name, 0.0) < MIN_SECONDS:
+                continue
+            check(
+                case,
+                name,
+                base["stages"][name],
+                seconds,
+                "ms",
+                1000,
+                tolerance,
+                MIN_SECONDS,
+            )
+
+    return lines, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure the conversion of synthetic diagrams and of the "
+        "unit-tests inputs, and save the measures as a baseline or compare "
+        "them with one."
+    )
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument(
+        "--save", type=str, help="save the measures as a baseline here"
+    )
+    group.add_argument(
+        "--baseline",
+        type=str,
+        help="compare the measures with this baseline, failing on slowdowns",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="allowed slowdown of the runs and stages (0.2 is 20%%)",
+    )
+    parser.add_argument(
+        "--memory-tolerance",
+        type=float,
+        default=0.1,
+        help="allowed increase of the peak memory (0.1 is 10%%)",
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="*",
+        default=SIZES,
+        help="approximate number of cells of each synthetic diagram",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="number of timed runs"
+    )
+    parser.add_argument(
+        "--compressed",
+        action="store_true",
+        help="deflate the synthetic diagrams like draw.io does",
+    )
+    parser.add_argument(
+        "--format", type=str, default="turtle", help="rdflib output format"
+    )
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline["format"] != args.format:
+            parser.error(
+                "The baseline was measured serializing " + baseline["format"]
+            )
+        if baseline["machine"] != platform.node():
+            print(
+                "Warning: the baseline was measured in {}, the times are "
+                "only comparable in the same machine".format(
+                    baseline["machine"]
+                ),
+                file=sys.stderr,
+            )
+
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        cases = write_cases(folder, args.sizes, args.compressed)
+        # A first conversion imports rdflib and bs4, which is not timed
+        convert(cases["unit-tests inputs"][0], args.format)
+        for case, diagram_paths in cases.items():
+            results[case] = measure(diagram_paths, args.format, args.repeat)
+            print(
+                "{}: {:.3f} s".format(case, results[case]["median_seconds"]),
+                file=sys.stderr,
+            )
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(
+                {
+                    "machine": platform.node(),
+                    "python": platform.python_version(),
+                    "format": args.format,
+                    "cases": results,
+                },
+                f,
+                indent=2,
+            )
+        print("Baseline saved in " + args.save)
+        return
+
+    lines, regressions = compare(
+        baseline["cases"], results, args.tolerance, args.memory_tolerance
+    )
+    print("\n".join(lines))
+    if regressions:
+        print(f"\n{len(regressions)} regressions:")
+        for regression in regressions:
+            print("  " + regression)
+        sys.exit(1)
+    print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
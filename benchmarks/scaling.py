@@ -0,0 +1,217 @@
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic_diagram import diagram_counts, generate_diagram  # noqa: E402
+
+from chowlk import stages  # noqa: E402
+from chowlk.transformations import transform_ontology  # noqa: E402
+from chowlk.utils import read_drawio_xml  # noqa: E402
+
+SIZES = [10, 30, 100, 300, 1000, 3000, 10000]
+
+# Stages whose time grows faster than the cells to this power between the
+# two largest sizes are reported, as long as they are not negligible
+GROWTH_THRESHOLD = 1.5
+NEGLIGIBLE_SECONDS = 0.005
+
+
+def convert(diagram_path, format):
+    transform_ontology([read_drawio_xml(diagram_path)], formats=(format,))
+
+
+def measure(diagram_path, format="turtle", repeat=1, memory=True):
+    """
+    Convert a diagram `repeat` times and keep the stages of the fastest
+    conversion. With memory, the diagram is converted once more tracing the
+    allocations, which is slower, so that the times are not distorted.
+    """
+    best = None
+    for _ in range(repeat):
+        profile = stages.StageProfile()
+        start = time.perf_counter()
+        with stages.recording(profile):
+            convert(diagram_path, format)
+        seconds = time.perf_counter() - start
+        if best is None or seconds < best["seconds"]:
+            best = {"seconds": seconds, "stages": profile.stages}
+
+    best["peak_bytes"] = None
+    if memory:
+        profile = stages.StageProfile()
+        tracemalloc.start()
+        try:
+            with stages.recording(profile):
+                convert(diagram_path, format)
+            _, best["peak_bytes"] = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        for name, stage in profile.stages.items():
+            best["stages"][name]["allocated"] = stage["allocated"]
+            best["stages"][name]["peak"] = stage["peak"]
+
+    return best
+
+
+def growth(results):
+    """Exponent of the growth of each stage between the two largest sizes:
+    around 1 for a linear stage, 2 for a quadratic one."""
+    if len(results) < 2:
+        return {}
+    small, large = results[-2], results[-1]
+    exponents = {}
+    for name, stage in large["stages"].items():
+        if name not in small["stages"] or stage["wall"] < NEGLIGIBLE_SECONDS:
+            continue
+        ratio = stage["wall"] / max(small["stages"][name]["wall"], 1e-9)
+        exponents[name] = math.log(ratio) / math.log(
+            large["cells"] / small["cells"]
+        )
+
+    return exponents
+
+
+def print_report(results):
+    print("{:>8}{:>12}{:>12}".format("cells", "seconds", "peak MiB"))
+    for result in results:
+        peak = result["peak_bytes"]
+        print(
+            "{:>8}{:>12.3f}{:>12}".format(
+                result["cells"],
+                result["seconds"],
+                "-" if peak is None else f"{peak / 2**20:.1f}",
+            )
+        )
+
+    # Time in milliseconds of each stage per size, in the order they run
+    names = list(results[-1]["stages"])
+    print(
+        "\n{:<40}".format("stage ms")
+        + "".join("{:>10}".format(result["cells"]) for result in results)
+    )
+    for name in names:
+        print(
+            f"{name:<40}"
+            + "".join(
+                "{:>10.1f}".format(result["stages"][name]["wall"] * 1000)
+                if name in result["stages"]
+                else "{:>10}".format("-")
+                for result in results
+            )
+        )
+
+    exponents = growth(results)
+    superlinear = [
+        (name, exponent)
+        for name, exponent in sorted(exponents.items(), key=lambda x: -x[1])
+        if exponent > GROWTH_THRESHOLD
+    ]
+    if superlinear:
+        print(
+            "\nStages growing faster than n^{} from {} to {} cells:".format(
+                GROWTH_THRESHOLD, results[-2]["cells"], results[-1]["cells"]
+            )
+        )
+        for name, exponent in superlinear:
+            print(f"  {name:<38}n^{exponent:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure the conversion of synthetic diagrams of "
+        "increasing size, stage by stage."
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=SIZES,
+        help="approximate number of cells of each diagram",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="number of timed conversions"
+    )
+    parser.add_argument(
+        "--max-seconds",
+        type=float,
+        default=120,
+        help="stop the sweep after a conversion slower than this",
+    )
+    parser.add_argument(
+        "--compressed",
+        action="store_true",
+        help="deflate the diagrams like draw.io does",
+    )
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="do not trace the memory allocated in each stage",
+    )
+    parser.add_argument(
+        "--format", type=str, default="turtle", help="rdflib output format"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument(
+        "--json", type=str, help="also save the results in this json file"
+    )
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as folder:
+        # A first conversion imports rdflib and bs4, which is not timed
+        warm_up_path = os.path.join(folder, "warm_up.xml")
+        with open(warm_up_path, "w", encoding="utf-8") as f:
+            f.write(generate_diagram(**diagram_counts(10)).to_xml())
+        convert(warm_up_path, args.format)
+
+        for size in sorted(args.sizes):
+            counts = diagram_counts(size)
+            diagram = generate_diagram(seed=args.seed, **counts)
+            diagram_path = os.path.join(folder, f"{size}.xml")
+            with open(diagram_path, "w", encoding="utf-8") as f:
+                f.write(diagram.to_xml(args.compressed))
+
+            result = measure(
+                diagram_path,
+                args.format,
+                # The largest diagrams are only timed once
+                args.repeat if size <= 1000 else 1,
+                not args.no_memory,
+            )
+            result["cells"] = diagram.cells
+            result["elements"] = counts
+            results.append(result)
+            print(
+                "{} cells: {:.3f} s".format(diagram.cells, result["seconds"]),
+                file=sys.stderr,
+            )
+
+            if result["seconds"] > args.max_seconds:
+                print(
+                    "Stopping, the conversion took more than {} s".format(
+                        args.max_seconds
+                    ),
+                    file=sys.stderr,
+                )
+                break
+
+    print_report(results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(
+                {"compressed": args.compressed, "results": results},
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
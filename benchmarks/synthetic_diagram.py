@@ -0,0 +1,375 @@
+import argparse
+import base64
+import random
+import xml.etree.ElementTree as ET
+import zlib
+from urllib.parse import quote
+
+NAMESPACE = "https://w3id.org/synthetic#"
+
+CLASS_STYLE = "rounded=0;whiteSpace=wrap;html=1;snapToPoint=1;"
+INDIVIDUAL_STYLE = "rounded=0;whiteSpace=wrap;html=1;snapToPoint=1;"
+NOTE_STYLE = "shape=note;whiteSpace=wrap;html=1;backgroundOutline=1;"
+RHOMBUS_STYLE = "rhombus;whiteSpace=wrap;html=1;"
+ELLIPSE_STYLE = "ellipse;whiteSpace=wrap;html=1;aspect=fixed;fontSize=17;"
+HEXAGON_STYLE = (
+    "shape=hexagon;perimeter=hexagonPerimeter2;whiteSpace=wrap;html=1;"
+    "fixedSize=1;"
+)
+RELATION_STYLE = "endArrow=classic;html=1;endSize=8;arcSize=0;"
+DASHED_STYLE = "endArrow=open;html=1;endFill=0;dashed=1;endSize=8;"
+SUBCLASS_STYLE = "endArrow=block;html=1;endFill=0;endSize=8;"
+LABEL_STYLE = (
+    "text;html=1;align=center;verticalAlign=middle;resizable=0;points=[];"
+    "labelBackgroundColor=#ffffff;"
+)
+
+# Labels of the object properties and the attributes, to cover the
+# restrictions, cardinalities and characteristics of the notation
+RELATION_LABELS = [
+    "ns:{}",
+    "(some) ns:{}",
+    "(all) ns:{} (1..N)",
+    "(∃) ns:{}",
+    "ns:{} (0..1)",
+    "(F) ns:{}",
+    "&lt;&lt;owl:allValuesFrom&gt;&gt;<br>ns:{}",
+]
+ATTRIBUTE_LABELS = [
+    "ns:{}: xsd:string",
+    "(some) ns:{}: xsd:integer",
+    "ns:{} (1..N): xsd:dateTime",
+    "(F) ns:{}: xsd:boolean",
+    "(all) ns:{}: xsd:float",
+    "ns:{} (0..1)",
+]
+RHOMBUS_TYPES = [
+    "owl:FunctionalProperty",
+    "owl:TransitiveProperty",
+    "owl:SymmetricProperty",
+    "owl:InverseFunctionalProperty",
+]
+
+# Elements generated per 10 classes by diagram_counts, which make around 60
+# cells (an object property is an edge and, for some, a label)
+ELEMENTS_MIX = {
+    "classes": 10,
+    "attribute_blocks": 6,
+    "object_properties": 12,
+    "rhombuses": 2,
+    "individuals": 4,
+    "unions": 1,
+    "intersections": 1,
+    "one_ofs": 1,
+}
+
+# Distance between the shapes of the layout grid
+COLUMN_WIDTH = 260
+ROW_HEIGHT = 160
+
+
+class SyntheticDiagram:
+    """Cells of a draw.io diagram in the Chowlk notation, added one by one."""
+
+    def __init__(self):
+        self.root = ET.Element("root")
+        ET.SubElement(self.root, "mxCell", id="0")
+        ET.SubElement(self.root, "mxCell", id="1", parent="0")
+        self.next_id = 2
+        self.cells = 0
+        self.centers = {}
+
+    def new_id(self):
+        id = f"synthetic-{self.next_id}"
+        self.next_id += 1
+        self.cells += 1
+        return id
+
+    def add_vertex(self, value, style, x, y, width, height):
+        id = self.new_id()
+        cell = ET.SubElement(
+            self.root,
+            "mxCell",
+            id=id,
+            value=value,
+            style=style,
+            parent="1",
+            vertex="1",
+        )
+        ET.SubElement(
+            cell,
+            "mxGeometry",
+            {"x": str(x), "y": str(y), "width": str(width)},
+            height=str(height),
+            **{"as": "geometry"},
+        )
+        self.centers[id] = (x + width / 2, y + height / 2)
+        return id
+
+    def add_edge(self, source, target, style, label=None, label_cell=False):
+        # Like in draw.io, the label of an edge is either its value or the
+        # value of a text cell whose parent is the edge
+        id = self.new_id()
+        attributes = {"id": id, "style": style, "parent": "1", "edge": "1"}
+        attributes["value"] = label if label and not label_cell else ""
+        attributes["source"] = source
+        attributes["target"] = target
+        cell = ET.SubElement(self.root, "mxCell", attributes)
+        geometry = ET.SubElement(
+            cell, "mxGeometry", relative="1", **{"as": "geometry"}
+        )
+        for point, end in [("sourcePoint", source), ("targetPoint", target)]:
+            x, y = self.centers[end]
+            ET.SubElement(
+                geometry, "mxPoint", x=str(x), y=str(y), **{"as": point}
+            )
+
+        if label and label_cell:
+            text = ET.SubElement(
+                self.root,
+                "mxCell",
+                id=self.new_id(),
+                value=label,
+                style=LABEL_STYLE,
+                parent=id,
+                vertex="1",
+                connectable="0",
+            )
+            geometry = ET.SubElement(
+                text,
+                "mxGeometry",
+                x="-0.2",
+                relative="1",
+                **{"as": "geometry"},
+            )
+            ET.SubElement(geometry, "mxPoint", **{"as": "offset"})
+
+        return id
+
+    def graph_model(self):
+        model = ET.Element(
+            "mxGraphModel", dx="1000", dy="1000", grid="1", gridSize="10"
+        )
+        model.append(self.root)
+        return model
+
+    def to_xml(self, compressed=False):
+        """The diagram as a draw.io file. Compressed files keep the graph
+        model deflated and encoded in base64, like draw.io does by default."""
+        mxfile = ET.Element("mxfile", host="synthetic")
+        diagram = ET.SubElement(
+            mxfile, "diagram", id="synthetic", name="Page-1"
+        )
+        if compressed:
+            model = ET.tostring(self.graph_model(), encoding="unicode")
+            compressor = zlib.compressobj(9, zlib.DEFLATED, -15)
+            data = compressor.compress(quote(model, safe="~()*!.'").encode())
+            data += compressor.flush()
+            diagram.text = base64.b64encode(data).decode("ascii")
+        else:
+            diagram.append(self.graph_model())
+
+        return ET.tostring(mxfile, encoding="unicode")
+
+
+def generate_diagram(
+    classes=10,
+    attribute_blocks=0,
+    object_properties=0,
+    rhombuses=0,
+    individuals=0,
+    unions=0,
+    intersections=0,
+    one_ofs=0,
+    seed=0,
+):
+    """
+    Generate a diagram with the given number of each element. The classes
+    are laid out in a grid, each attribute block under its class, and the
+    object properties, individuals and ellipses connect random classes. The
+    same arguments and seed always give the same diagram.
+    """
+    if classes < 2 and (object_properties or unions or intersections):
+        raise ValueError("At least two classes are needed to connect them")
+
+    rng = random.Random(seed)
+    diagram = SyntheticDiagram()
+    diagram.add_vertex(
+        "<b>base:</b> {0}<br><b>ns:</b> {0}".format(NAMESPACE),
+        NOTE_STYLE,
+        -400,
+        -200,
+        300,
+        60,
+    )
+
+    columns = max(1, int(classes**0.5))
+    class_ids = []
+    for i in range(classes):
+        x = (i % columns) * COLUMN_WIDTH
+        y = (i // columns) * ROW_HEIGHT
+        class_ids.append(
+            diagram.add_vertex(f"ns:Class{i}", CLASS_STYLE, x, y, 160, 30)
+        )
+
+        # The attribute block is right under its class
+        if i < attribute_blocks:
+            size = rng.randint(1, 3)
+            labels = [
+                rng.choice(ATTRIBUTE_LABELS).format(f"attribute{i}x{j}")
+                for j in range(size)
+            ]
+            diagram.add_vertex(
+                "<br>".join(labels), CLASS_STYLE, x, y + 30, 160, 20 * size
+            )
+
+    property_names = []
+    for i in range(object_properties):
+        name = f"property{i}"
+        property_names.append(name)
+        source, target = rng.sample(class_ids, 2)
+        diagram.add_edge(
+            source,
+            target,
+            RELATION_STYLE,
+            rng.choice(RELATION_LABELS).format(name),
+            label_cell=i % 2 == 1,
+        )
+
+    # The rest of the shapes are laid out in rows under the classes
+    rows = (classes + columns - 1) // columns
+    next_position = [0]
+
+    def position():
+        i = next_position[0]
+        next_position[0] += 1
+        return (i % columns) * COLUMN_WIDTH, (rows + i // columns) * ROW_HEIGHT
+
+    for i in range(rhombuses):
+        # They declare the characteristics of the object properties of the
+        # diagram, and new object properties once all of them have one
+        if i < len(property_names):
+            name = property_names[i]
+        else:
+            name = f"rhombusProperty{i}"
+        types = ["owl:ObjectProperty", RHOMBUS_TYPES[i % len(RHOMBUS_TYPES)]]
+        value = "".join(f"<div>&lt;&lt;{type}&gt;&gt;</div>" for type in types)
+        x, y = position()
+        diagram.add_vertex(
+            value + f"<div>ns:{name}</div>",
+            RHOMBUS_STYLE,
+            x,
+            y,
+            160,
+            80,
+        )
+
+    for i in range(individuals):
+        x, y = position()
+        individual = diagram.add_vertex(
+            f"<u>ns:individual{i}</u>", INDIVIDUAL_STYLE, x, y, 160, 30
+        )
+        diagram.add_edge(
+            individual,
+            rng.choice(class_ids),
+            DASHED_STYLE,
+            "&lt;&lt;rdf:type&gt;&gt;",
+            label_cell=True,
+        )
+
+    for symbol, count in [("⨆", unions), ("⨅", intersections)]:
+        for i in range(count):
+            x, y = position()
+            ellipse = diagram.add_vertex(symbol, ELLIPSE_STYLE, x, y, 30, 30)
+            owner, *members = rng.sample(class_ids, 3 if classes > 2 else 2)
+            diagram.add_edge(owner, ellipse, SUBCLASS_STYLE)
+            for member in members:
+                diagram.add_edge(ellipse, member, DASHED_STYLE)
+
+    for i in range(one_ofs):
+        # Each enumeration has its own two individuals
+        x, y = position()
+        hexagon = diagram.add_vertex(
+            "&lt;&lt;owl:oneOf&gt;&gt;", HEXAGON_STYLE, x, y, 130, 30
+        )
+        diagram.add_edge(rng.choice(class_ids), hexagon, SUBCLASS_STYLE)
+        for j in range(2):
+            x, y = position()
+            individual = diagram.add_vertex(
+                f"<u>ns:member{i}x{j}</u>",
+                INDIVIDUAL_STYLE,
+                x,
+                y,
+                160,
+                30,
+            )
+            diagram.add_edge(hexagon, individual, DASHED_STYLE)
+
+    return diagram
+
+
+def diagram_counts(cells):
+    """Number of each element (the arguments of generate_diagram) for a
+    diagram of around the given number of cells, following ELEMENTS_MIX."""
+    mix_cells = generate_diagram(**ELEMENTS_MIX).cells
+    scale = cells / mix_cells
+    counts = {
+        element: int(round(count * scale))
+        for element, count in ELEMENTS_MIX.items()
+    }
+    counts["classes"] = max(2, counts["classes"])
+    counts["attribute_blocks"] = min(
+        counts["attribute_blocks"], counts["classes"]
+    )
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic diagram in the Chowlk notation."
+    )
+    parser.add_argument(
+        "output_path", type=str, help="where the diagram is written"
+    )
+    parser.add_argument(
+        "--cells",
+        type=int,
+        default=100,
+        help="approximate number of cells, unless the elements are given",
+    )
+    for element in ELEMENTS_MIX:
+        parser.add_argument(
+            "--" + element.replace("_", "-"),
+            type=int,
+            help="number of " + element.replace("_", " "),
+        )
+    parser.add_argument(
+        "--compressed",
+        action="store_true",
+        help="deflate the diagram like draw.io does",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    args = parser.parse_args()
+
+    counts = diagram_counts(args.cells)
+    for element in ELEMENTS_MIX:
+        if getattr(args, element) is not None:
+            counts[element] = getattr(args, element)
+
+    diagram = generate_diagram(seed=args.seed, **counts)
+    with open(args.output_path, "w", encoding="utf-8") as f:
+        f.write(diagram.to_xml(args.compressed))
+
+    print(
+        "{} cells: {}".format(
+            diagram.cells,
+            ", ".join(
+                "{} {}".format(count, element.replace("_", " "))
+                for element, count in counts.items()
+            ),
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,28 @@
 import tempfile
 
+from chowlk.stages import staged
+
 
 # Function to find the relations of an anonymous class (for example a restriction)
+@staged
 def find_relations_anonymous_classes(relations, anonimous_classes):
     # For each anonymous class we want to check if there is a relation whose source
     # is such anonymous class
     for anonimous_class_id, anonimous_class in anonimous_classes.items():
         for relation_id, relation in relations.items():
-            if relation["source"] == anonimous_class_id:
-                anonimous_class["relations"].append(relation_id)
+            if relation.source == anonimous_class_id:
+                anonimous_class.relations.append(relation_id)
 
     return anonimous_classes
 
 
 def one_of(complement, individuals, errors):
-    ids = complement["group"]
+    ids = complement.group
     text = "\n\towl:oneOf (\n"
     for id in ids:
         try:
             individuals_involved = (
-                individuals[id]["prefix"] + ":" + individuals[id]["uri"]
+                individuals[id].prefix + ":" + individuals[id].uri
             )
             text = text + "\t\t\t\t" + individuals_involved + "\n"
         except:
@@ -42,15 +45,13 @@ def union_of(
     relations,
     anonimous_classes,
 ):
-    ids = complement["group"]
+    ids = complement.group
     text = "\n\towl:unionOf ( \n"
 
     for id in ids:
         if id in concepts:
             # target is a class
-            concepts_involved = (
-                concepts[id]["prefix"] + ":" + concepts[id]["uri"]
-            )
+            concepts_involved = concepts[id].prefix + ":" + concepts[id].uri
             text = text + "\t\t\t\t" + concepts_involved + "\n"
 
         elif id in hexagons:
@@ -63,7 +64,7 @@ def union_of(
         elif id in anonymous_concepts:
             complement = anonymous_concepts[id]
 
-            if complement["type"] == "owl:unionOf":
+            if complement.type == "owl:unionOf":
                 # target is an anonymous class with owl:unionOf statement
                 text = text + "\n\t[ rdf:type owl:Class ;"
                 text = text + union_of(
@@ -79,7 +80,7 @@ def union_of(
                 text = text + "\t\t\t\t ]"
                 text = "\t\t\t\t" + text + "\n"
 
-            elif complement["type"] == "owl:intersectionOf":
+            elif complement.type == "owl:intersectionOf":
                 # target is an anonymous class with owl:intersectionOf statement
                 text = text + "\n\t[ rdf:type owl:Class ;"
                 text = text + intersection_of(
@@ -97,9 +98,9 @@ def union_of(
 
         elif id in anonimous_classes:
             # the target is an anonymous class with owl:complementOf statement o a property restriction
-            relation_id = anonimous_classes[id]["relations"][0]
+            relation_id = anonimous_classes[id].relations[0]
             complement = relations[relation_id]
-            if complement["type"] == "owl:complementOf":
+            if complement.type == "owl:complementOf":
                 # target is an anonymous class with owl:complementOf statement
                 text = text + "\n\t[ rdf:type owl:Class ;"
                 text = text + complement_of(
@@ -115,7 +116,7 @@ def union_of(
                 text = text + "\t\t\t\t ]"
                 text = "\t\t\t\t" + text + "\n"
 
-            elif complement["type"] == "owl:ObjectProperty":
+            elif complement.type == "owl:ObjectProperty":
                 text = text + restrictions(
                     complement,
                     concepts,
@@ -149,16 +150,16 @@ def complement_of(
     relations,
     anonimous_classes,
 ):
-    target_id = complement["target"]
+    target_id = complement.target
     text = "\n\towl:complementOf \n"
     if target_id in concepts:
         # target is a class
         text = (
             text
             + "\t\t\t\t"
-            + concepts[target_id]["prefix"]
+            + concepts[target_id].prefix
             + ":"
-            + concepts[target_id]["uri"]
+            + concepts[target_id].uri
             + "\n"
         )
 
@@ -172,7 +173,7 @@ def complement_of(
     elif target_id in anonymous_concepts:
         complement = anonymous_concepts[target_id]
 
-        if complement["type"] == "owl:unionOf":
+        if complement.type == "owl:unionOf":
             # target is an anonymous class with owl:unionOf statement
             text = text + "\n\t[ rdf:type owl:Class ;"
             text = text + union_of(
@@ -188,7 +189,7 @@ def complement_of(
             text = text + "\t\t\t\t ]"
             text = "\t\t\t\t" + text + "\n"
 
-        elif complement["type"] == "owl:intersectionOf":
+        elif complement.type == "owl:intersectionOf":
             # target is an anonymous class with owl:intersectionOf statement
             text = text + "\n\t[ rdf:type owl:Class ;"
             text = text + intersection_of(
@@ -205,11 +206,11 @@ def complement_of(
             text = "\t\t\t\t" + text + "\n"
 
     elif target_id in anonimous_classes:
-        complement = anonimous_classes[target_id]["relations"]
+        complement = anonimous_classes[target_id].relations
         if len(complement) > 0:
             complement = relations[complement[0]]
 
-            if complement["type"] == "owl:ObjectProperty":
+            if complement.type == "owl:ObjectProperty":
                 text = text + restrictions(
                     complement,
                     concepts,
@@ -222,7 +223,7 @@ def complement_of(
                 )
                 text = "\t\t\t\t" + text + "\n"
 
-            elif complement["type"] == "owl:complementOf":
+            elif complement.type == "owl:complementOf":
                 # target is an anonymous class with owl:complementOf statement
                 text = text + "\n\t[ rdf:type owl:Class ;"
                 text = text + complement_of(
@@ -241,7 +242,7 @@ def complement_of(
     else:
         error = {
             "message": "An element of an owl:complementOf is not a class description",
-            "shape_id": complement["source"],
+            "shape_id": complement.source,
         }
         errors["complementOf"].append(error)
 
@@ -263,30 +264,28 @@ def restrictions(
     text = ""
     more_than_one_restriction = False
     if (
-        restriction["allValuesFrom"] or restriction["someValuesFrom"]
+        restriction.allValuesFrom or restriction.someValuesFrom
     ) and "target" in restriction:
         more_than_one_restriction = True
-        complement = restriction["target"]
+        complement = restriction.target
         type = (
             "owl:allValuesFrom"
-            if restriction["allValuesFrom"]
+            if restriction.allValuesFrom
             else "owl:someValuesFrom"
         )
         text = "\n\t[ rdf:type owl:Restriction ;"
         text = (
             text
             + "\n\t owl:onProperty "
-            + restriction["prefix"]
+            + restriction.prefix
             + ":"
-            + restriction["uri"]
+            + restriction.uri
             + " ;"
         )
         if complement in concepts:
             # target is a class
             target = (
-                concepts[complement]["prefix"]
-                + ":"
-                + concepts[complement]["uri"]
+                concepts[complement].prefix + ":" + concepts[complement].uri
             )
             text = text + "\n\t " + type + " " + target + "]"
 
@@ -300,7 +299,7 @@ def restrictions(
         elif complement in anonymous_concepts:
             complement = anonymous_concepts[complement]
 
-            if complement["type"] == "owl:unionOf":
+            if complement.type == "owl:unionOf":
                 # target is an anonymous class with owl:unionOf statement
                 target = "\n\t[ rdf:type owl:Class ;"
                 target = target + union_of(
@@ -317,7 +316,7 @@ def restrictions(
                 target = "\t\t\t\t" + target + "\n"
                 text = text + "\n\t " + type + " " + target + "]"
 
-            elif complement["type"] == "owl:intersectionOf":
+            elif complement.type == "owl:intersectionOf":
                 # target is an anonymous class with owl:intersectionOf statement
                 target = "\n\t[ rdf:type owl:Class ;"
                 target = target + intersection_of(
@@ -335,12 +334,12 @@ def restrictions(
                 text = text + "\n\t " + type + " " + target + "]"
 
         elif complement in anonimous_classes:
-            complement = anonimous_classes[complement]["relations"]
+            complement = anonimous_classes[complement].relations
 
             if len(complement) > 0:
                 complement = relations[complement[0]]
 
-                if complement["type"] == "owl:ObjectProperty":
+                if complement.type == "owl:ObjectProperty":
                     target = restrictions(
                         complement,
                         concepts,
@@ -354,7 +353,7 @@ def restrictions(
                     target = "\t\t\t\t" + target + "\n"
                     text = text + "\n\t " + type + " " + target + "]"
 
-                elif complement["type"] == "owl:complementOf":
+                elif complement.type == "owl:complementOf":
                     # target is an anonymous class with owl:complementOf statement
                     target = "\n\t[ rdf:type owl:Class ;"
                     target = target + complement_of(
@@ -374,7 +373,7 @@ def restrictions(
             else:
                 text = text + "]" ""
 
-            """complement = anonimous_classes[complement]["relations"]
+            """complement = anonimous_classes[complement].relations
             if len(complement) > 0:
                 print(text)
                 target = restrictions(relations[complement[0]], concepts, errors, hexagons, anonymous_concepts, individuals, relations, anonimous_classes)
@@ -387,8 +386,8 @@ def restrictions(
 
     # owl:hasValue
     # The target is an individual
-    if restriction["hasValue"]:
-        if restriction["target"] in individuals:
+    if restriction.hasValue:
+        if restriction.target in individuals:
             if more_than_one_restriction:
                 text = text + ",\n"
             else:
@@ -397,23 +396,23 @@ def restrictions(
             text = (
                 text
                 + "\t\t  owl:onProperty "
-                + restriction["prefix"]
+                + restriction.prefix
                 + ":"
-                + restriction["uri"]
+                + restriction.uri
                 + " ;\n"
             )
-            target_id = restriction["target"]
+            target_id = restriction.target
             target_name = (
-                individuals[target_id]["prefix"]
+                individuals[target_id].prefix
                 + ":"
-                + individuals[target_id]["uri"]
+                + individuals[target_id].uri
             )
             text = text + "\t\t  owl:hasValue " + target_name + " ]"
 
         else:
             print("error el rango de un has Value no es una instancia")
 
-    if restriction["min_cardinality"] is not None:
+    if restriction.min_cardinality is not None:
         if more_than_one_restriction:
             text = text + ",\n"
         else:
@@ -422,20 +421,20 @@ def restrictions(
         text = (
             text
             + "\t\t  owl:onProperty "
-            + restriction["prefix"]
+            + restriction.prefix
             + ":"
-            + restriction["uri"]
+            + restriction.uri
             + " ;\n"
         )
         text = (
             text
             + '\t\t  owl:minCardinality "'
-            + restriction["min_cardinality"]
+            + restriction.min_cardinality
             + '"^^xsd:'
             + "nonNegativeInteger ]"
         )
 
-    if restriction["max_cardinality"] is not None:
+    if restriction.max_cardinality is not None:
         if more_than_one_restriction:
             text = text + ",\n"
         else:
@@ -444,20 +443,20 @@ def restrictions(
         text = (
             text
             + "\t\t  owl:onProperty "
-            + restriction["prefix"]
+            + restriction.prefix
             + ":"
-            + restriction["uri"]
+            + restriction.uri
             + " ;\n"
         )
         text = (
             text
             + '\t\t  owl:maxCardinality "'
-            + restriction["max_cardinality"]
+            + restriction.max_cardinality
             + '"^^xsd:'
             + "nonNegativeInteger ]"
         )
 
-    if restriction["cardinality"] is not None:
+    if restriction.cardinality is not None:
         if more_than_one_restriction:
             text = text + ",\n"
         else:
@@ -466,15 +465,15 @@ def restrictions(
         text = (
             text
             + "\t\t  owl:onProperty "
-            + restriction["prefix"]
+            + restriction.prefix
             + ":"
-            + restriction["uri"]
+            + restriction.uri
             + " ;\n"
         )
         text = (
             text
             + '\t\t  owl:cardinality "'
-            + restriction["cardinality"]
+            + restriction.cardinality
             + '"^^xsd:'
             + "nonNegativeInteger ]"
         )
@@ -492,15 +491,13 @@ def intersection_of(
     relations,
     anonimous_classes,
 ):
-    ids = intersection["group"]
+    ids = intersection.group
     text = "\n\towl:intersectionOf ( \n"
 
     for id in ids:
         if id in concepts:
             # target is a class
-            concepts_involved = (
-                concepts[id]["prefix"] + ":" + concepts[id]["uri"]
-            )
+            concepts_involved = concepts[id].prefix + ":" + concepts[id].uri
             text = text + "\t\t\t\t" + concepts_involved + "\n"
 
         elif id in hexagons:
@@ -513,7 +510,7 @@ def intersection_of(
         elif id in anonymous_concepts:
             complement = anonymous_concepts[id]
 
-            if complement["type"] == "owl:unionOf":
+            if complement.type == "owl:unionOf":
                 # target is an anonymous class with owl:unionOf statement
                 text = text + "\n\t[ rdf:type owl:Class ;"
                 text = text + union_of(
@@ -529,7 +526,7 @@ def intersection_of(
                 text = text + "\t\t\t\t ]"
                 text = "\t\t\t\t" + text + "\n"
 
-            elif complement["type"] == "owl:intersectionOf":
+            elif complement.type == "owl:intersectionOf":
                 # target is an anonymous class with owl:intersectionOf statement
                 text = text + "\n\t[ rdf:type owl:Class ;"
                 text = text + intersection_of(
@@ -547,9 +544,9 @@ def intersection_of(
 
         elif id in anonimous_classes:
             # the target is an anonymous class with owl:complementOf statement o a property restriction
-            relation_id = anonimous_classes[id]["relations"][0]
+            relation_id = anonimous_classes[id].relations[0]
             complement = relations[relation_id]
-            if complement["type"] == "owl:complementOf":
+            if complement.type == "owl:complementOf":
                 # target is an anonymous class with owl:complementOf statement
                 text = text + "\n\t[ rdf:type owl:Class ;"
                 text = text + complement_of(
@@ -564,7 +561,7 @@ def intersection_of(
                 )
                 text = text + "\t\t\t\t ]"
                 text = "\t\t\t\t" + text + "\n"
-            elif complement["type"] == "owl:ObjectProperty":
+            elif complement.type == "owl:ObjectProperty":
                 text = text + restrictions(
                     complement,
                     concepts,
@@ -1,21 +1,24 @@
 import argparse
+import cProfile
+import json
+import tracemalloc
 
+from chowlk import stages
 from chowlk.transformations import transform_ontology
 from chowlk.utils import read_drawio_xml
 
+# Output formats and the rdflib format used to serialize them
+FORMATS = {"ttl": "turtle", "xml": "xml", "nt": "nt", "jsonld": "json-ld"}
+
 
 def converter(diagram_path, output_path, type, format):
-    root = read_drawio_xml(diagram_path)
-    ontology_turtle, ontology_xml, namespaces, errors = transform_ontology(
-        root
+    # Only the requested format is serialized
+    ontology, namespaces, errors = transform_ontology(
+        [read_drawio_xml(diagram_path)], formats=(FORMATS[format],)
     )
 
     file = open(output_path, mode="w")
-
-    if format == "ttl":
-        file.write(ontology_turtle)
-    elif format == "xml":
-        file.write(ontology_xml)
+    file.write(ontology)
 
     print_errors(errors)
     file.close()
@@ -56,11 +59,78 @@ def main():
         "--type", type=str, default="ontology", help="ontology or rdf data"
     )
     parser.add_argument(
-        "--format", type=str, default="ttl", help="file format: ttl or xml"
+        "--format",
+        type=str,
+        default="ttl",
+        choices=list(FORMATS),
+        help="file format: ttl, xml, nt or jsonld",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="print the time spent in each stage of the conversion",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="also print the memory allocated in each stage (slower)",
+    )
+    parser.add_argument(
+        "--memory-report",
+        type=str,
+        help="trace the memory of each stage with tracemalloc snapshots and "
+        "save a json report with the sites that allocated it here (slower)",
+    )
+    parser.add_argument(
+        "--profile-output",
+        type=str,
+        help="run the conversion with cProfile and save the pstats here",
     )
     args = parser.parse_args()
 
-    converter(args.diagram_path, args.output_path, args.type, args.format)
+    if not (
+        args.profile
+        or args.profile_memory
+        or args.memory_report
+        or args.profile_output
+    ):
+        converter(args.diagram_path, args.output_path, args.type, args.format)
+        return
+
+    profiler = cProfile.Profile() if args.profile_output else None
+    if args.memory_report:
+        # rdflib, its plugins and bs4 are imported by a first conversion, so
+        # that their modules are not in every snapshot
+        transform_ontology(
+            read_drawio_xml(args.diagram_path),
+            formats=(FORMATS[args.format],),
+        )
+        profile = stages.MemoryProfile()
+        tracemalloc.start(stages.MEMORY_FRAMES)
+    else:
+        profile = stages.StageProfile()
+        if args.profile_memory:
+            tracemalloc.start()
+
+    with stages.recording(profile):
+        if profiler is not None:
+            profiler.enable()
+        converter(args.diagram_path, args.output_path, args.type, args.format)
+        if profiler is not None:
+            profiler.disable()
+
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+    if args.memory_report:
+        report = profile.as_dict()
+        report["diagram"] = args.diagram_path
+        with open(args.memory_report, "w") as f:
+            json.dump(report, f, indent=2)
+    if profiler is not None:
+        # It can be read with python -m pstats or any pstats viewer
+        profiler.dump_stats(args.profile_output)
+
+    print("\n" + profile.report())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,203 @@
+"""Records for the elements found in a diagram.
+
+The Finder produces one record per shape or edge of the diagram and the
+rest of the pipeline (associations, anonymous classes and writer) reads and
+updates them. Records use __slots__, so they are much smaller than the
+equivalent dicts and their fields are read with plain attribute access.
+
+A field that has not been assigned behaves like a missing key, and records
+keep a mapping-style interface (element["uri"], "type" in element, ...) so
+the code that still treats elements as dicts keeps working.
+"""
+
+
+class Element:
+    __slots__ = ()
+
+    # Mapping keys that are not valid identifiers and the slot storing them
+    aliases = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        fields = []
+        for klass in reversed(cls.__mro__):
+            for field in klass.__dict__.get("__slots__", ()):
+                if field not in fields:
+                    fields.append(field)
+        cls.fields = tuple(fields)
+        cls._slot_of = {field: field for field in fields}
+        cls._slot_of.update(cls.aliases)
+        cls._key_of = {slot: key for key, slot in cls.aliases.items()}
+
+    def __init__(self, **fields):
+        for field, value in fields.items():
+            setattr(self, field, value)
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, self._slot_of[key])
+        except (KeyError, AttributeError):
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        try:
+            slot = self._slot_of[key]
+        except KeyError:
+            raise KeyError(key) from None
+        setattr(self, slot, value)
+
+    def __contains__(self, key):
+        slot = self._slot_of.get(key)
+        return slot is not None and hasattr(self, slot)
+
+    def get(self, key, default=None):
+        slot = self._slot_of.get(key)
+        if slot is None:
+            return default
+        return getattr(self, slot, default)
+
+    def keys(self):
+        return [
+            self._key_of.get(field, field)
+            for field in self.fields
+            if hasattr(self, field)
+        ]
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def __repr__(self):
+        fields = ", ".join(
+            field + "=" + repr(getattr(self, field))
+            for field in self.fields
+            if hasattr(self, field)
+        )
+        return type(self).__name__ + "(" + fields + ")"
+
+
+class Property(Element):
+    """Common fields of object properties (relations) and attributes."""
+
+    __slots__ = (
+        "prefix",
+        "uri",
+        "label",
+        "domain",
+        "range",
+        "allValuesFrom",
+        "someValuesFrom",
+        "hasValue",
+        "predicate_restriction",
+        "functional",
+        "min_cardinality",
+        "max_cardinality",
+        "cardinality",
+        "sub_property_of",
+        "equivalent_property",
+    )
+
+    aliases = {
+        "rdfs:subPropertyOf": "sub_property_of",
+        "owl:equivalentProperty": "equivalent_property",
+    }
+
+
+class Relation(Property):
+    """An edge of the diagram, or a property declared in a rhombus."""
+
+    __slots__ = (
+        "id",
+        "source",
+        "target",
+        "type",
+        "inverse_functional",
+        "transitive",
+        "symmetric",
+        "inverse_of",
+    )
+
+    aliases = dict(Property.aliases, **{"owl:inverseOf": "inverse_of"})
+
+
+class Attribute(Property):
+    """One line of an attribute block (a datatype property)."""
+
+    __slots__ = (
+        "datatype",
+        "prefix_datatype",
+    )
+
+
+class Shape(Element):
+    """Id and geometry of an element drawn as a shape (a vertex).
+
+    Only these values are copied from the xml of the diagram, so the parsed
+    tree can be released once the elements have been classified.
+    """
+
+    __slots__ = (
+        "id",
+        "x",
+        "y",
+        "width",
+        "height",
+    )
+
+
+class AttributeBlock(Shape):
+    __slots__ = (
+        "attributes",
+        "concept_associated",
+    )
+
+
+class Concept(Shape):
+    __slots__ = (
+        "prefix",
+        "uri",
+        "label",
+    )
+
+
+class Individual(Shape):
+    __slots__ = (
+        "prefix",
+        "uri",
+        "type",
+    )
+
+
+class AttributeValue(Shape):
+    """A literal (data value) assigned to an individual."""
+
+    __slots__ = (
+        "value",
+        "type",
+        "lang",
+    )
+
+
+class Ellipse(Shape):
+    """A class axiom (owl:unionOf, owl:intersectionOf, ...) drawn as an
+    ellipse, or an owl:oneOf / owl:AllDifferent drawn as a hexagon."""
+
+    __slots__ = (
+        "type",
+        "group",
+    )
+
+
+class Hexagon(Ellipse):
+    __slots__ = ()
+
+
+class Rhombus(Shape):
+    __slots__ = (
+        "type",
+        "prefix",
+        "uri",
+    )
+
+
+class AnonymousClass(Shape):
+    __slots__ = ("relations",)
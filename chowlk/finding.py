@@ -1,7 +1,75 @@
 import re
 
-from chowlk.geometry import get_corners_rect_child
-from chowlk.utils import clean_html_tags, clean_uri, create_label
+from chowlk.elements import (
+    AnonymousClass,
+    Attribute,
+    AttributeBlock,
+    AttributeValue,
+    Concept,
+    Ellipse,
+    Hexagon,
+    Individual,
+    Relation,
+    Rhombus,
+)
+from chowlk.geometry import CellGeometries, get_edge_ends, get_geometry
+from chowlk.stages import staged
+from chowlk.utils import (
+    ALL_VALUES_FROM,
+    ALL_VALUES_FROM_NAME,
+    BASE_PREFIX,
+    DISJOINT_RESTRICTION,
+    EQUIVALENT_RESTRICTION,
+    FUNCTIONAL,
+    HAS_VALUE,
+    HAS_VALUE_NAME,
+    INVERSE_FUNCTIONAL,
+    SOME_VALUES_FROM,
+    SOME_VALUES_FROM_NAME,
+    SUBCLASS_RESTRICTION,
+    SYMMETRIC,
+    TRANSITIVE,
+    Prefixes,
+    Symbols,
+    clean_html_tags,
+    clean_uri,
+    create_label,
+    edge_type,
+    find_cardinality,
+    label_flags,
+    split_datatype,
+    split_qname,
+)
+
+
+def set_shape(shape, child):
+    # Only the id and the geometry of the xml object are kept in the element,
+    # so that the tree of the diagram can be released after the classification
+    shape.id = child.attrib["id"]
+    shape.x, shape.y, shape.width, shape.height = get_geometry(child)
+
+
+def is_block(child):
+    # Classes and attribute blocks do not have a specific characteristic to
+    # differentiate them, so the blocks are the cells that are none of the
+    # rest of the shapes
+    style = child.attrib["style"] if "style" in child.attrib else ""
+    if "text" in style or "edgeLabel" in style:
+        return False
+    if "edge" in child.attrib:
+        return False
+    if "ellipse" in style or "rhombus" in style or "shape" in style:
+        return False
+    return True
+
+
+def is_frame(child, parents):
+    # Containers, swimlanes and groups of draw.io, and any shape with shapes
+    # inside it (parents holds the ids of the parents of the vertices)
+    style = child.attrib["style"] if "style" in child.attrib else ""
+    if "container=1" in style or "swimlane" in style or "group" in style:
+        return True
+    return child.attrib["id"] in parents
 
 
 class Finder:
@@ -18,6 +86,10 @@ class Finder:
         self.rhombuses = {}
         self.hexagons = {}
         self.anonimous_classes = {}
+        self.prefixes = Prefixes()
+        self.symbols = Symbols()
+        # Ends of the edges attached by snap_edge_ends, by edge id
+        self.snapped_ends = {}
         self.errors = {
             "Concepts": [],
             "Arrows": [],
@@ -35,6 +107,111 @@ class Finder:
             "unionOf": [],
         }
 
+    @staged
+    def snap_edge_ends(self, threshold=10):
+        # Users often drop the end of an arrow near a shape instead of on it.
+        # The ends of the edges that are not attached to any shape are
+        # attached to the nearest class, individual, ellipse or hexagon with
+        # the same parent, if it is closer than the threshold, as if they had
+        # been dropped on it. The tree is not changed, the snapped ends are
+        # kept by edge id for find_relations
+        dangling = []
+        parents = set()
+        for child in self.root:
+            if "edge" not in child.attrib:
+                continue
+            if "source" in child.attrib and "target" in child.attrib:
+                continue
+            dangling.append(child)
+            parents.add(child.attrib.get("parent"))
+
+        if not dangling:
+            return
+
+        # Notes, text, rhombuses, frames and other shapes are not candidates,
+        # and classes are told apart from attribute blocks as in
+        # find_concepts_and_attributes
+        geometries = CellGeometries(self.root)
+        classes_index = self.blocks_index(geometries)
+        vertex_parents = {
+            child.attrib.get("parent")
+            for child in self.root
+            if "vertex" in child.attrib
+        }
+        positions = {}
+        shapes = {}
+        for position, child in enumerate(self.root):
+            positions[child.attrib["id"]] = position
+            style = child.attrib["style"] if "style" in child.attrib else ""
+            value = child.attrib["value"] if "value" in child.attrib else ""
+            parent = child.attrib.get("parent")
+            if "vertex" not in child.attrib or parent not in parents:
+                continue
+            if "text" in style or "edgeLabel" in style or value == "":
+                continue
+            if is_frame(child, vertex_parents):
+                continue
+            if "ellipse" in style or "hexagon" in style:
+                shapes.setdefault(parent, []).append(position)
+            elif not is_block(child) or "&quot;" in value:
+                continue
+            elif "fontStyle=4" in style or "<u>" in value:
+                shapes.setdefault(parent, []).append(position)
+            else:
+                try:
+                    top_left = geometries.corners(position)[0]
+                    if classes_index.first_near(top_left) is not None:
+                        continue
+                except ValueError:
+                    continue
+                shapes.setdefault(parent, []).append(position)
+
+        shape_indexes = {
+            parent: geometries.shape_index(sorted(candidates), threshold)
+            for parent, candidates in shapes.items()
+        }
+        for child in dangling:
+            shape_index = shape_indexes.get(child.attrib.get("parent"))
+            if shape_index is None:
+                continue
+            try:
+                ends = get_edge_ends(child)
+            except ValueError:
+                continue
+            snapped = {}
+            for end, point, other_end, other_point in (
+                ("source", ends[0], "target", ends[1]),
+                ("target", ends[1], "source", ends[0]),
+            ):
+                if end in child.attrib or point is None:
+                    continue
+                # The shape at the other end is not snapped to, nor any shape
+                # around it
+                if other_end in child.attrib:
+                    try:
+                        other_point = geometries.center(
+                            positions[child.attrib[other_end]]
+                        )
+                    except (KeyError, ValueError):
+                        other_point = None
+                position = shape_index.nearest(point, other_point)
+                if position is not None:
+                    snapped[end] = self.root[position].attrib["id"]
+            if snapped:
+                self.snapped_ends[child.attrib["id"]] = snapped
+
+    def blocks_index(self, geometries):
+        # Index of the bottom-left corners of the blocks. A block with its
+        # top-left corner near one of them is the attribute block of that one
+        return geometries.bottom_left_index(
+            [
+                position
+                for position, child in enumerate(self.root)
+                if is_block(child)
+            ]
+        )
+
+    @staged
     def find_relations(self):
         for child in self.root:
             id = child.attrib["id"]
@@ -49,17 +226,22 @@ class Finder:
             if "edge" not in child.attrib:
                 continue
 
-            relation = {}
+            relation = Relation()
+            snapped = self.snapped_ends.get(id, {})
             source = (
-                child.attrib["source"] if "source" in child.attrib else None
+                child.attrib["source"]
+                if "source" in child.attrib
+                else snapped.get("source")
             )
             target = (
-                child.attrib["target"] if "target" in child.attrib else None
+                child.attrib["target"]
+                if "target" in child.attrib
+                else snapped.get("target")
             )
 
-            relation["source"] = source
-            relation["target"] = target
-            relation["xml_object"] = child
+            relation.source = source
+            relation.target = target
+            relation.id = id
 
             source_xml_object = {}
             parent_xml_object = {}
@@ -84,7 +266,7 @@ class Finder:
                 ):
                     # This edge is part of a unionOf / intersectionOf construct
                     # it is not useful beyond that construction
-                    relation["type"] = "ellipse_connection"
+                    relation.type = "ellipse_connection"
                     self.relations[id] = relation
                     continue
 
@@ -93,7 +275,7 @@ class Finder:
                     if source == child2.attrib["id"] and ("ellipse" in style2 or "hexagon" in style2):
                         # This edge is part of a unionOf / intersectionOf construct
                         # it is not useful beyond that construction
-                        relation["type"] = "ellipse_connection"
+                        relation.type = "ellipse_connection"
                         ellipse_connection_detected = True
                         break
                 if ellipse_connection_detected:
@@ -115,7 +297,7 @@ class Finder:
                         value = clean_html_tags(child2.attrib["value"])
                         break"""
 
-                if relation["source"] is None:
+                if relation.source is None:
                     error = {
                         "message": "Domain side of the relation is not connected to any shape, please check this",
                         "shape_id": id,
@@ -123,7 +305,7 @@ class Finder:
                     }
                     self.errors["Arrows"].append(error)
 
-                if relation["target"] is None:
+                if relation.target is None:
                     error = {
                         "message": "Range side of the relation is not connected to any shape, please check this",
                         "shape_id": id,
@@ -139,11 +321,11 @@ class Finder:
                         "endArrow=block" in style
                         or "startArrow=block" in style
                     ):
-                        relation["type"] = "rdfs:subClassOf"
+                        relation.type = "rdfs:subClassOf"
                     elif (
                         "endArrow=open" in style or "startArrow=open" in style
                     ):
-                        relation["type"] = "rdf:type"
+                        relation.type = "rdf:type"
                     else:
                         error = {
                             "message": "Could not recognize type of arrow",
@@ -154,130 +336,74 @@ class Finder:
                     self.relations[id] = relation
                     continue
 
-            # Detection of special type of edges
-            edge_types = [
-                "rdfs:subClassOf",
-                "rdf:type",
-                "owl:equivalentClass",
-                "owl:disjointWith",
-                "owl:complementOf",
-                "rdfs:subPropertyOf",
-                "owl:equivalentProperty",
-                "owl:inverseOf",
-                "rdfs:domain",
-                "rdfs:range",
-                "owl:sameAs",
-                "owl:differentFrom",
-            ]
-
-            edge_type_founded = False
+            # The edge types and the keywords of the label are found in one
+            # scan of it
+            flags = label_flags(value)
 
-            for edge_type in edge_types:
-                if edge_type in value:
-                    relation["type"] = edge_type
-                    self.relations[id] = relation
-                    edge_type_founded = True
-                    break
-
-            if edge_type_founded:
+            # Detection of special type of edges
+            special_type = edge_type(flags)
+            if special_type is not None:
+                relation.type = special_type
+                self.relations[id] = relation
                 continue
 
             # Domain Range evaluation
             if "dashed=1" in style:
                 if "startArrow=oval" not in style or "startFill=0" in style:
-                    relation["domain"] = False
-                    relation["range"] = False
+                    relation.domain = False
+                    relation.range = False
                 elif "startFill=1" in style:
-                    relation["domain"] = source
-                    relation["range"] = False
+                    relation.domain = source
+                    relation.range = False
 
             elif "dashed=1" not in style:
                 if "startArrow=oval" not in style or "startFill=1" in style:
-                    relation["domain"] = source
-                    relation["range"] = target
+                    relation.domain = source
+                    relation.range = target
                 elif "startFill=0" in style:
-                    relation["domain"] = False
-                    relation["range"] = target
+                    relation.domain = False
+                    relation.range = target
 
             # Existential Universal restriction evaluation
-            if "allValuesFrom" in value or "(all)" in value or "∀" in value:
-                relation["allValuesFrom"] = True
-            else:
-                relation["allValuesFrom"] = False
-
-            if "someValuesFrom" in value or "(some)" in value or "∃" in value:
-                relation["someValuesFrom"] = True
-            else:
-                relation["someValuesFrom"] = False
+            relation.allValuesFrom = bool(
+                flags & (ALL_VALUES_FROM | ALL_VALUES_FROM_NAME)
+            )
+            relation.someValuesFrom = bool(
+                flags & (SOME_VALUES_FROM | SOME_VALUES_FROM_NAME)
+            )
 
             # owl:hasValue
-            if "hasValue" in value or "(value)" in value or "∋" in value:
-                relation["hasValue"] = True
-            else:
-                relation["hasValue"] = False
+            relation.hasValue = bool(flags & (HAS_VALUE | HAS_VALUE_NAME))
 
             # class_description predicate restriction
             # A named class can be a subClass, an equivalentClass or disjointWith a class restriction
             # When the user wants to declare this relation, it is specified inside the "relation" in diagrams
-            if "(sub)" in value:
-                relation["predicate_restriction"] = "rdfs:subClassOf"
-            elif "(eq)" in value:
-                relation["predicate_restriction"] = "owl:equivalentClass"
-            elif "(dis)" in value:
-                relation["predicate_restriction"] = "owl:disjointWith"
+            if flags & SUBCLASS_RESTRICTION:
+                relation.predicate_restriction = "rdfs:subClassOf"
+            elif flags & EQUIVALENT_RESTRICTION:
+                relation.predicate_restriction = "owl:equivalentClass"
+            elif flags & DISJOINT_RESTRICTION:
+                relation.predicate_restriction = "owl:disjointWith"
             else:
-                relation["predicate_restriction"] = "rdfs:subClassOf"
+                relation.predicate_restriction = "rdfs:subClassOf"
 
             # Property restriction evaluation
-            relation["functional"] = True if "(F)" in value else False
-            relation["inverse_functional"] = True if "(IF)" in value else False
-            relation["transitive"] = True if "(T)" in value else False
-            relation["symmetric"] = True if "(S)" in value else False
+            relation.functional = bool(flags & FUNCTIONAL)
+            relation.inverse_functional = bool(flags & INVERSE_FUNCTIONAL)
+            relation.transitive = bool(flags & TRANSITIVE)
+            relation.symmetric = bool(flags & SYMMETRIC)
 
             # Prefix and uri
             try:
                 uri = clean_uri(value)
                 uri = uri.split("|")[-1].strip().split(">>")[-1].strip()
 
-                # In order to implement @base directive
-                # If uri contains ':' && uri does not start with ':' => normal prefix
-                # If uri starts with ':' => empty prefix
-                # If uri does not contain ':' => prefix is @base
-                # If uri contains ':' && uri does not start with ':' => len(uri_split) > 1 and uri_split[0] != ""
-                # If uri starts with ':' => len(uri_split) > 1 and uri_split[0] == ""
-                # If uri does not contain ':' => len(uri_split) == 1
-                uri_split = uri.split(":")
-                if len(uri_split) > 1:
-                    # normal prefix || empty prefix (both are in namespace)
-                    prefix = uri_split[0].strip()
-                    if prefix == "":
-                        prefix = "cambiar_a_prefijo_vacio"
-                    uri = uri_split[-1].strip()
-                else:
-                    # prefix is @base
-                    # store prefix with an auxiliar name in order
-                    # write the relations with base directive in to write_object_properties
-                    prefix = "<cambiar_a_base"
-                    uri = uri_split[0].strip() + ">"
-
-                """#Como estaba hecho antes
-                print(uri)
-                uri = uri.split("|")[-1].strip().split(">>")[-1].strip()
-                print(uri)
-
-                check = uri.split(":")[1] # Check if error in text
-
-                prefix = uri.split(":")[0].strip()
-                uri = uri.split(":")[-1].strip()
-
-                check = prefix[0] # Check if error in text
-                check = uri[0] # Check if error in text"""
+                # The uri is the part after the last colon
+                prefix, uri = split_qname(uri, last=True)
 
-                uri = re.sub(" ", "", uri)
-
-                relation["prefix"] = prefix
-                relation["uri"] = uri
-                relation["label"] = create_label(relation["uri"], "property")
+                relation.prefix = prefix
+                relation.uri = uri
+                relation.label = create_label(relation.uri, "property")
             except:
                 error = {
                     "message": "Problems in the text of the arrow",
@@ -289,19 +415,10 @@ class Finder:
 
             # Cardinality restriction evaluation
             try:
-                # max_min_card = re.findall("\(([0-9][^)]+)\)", value)
-                max_min_card = re.findall(r"\((\S*[.][.]\S*)\)", value)
-                max_min_card = (
-                    max_min_card[-1] if len(max_min_card) > 0 else None
-                )
-
-                if max_min_card is None:
-                    relation["min_cardinality"] = None
-                    relation["max_cardinality"] = None
-                else:
-                    max_min_card = max_min_card.split("..")
-                    relation["min_cardinality"] = max_min_card[0]
-                    relation["max_cardinality"] = max_min_card[1]
+                (
+                    relation.min_cardinality,
+                    relation.max_cardinality,
+                ) = find_cardinality(value)
             except:
                 error = {
                     "message": "Problems in cardinality definition",
@@ -313,28 +430,28 @@ class Finder:
 
             # If min_cardinality == 0 this means it is not necessary to create
             # a min_cardinality restrictions
-            if relation["min_cardinality"] == "0":
-                relation["min_cardinality"] = None
+            if relation.min_cardinality == "0":
+                relation.min_cardinality = None
 
             # If max_cardinality == N this means it is not necessary to create
             # a max_cardinality restrictions
-            if relation["max_cardinality"] == "N":
-                relation["max_cardinality"] = None
+            if relation.max_cardinality == "N":
+                relation.max_cardinality = None
 
             # Check if min_cardinality represents a non negative integer
-            if relation["min_cardinality"] != None:
+            if relation.min_cardinality != None:
                 try:
-                    aux = float(relation["min_cardinality"])
+                    aux = float(relation.min_cardinality)
                     if not aux.is_integer() or aux < 0:
                         message = (
                             "min_cardinality is "
-                            + relation["min_cardinality"]
+                            + relation.min_cardinality
                             + " which is not a non negative integer, in restriction "
-                            + relation["prefix"]
+                            + relation.prefix
                             + ":"
-                            + relation["uri"]
+                            + relation.uri
                         )
-                        relation["min_cardinality"] = None
+                        relation.min_cardinality = None
                         error = {
                             "message": message,
                             "shape_id": id,
@@ -345,11 +462,11 @@ class Finder:
                 except:
                     message = (
                         "min_cardinality is not a number, in relation "
-                        + relation["prefix"]
+                        + relation.prefix
                         + ":"
-                        + relation["uri"]
+                        + relation.uri
                     )
-                    relation["min_cardinality"] = None
+                    relation.min_cardinality = None
                     error = {
                         "message": message,
                         "shape_id": id,
@@ -357,20 +474,20 @@ class Finder:
                     }
                     self.errors["Cardinality-Restrictions"].append(error)
 
-            if relation["max_cardinality"] != None:
+            if relation.max_cardinality != None:
                 # Check if max_cardinality represents a non negative integer
                 try:
-                    aux = float(relation["max_cardinality"])
+                    aux = float(relation.max_cardinality)
                     if not aux.is_integer() or aux < 0:
                         message = (
                             "max_cardinality is "
-                            + relation["max_cardinality"]
+                            + relation.max_cardinality
                             + " which is not a non negative integer, in restriction "
-                            + relation["prefix"]
+                            + relation.prefix
                             + ":"
-                            + relation["uri"]
+                            + relation.uri
                         )
-                        relation["max_cardinality"] = None
+                        relation.max_cardinality = None
                         error = {
                             "message": message,
                             "shape_id": id,
@@ -381,11 +498,11 @@ class Finder:
                 except:
                     message = (
                         "max_cardinality is not a number, in restriction "
-                        + relation["prefix"]
+                        + relation.prefix
                         + ":"
-                        + relation["uri"]
+                        + relation.uri
                     )
-                    relation["max_cardinality"] = None
+                    relation.max_cardinality = None
                     error = {
                         "message": message,
                         "shape_id": id,
@@ -393,38 +510,43 @@ class Finder:
                     }
                     self.errors["Cardinality-Restrictions"].append(error)
 
-            if relation["min_cardinality"] == relation["max_cardinality"]:
-                relation["cardinality"] = relation["min_cardinality"]
-                relation["max_cardinality"] = None
-                relation["min_cardinality"] = None
+            if relation.min_cardinality == relation.max_cardinality:
+                relation.cardinality = relation.min_cardinality
+                relation.max_cardinality = None
+                relation.min_cardinality = None
             else:
-                relation["cardinality"] = None
+                relation.cardinality = None
 
             # max_cardinality must be greater than min_cardinality
             if (
-                relation["max_cardinality"] != None
-                and relation["min_cardinality"] != None
-                and float(relation["max_cardinality"])
-                < float(relation["min_cardinality"])
+                relation.max_cardinality != None
+                and relation.min_cardinality != None
+                and float(relation.max_cardinality)
+                < float(relation.min_cardinality)
             ):
                 message = (
                     "max_cardinality is lower than min_cardinality"
                     + " in restriction "
-                    + relation["prefix"]
+                    + relation.prefix
                     + ":"
-                    + relation["uri"]
+                    + relation.uri
                 )
-                relation["max_cardinality"] = None
-                relation["min_cardinality"] = None
+                relation.max_cardinality = None
+                relation.min_cardinality = None
                 error = {"message": message, "shape_id": id, "value": value}
                 self.errors["Cardinality-Restrictions"].append(error)
 
-            relation["type"] = "owl:ObjectProperty"
+            relation.type = "owl:ObjectProperty"
 
             self.relations[id] = relation
+            self.prefixes.add("relations", relation.prefix)
+            self.symbols.add(
+                "relations", relation.prefix + ":" + relation.uri, id
+            )
 
         return self.relations
 
+    @staged
     def find_namespaces(self):
         for child in self.root:
             style = child.attrib["style"] if "style" in child.attrib else ""
@@ -453,6 +575,7 @@ class Finder:
                         continue
         return self.namespaces
 
+    @staged
     def find_metadata(self):
         for child in self.root:
             style = child.attrib["style"] if "style" in child.attrib else ""
@@ -492,6 +615,7 @@ class Finder:
 
         return self.ontology_metadata
 
+    @staged
     def find_ellipses(self):
         for child in self.root:
             id = child.attrib["id"]
@@ -500,77 +624,75 @@ class Finder:
             ellipse_corrupted = False
             try:
                 if "ellipse" in style:
-                    ellipse = {}
-                    ellipse["xml_object"] = child
+                    ellipse = Ellipse()
+                    set_shape(ellipse, child)
                     if "⨅" in value or "owl:intersectionOf" in value:
-                        ellipse["type"] = "owl:intersectionOf"
+                        ellipse.type = "owl:intersectionOf"
                     elif "⨆" in value or "owl:unionOf" in value:
-                        ellipse["type"] = "owl:unionOf"
+                        ellipse.type = "owl:unionOf"
                     elif "≡" in value:
-                        ellipse["type"] = "owl:equivalentClass"
+                        ellipse.type = "owl:equivalentClass"
                     elif "⊥" in value:
-                        ellipse["type"] = "owl:disjointWith"
+                        ellipse.type = "owl:disjointWith"
                     elif "owl:oneOf" in value:
-                        ellipse["type"] = "owl:oneOf"
+                        ellipse.type = "owl:oneOf"
 
                     # Find the associated concepts to this union / intersection restriction
-                    ellipse["group"] = []
+                    ellipse.group = []
 
                     for relation_id, relation in self.relations.items():
                         if "type" not in relation:
                             continue
 
-                        if relation["type"] == "ellipse_connection":
-                            source_id = relation["source"]
+                        if relation.type == "ellipse_connection":
+                            source_id = relation.source
                             if id == source_id:
-                                target_id = relation["target"]
+                                target_id = relation.target
                                 if target_id is None:
                                     error = {
                                         "message": "An arrow of an "
-                                        + ellipse["type"]
+                                        + ellipse.type
                                         + " is not connected to any shape, please check this",
                                         "shape_id": id,
                                     }
-                                    self.errors[ellipse["type"][4:]].append(
-                                        error
-                                    )
+                                    self.errors[ellipse.type[4:]].append(error)
                                 else:
-                                    ellipse["group"].append(target_id)
+                                    ellipse.group.append(target_id)
 
                         # anonymousClass owl:complementOf anonymousClass
-                        elif relation["type"] == "owl:complementOf":
-                            source_id = relation["source"]
+                        elif relation.type == "owl:complementOf":
+                            source_id = relation.source
                             if id == source_id:
-                                ellipse["group"].append(relation_id)
+                                ellipse.group.append(relation_id)
 
                         # anonymousClass objectProperty anonymousClass
-                        elif relation["type"] == "owl:ObjectProperty":
-                            source_id = relation["source"]
+                        elif relation.type == "owl:ObjectProperty":
+                            source_id = relation.source
                             if id == source_id:
-                                ellipse["group"].append(relation_id)
+                                ellipse.group.append(relation_id)
 
-                    if len(ellipse["group"]) < 2:
+                    if len(ellipse.group) < 2:
                         error = {
                             "message": "An "
-                            + ellipse["type"]
+                            + ellipse.type
                             + " is connected to less than two shapes. An "
-                            + ellipse["type"]
+                            + ellipse.type
                             + " needs at least two class axioms",
                             "shape_id": id,
                         }
-                        self.errors[ellipse["type"][4:]].append(error)
+                        self.errors[ellipse.type[4:]].append(error)
                         ellipse_corrupted = True
 
                     if ellipse_corrupted:
                         continue
 
-                    ellipse["xml_object"] = child
                     self.ellipses[id] = ellipse
             except:
                 continue
 
         return self.ellipses
 
+    @staged
     def find_individuals(self):
         for child in self.root:
             id = child.attrib["id"]
@@ -582,41 +704,12 @@ class Finder:
                 continue
             # List of individuals
             if "fontStyle=4" in style or "<u>" in value:
-                individual = {}
-                individual["xml_object"] = child
+                individual = Individual()
                 value = clean_html_tags(value)
                 try:
-                    # In order to implement @base directive
-                    # If value contains ':' && value does not start with ':' => normal prefix
-                    # If value starts with ':' => empty prefix (which is the same as @base)
-                    # If value does not contain ':' => prefix is @base
-                    # If value contains ':' && value does not start with ':' => len(value_split) > 1 and value_split[0] != ""
-                    # If value starts with ':' => len(value_split) > 1 and value_split[0] == ""
-                    # If value does not contain ':' => len(value_split) == 1
-
-                    value_split = value.split(":")
-                    if len(value_split) > 1:
-                        # normal prefix || empty prefix (both are in namespace)
-                        individual["prefix"] = value_split[0].strip()
-                        if individual["prefix"] == "":
-                            individual["prefix"] = "cambiar_a_prefijo_vacio"
-                        individual["uri"] = value_split[1].strip()
-                    else:
-                        # prefix is @base
-                        # store concept["prefix"] with an auxiliar name in order
-                        # write the concepts with base directive in to write_concepts
-                        individual["prefix"] = "<cambiar_a_base"
-                        individual["uri"] = value_split[0].strip() + ">"
-
-                    """#Asi estaba hecho
-                    individual["prefix"] = value.split(":")[0]
-                    individual["uri"] = value.split(":")[1]
-                    individual["prefix"][0] # Check if error
-                    individual["uri"][1] # Check if error"""
-
-                    individual["type"] = None
-
-                    individual["uri"] = re.sub(" ", "", individual["uri"])
+                    set_shape(individual, child)
+                    individual.prefix, individual.uri = split_qname(value)
+                    individual.type = None
 
                 except:
                     error = {
@@ -628,11 +721,13 @@ class Finder:
                     continue
 
                 self.individuals[id] = individual
+                self.prefixes.add("individuals", individual.prefix)
 
                 continue
 
         return self.individuals
 
+    @staged
     def find_attribute_values(self):
         for child in self.root:
             id = child.attrib["id"]
@@ -644,25 +739,25 @@ class Finder:
             value = clean_html_tags(value)
 
             if "&quot;" in value or '"' in value:
-                attribute = {}
-                attribute["xml_object"] = child
-                attribute["type"] = None
-                attribute["lang"] = None
+                attribute = AttributeValue()
+                attribute.type = None
+                attribute.lang = None
 
                 try:
+                    set_shape(attribute, child)
                     # Finding the value
                     if "&quot;" in value:
-                        attribute["value"] = value.split("&quot;")[1]
+                        attribute.value = value.split("&quot;")[1]
                     elif '"' in value:
                         reg_exp = '"(.*?)"'
-                        attribute["value"] = re.findall(reg_exp, value)[0]
+                        attribute.value = re.findall(reg_exp, value)[0]
 
                     # Finding the type
                     if "^^" in value:
-                        attribute["type"] = value.split("^^")[-1]
+                        attribute.type = value.split("^^")[-1]
 
                     elif "@" in value:
-                        attribute["lang"] = value.split("@")[-1]
+                        attribute.lang = value.split("@")[-1]
 
                 except:
                     error = {
@@ -677,6 +772,7 @@ class Finder:
 
         return self.attributes
 
+    @staged
     def find_rhombuses(self):
         # these are the types which can be defined indise a rhombus
         valid_types = [
@@ -688,26 +784,6 @@ class Finder:
             "owl:InverseFunctionalProperty",
         ]
 
-        # Array with the names of the relations defined in the diagram
-        relation_uris = []
-        for relation_id, relation in self.relations.items():
-            if "uri" in relation:
-                relation_uris.append(
-                    relation["prefix"] + ":" + relation["uri"]
-                )
-
-        # Array with the names of the attributes defined in the diagram
-        attribute_uris = []
-        for (
-            attribute_block_id,
-            attribute_block,
-        ) in self.attribute_blocks.items():
-            attributes = attribute_block["attributes"]
-            for attribute in attributes:
-                attribute_uris.append(
-                    attribute["prefix"] + ":" + attribute["uri"]
-                )
-
         for child in self.root:
             id = child.attrib["id"]
             style = child.attrib["style"] if "style" in child.attrib else ""
@@ -718,8 +794,8 @@ class Finder:
             )
 
             if "rhombus" in style:
-                rhombus = {}
-                rhombus["xml_object"] = child
+                rhombus = Rhombus()
+                set_shape(rhombus, child)
 
                 # In a rhombus can be defined more than one type
                 # A type is defined between << and >>
@@ -750,51 +826,25 @@ class Finder:
                         self.errors["Rhombuses"].append(error)
                         continue
 
-                    rhombus["type"] = types.pop(0)
+                    rhombus.type = types.pop(0)
 
                     value = value_html_clean.split("|")[-1].strip()
                     value = value.split(">>")[-1].strip()
 
-                    # In order to implement @base directive
-                    # If uri contains ':' && uri does not start with ':' => normal prefix
-                    # If uri starts with ':' => empty prefix
-                    # If uri does not contain ':' => prefix is @base
-                    # If uri contains ':' && uri does not start with ':' => len(value_split) > 1 and value_split[0] != ""
-                    # If uri starts with ':' => len(value_split) > 1 and value_split[0] == ""
-                    # If uri does not contain ':' => len(value_split) == 1
-                    value_split = value.split(":")
-                    if len(value_split) > 1:
-                        # normal prefix || empty prefix (both are in namespace)
-                        prefix = value_split[0].strip()
-                        if prefix == "":
-                            prefix = "cambiar_a_prefijo_vacio"
-                        uri = value_split[-1].strip()
-                    else:
-                        # prefix is @base
-                        # store prefix with an auxiliar name in order
-                        # write the relations with base directive in to write_object_properties
-                        prefix = "<cambiar_a_base"
-                        uri = value_split[0].strip() + ">"
-
-                    """#Como estaba hecho antes
-                    prefix = value.split(":")[0].strip()
-                    uri = value.split(":")[1].strip()"""
-
-                    uri = re.sub(" ", "", uri)
+                    # The uri is the part after the last colon
+                    prefix, uri = split_qname(value, last=True)
 
-                    rhombus["prefix"] = prefix
-                    rhombus["uri"] = uri
+                    rhombus.prefix = prefix
+                    rhombus.uri = uri
 
                     self.rhombuses[id] = rhombus
 
                     # Aditionally, an object "rhombus" is created per type defined
                     for t in types:
-                        self.rhombuses[id + t] = {}
-                        self.rhombuses[id + t]["xml_object"] = child
-                        self.rhombuses[id + t]["type"] = t
-                        self.rhombuses[id + t]["prefix"] = prefix
-                        self.rhombuses[id + t]["uri"] = uri
-                    types.append(rhombus["type"])
+                        rhombus_type = Rhombus(type=t, prefix=prefix, uri=uri)
+                        set_shape(rhombus_type, child)
+                        self.rhombuses[id + t] = rhombus_type
+                    types.append(rhombus.type)
 
                 except:
                     error = {
@@ -806,79 +856,84 @@ class Finder:
                     continue
 
                 if "owl:ObjectProperty" in types:
-                    if prefix + ":" + uri not in relation_uris:
+                    if not self.symbols.defines(
+                        "relations", prefix + ":" + uri
+                    ):
                         # There is an object property defined in a rhombus which has not been
                         # defined in a relation => add that object property to relations
-                        uri = re.sub(" ", "", uri)
-
-                        relation_aux = {}
-                        relation_aux["source"] = None
-                        relation_aux["target"] = None
-                        relation_aux["xml_object"] = child
-                        relation_aux["type"] = "owl:ObjectProperty"
-                        relation_aux["prefix"] = prefix
-                        relation_aux["uri"] = uri
-                        relation_aux["label"] = create_label(uri, "property")
-                        relation_aux["domain"] = False
-                        relation_aux["range"] = False
-                        relation_aux["allValuesFrom"] = False
-                        relation_aux["someValuesFrom"] = False
-                        relation_aux["hasValue"] = False
-                        relation_aux["min_cardinality"] = False
-                        relation_aux["max_cardinality"] = False
-                        relation_aux["cardinality"] = False
-                        relation_aux["functional"] = (
+                        relation_aux = Relation()
+                        relation_aux.source = None
+                        relation_aux.target = None
+                        relation_aux.id = id
+                        relation_aux.type = "owl:ObjectProperty"
+                        relation_aux.prefix = prefix
+                        relation_aux.uri = uri
+                        relation_aux.label = create_label(uri, "property")
+                        relation_aux.domain = False
+                        relation_aux.range = False
+                        relation_aux.allValuesFrom = False
+                        relation_aux.someValuesFrom = False
+                        relation_aux.hasValue = False
+                        relation_aux.min_cardinality = False
+                        relation_aux.max_cardinality = False
+                        relation_aux.cardinality = False
+                        relation_aux.functional = (
                             True
                             if "owl:FunctionalProperty" in types
                             else False
                         )
-                        relation_aux["inverse_functional"] = (
+                        relation_aux.inverse_functional = (
                             True
                             if "owl:InverseFunctionalProperty" in types
                             else False
                         )
-                        relation_aux["transitive"] = (
+                        relation_aux.transitive = (
                             True
                             if "owl:TransitiveProperty" in types
                             else False
                         )
-                        relation_aux["symmetric"] = (
+                        relation_aux.symmetric = (
                             True if "owl:SymmetricProperty" in types else False
                         )
 
-                        relation_uris.append(prefix + ":" + uri)
-
                         self.relations[id] = relation_aux
+                        self.prefixes.add("relations", prefix)
+                        self.symbols.add("relations", prefix + ":" + uri, id)
 
                 elif "owl:DatatypeProperty" in types:
-                    if prefix + ":" + uri not in attribute_uris:
-                        attribute = {}
-                        attribute_block = {}
-                        attribute_block["xml_object"] = child
-                        attribute["prefix"] = prefix
-                        attribute["uri"] = uri
-                        attribute["label"] = create_label(uri, "property")
-                        attribute["datatype"] = None
-                        attribute["functional"] = (
+                    if not self.symbols.defines(
+                        "attributes", prefix + ":" + uri
+                    ):
+                        attribute = Attribute()
+                        attribute_block = AttributeBlock()
+                        set_shape(attribute_block, child)
+                        attribute.prefix = prefix
+                        attribute.uri = uri
+                        attribute.label = create_label(uri, "property")
+                        attribute.datatype = None
+                        attribute.functional = (
                             True
                             if "owl:FunctionalProperty" in types
                             else False
                         )
-                        attribute["domain"] = False
-                        attribute["range"] = False
-                        attribute["allValuesFrom"] = False
-                        attribute["someValuesFrom"] = False
-                        attribute["hasValue"] = False
-                        attribute["min_cardinality"] = None
-                        attribute["max_cardinality"] = None
-                        attribute_block["attributes"] = [attribute]
-
-                        attribute_uris.append(prefix + ":" + uri)
+                        attribute.domain = False
+                        attribute.range = False
+                        attribute.allValuesFrom = False
+                        attribute.someValuesFrom = False
+                        attribute.hasValue = False
+                        attribute.min_cardinality = None
+                        attribute.max_cardinality = None
+                        attribute_block.attributes = [attribute]
 
                         self.attribute_blocks[id] = attribute_block
+                        self.prefixes.add("attributes", prefix)
+                        self.symbols.add(
+                            "attributes", prefix + ":" + uri, (id, 0)
+                        )
 
         return self.rhombuses, self.errors
 
+    @staged
     def find_hexagons(self):
         for child in self.root:
             id = child.attrib["id"]
@@ -887,46 +942,43 @@ class Finder:
             ellipse_corrupted = False
             try:
                 if "hexagon" in style:
-                    hexagon = {}
-                    hexagon["xml_object"] = child
+                    hexagon = Hexagon()
+                    set_shape(hexagon, child)
                     if "owl:AllDifferent" in value:
-                        hexagon["type"] = "owl:AllDifferent"
+                        hexagon.type = "owl:AllDifferent"
                     elif "owl:oneOf" in value:
-                        hexagon["type"] = "owl:oneOf"
+                        hexagon.type = "owl:oneOf"
 
                     # Find the associated concepts to this union / intersection restriction
-                    hexagon["group"] = []
+                    hexagon.group = []
 
                     for relation_id, relation in self.relations.items():
                         if "type" not in relation:
                             continue
-                        if relation["type"] == "ellipse_connection":
+                        if relation.type == "ellipse_connection":
                             # print("here")
-                            source_id = relation["source"]
+                            source_id = relation.source
                             if id == source_id:
-                                target_id = relation["target"]
+                                target_id = relation.target
                                 if target_id is None:
                                     error = {
                                         "message": "An arrow of an "
-                                        + hexagon["type"]
+                                        + hexagon.type
                                         + " is not connected to any shape, please check this",
                                         "shape_id": id,
                                     }
-                                    self.errors[hexagon["type"][4:]].append(
-                                        error
-                                    )
+                                    self.errors[hexagon.type[4:]].append(error)
                                 else:
-                                    hexagon["group"].append(target_id)
+                                    hexagon.group.append(target_id)
 
                     if (
-                        hexagon["type"] == "owl:AllDifferent"
-                        and len(hexagon["group"]) < 2
+                        hexagon.type == "owl:AllDifferent"
+                        and len(hexagon.group) < 2
                     ):
                         ellipse_corrupted = True
 
                     elif (
-                        hexagon["type"] == "owl:oneOf"
-                        and len(hexagon["group"]) < 1
+                        hexagon.type == "owl:oneOf" and len(hexagon.group) < 1
                     ):
                         error = {
                             "message": "An owl:oneOf is connected to less than one shape. A owl:oneOf needs at least one individual",
@@ -938,15 +990,20 @@ class Finder:
                     if ellipse_corrupted:
                         continue
 
-                    hexagon["xml_object"] = child
                     self.hexagons[id] = hexagon
             except:
                 continue
 
         return self.hexagons
 
+    @staged
     def find_concepts_and_attributes(self):
-        for child in self.root:
+        # The geometry of the cells is read once, and only the shapes that
+        # can be classes or attributes are indexed
+        geometries = CellGeometries(self.root)
+        classes_index = self.blocks_index(geometries)
+
+        for position, child in enumerate(self.root):
             id = child.attrib["id"]
             style = child.attrib["style"] if "style" in child.attrib else ""
             value = child.attrib["value"] if "value" in child.attrib else ""
@@ -956,15 +1013,7 @@ class Finder:
                 # Check that neither of these components passes, this is because concepts
                 # and attributes shape do not have a specific characteristic to differentiate them
                 # and we have to use the characteristics of the rest of the shapes
-                if "text" in style or "edgeLabel" in style:
-                    continue
-                if "edge" in child.attrib:
-                    continue
-                if "ellipse" in style:
-                    continue
-                if "rhombus" in style:
-                    continue
-                if "shape" in style:
+                if not is_block(child):
                     continue
                 if "fontStyle=4" in style or "<u>" in value:
                     continue
@@ -972,324 +1021,155 @@ class Finder:
                     continue"""
                 if "&quot;" in value:
                     continue
-                concept = {}
-                attribute_block = {}
-                attribute_block["xml_object"] = child
+                concept = Concept()
+                attribute_block = AttributeBlock()
+                set_shape(attribute_block, child)
+
+                p1, p2, p3, p4 = geometries.corners(position)
+
+                # We need to know if there is a block on top of the current block,
+                # that determines if we are dealing with a class or attributes.
+                # It is looked up in the index of the bottom-left corners
+                class_position = classes_index.first_near(p1)
+                if class_position is not None:
+                    child2 = self.root[class_position]
+                    attributes = []
+                    value = clean_html_tags(value)
+                    attribute_list = value.split("|")
+                    domain = (
+                        False if "dashed=1" in style else child2.attrib["id"]
+                    )
+                    for attribute_value in attribute_list:
+                        attribute = Attribute()
+                        attribute_value_cleaned = clean_uri(attribute_value)
+                        try:
+                            # get the prefix:uri
+                            attribute_value_split = (
+                                attribute_value_cleaned.split(" ")[0].strip()
+                            )
+                            # If the datatype has range => remove the last :
+                            if attribute_value_split[-1] == ":":
+                                attribute_value_split = attribute_value_split[
+                                    :-1
+                                ]
 
-                p1, p2, p3, p4 = get_corners_rect_child(child)
+                            (
+                                attribute.prefix,
+                                attribute.uri,
+                            ) = split_qname(attribute_value_split)
+                            attribute.label = create_label(
+                                attribute.uri, "property"
+                            )
 
-                # We need a second iteration because we need to know if there is a block
-                # on top of the current block, that determines if we are dealing with a class or attributes
-                for child2 in self.root:
-                    style2 = (
-                        child2.attrib["style"]
-                        if "style" in child2.attrib
-                        else ""
-                    )
-                    # Filter all the elements except attributes and classes
-                    if "text" in style2 or "edgeLabel" in style2:
-                        continue
-                    if "edge" in child2.attrib:
-                        continue
-                    if "ellipse" in style2:
-                        continue
-                    if "rhombus" in style2:
-                        continue
-                    if "shape" in style2:
-                        continue
+                        except:
+                            error = {
+                                "message": "Problems in the text of the attribute",
+                                "shape_id": id,
+                                "value": attribute_value_cleaned,
+                            }
+                            self.errors["Attributes"].append(error)
+                            continue
 
-                    (
-                        p1_support,
-                        p2_support,
-                        p3_support,
-                        p4_support,
-                    ) = get_corners_rect_child(child2)
-                    dx = abs(p1[0] - p2_support[0])
-                    dy = abs(p1[1] - p2_support[1])
-
-                    if dx < 5 and dy < 5:
-                        attributes = []
-                        value = clean_html_tags(value)
-                        attribute_list = value.split("|")
-                        domain = (
-                            False
-                            if "dashed=1" in style
-                            else child2.attrib["id"]
-                        )
-                        for attribute_value in attribute_list:
-                            attribute = {}
-                            attribute_value_cleaned = clean_uri(
-                                attribute_value
+                        try:
+                            prefix_datatype, datatype = split_datatype(
+                                attribute_value,
+                                attribute.prefix == BASE_PREFIX,
                             )
-                            try:
-                                # get the prefix:uri
-                                attribute_value_split = (
-                                    attribute_value_cleaned.split(" ")[
-                                        0
-                                    ].strip()
-                                )
-                                # If the datatype has range => remove the last :
-                                if attribute_value_split[-1] == ":":
-                                    attribute_value_split = (
-                                        attribute_value_split[:-1]
-                                    )
+                            attribute.datatype = datatype
+                            if datatype is not None:
+                                attribute.prefix_datatype = prefix_datatype
+                        except:
+                            error = {
+                                "message": "Problems in the datatype of the attribute",
+                                "shape_id": id,
+                                "value": attribute_value_cleaned,
+                            }
+                            self.errors["Attributes"].append(error)
+                            continue
 
-                                # In order to implement @base directive
-                                # If value contains ':' && value does not start with ':' => normal prefix
-                                # If value starts with ':' => empty prefix (which is the same as @base)
-                                # If value does not contain ':' => prefix is @base
-                                # If value contains ':' && value does not start with ':' => len(value_split) > 1 and value_split[0] != ""
-                                # If value starts with ':' => len(value_split) > 1 and value_split[0] == ""
-                                # If value does not contain ':' => len(value_split) == 1
+                        if (
+                            attribute.datatype is None
+                            or attribute.datatype == ""
+                        ):
+                            attribute.range = False
+                        else:
+                            attribute.range = True
 
-                                attribute_value_split = (
-                                    attribute_value_split.split(":")
-                                )
-                                if len(attribute_value_split) > 1:
-                                    # normal prefix || empty prefix (both are in namespace)
-                                    attribute[
-                                        "prefix"
-                                    ] = attribute_value_split[0].strip()
-                                    if attribute["prefix"] == "":
-                                        attribute[
-                                            "prefix"
-                                        ] = "cambiar_a_prefijo_vacio"
-                                    attribute["uri"] = attribute_value_split[
-                                        1
-                                    ].strip()
-                                else:
-                                    # prefix is @base
-                                    # store concept["prefix"] with an auxiliar name in order
-                                    # write the concepts with base directive in to write_concepts
-                                    attribute["prefix"] = "<cambiar_a_base"
-                                    attribute["uri"] = (
-                                        attribute_value_split[0].strip() + ">"
-                                    )
+                        attribute.domain = domain
 
-                                """print(attribute_value_cleaned.split(":"))
-                                attribute["prefix"] = attribute_value_cleaned.split(":")[0].strip()
-                                attribute["prefix"][0] # Check if error in text
-                                attribute["uri"] = attribute_value_cleaned.split(":")[1].strip()
+                        # The keywords of the attribute are found in one
+                        # scan, the names of the restrictions are only
+                        # accepted in the relations
+                        flags = label_flags(attribute_value)
 
-                                # Taking into account possible spaces in the uri of the concept
-                                attribute["uri"] = re.sub(" ", "", attribute["uri"])
+                        # Existential Universal restriction evaluation
+                        attribute.allValuesFrom = bool(flags & ALL_VALUES_FROM)
+                        attribute.someValuesFrom = bool(
+                            flags & SOME_VALUES_FROM
+                        )
 
-                                attribute["prefix"][1] # Check if error in text
-                                attribute["label"] = create_label(attribute["uri"], "property")"""
+                        # owl:hasValue
+                        # In these cases the object is a data value of the form
+                        # "data_value"^^prefix_datatype:datatype
+                        attribute.hasValue = bool(flags & HAS_VALUE)
+
+                        # class_description predicate restriction
+                        # A named class can be a subClass, an equivalentClass or disjointWith a class restriction
+                        # When the user wants to declare this relation, it is specified inside the "relation" in diagrams
+                        if flags & SUBCLASS_RESTRICTION:
+                            attribute.predicate_restriction = "rdfs:subClassOf"
+                        elif flags & EQUIVALENT_RESTRICTION:
+                            attribute.predicate_restriction = (
+                                "owl:equivalentClass"
+                            )
+                        elif flags & DISJOINT_RESTRICTION:
+                            attribute.predicate_restriction = (
+                                "owl:disjointWith"
+                            )
+                        else:
+                            attribute.predicate_restriction = "rdfs:subClassOf"
 
-                                attribute["uri"] = re.sub(
-                                    " ", "", attribute["uri"]
-                                )
-                                attribute["label"] = create_label(
-                                    attribute["uri"], "property"
-                                )
+                        attribute.functional = bool(flags & FUNCTIONAL)
 
-                            except:
-                                error = {
-                                    "message": "Problems in the text of the attribute",
-                                    "shape_id": id,
-                                    "value": attribute_value_cleaned,
-                                }
-                                self.errors["Attributes"].append(error)
-                                continue
+                        # Cardinality restriction evaluation
+                        try:
+                            (
+                                attribute.min_cardinality,
+                                attribute.max_cardinality,
+                            ) = find_cardinality(attribute_value)
+                        except:
+                            error = {
+                                "message": "Problems in cardinality definition",
+                                "shape_id": id,
+                                "value": attribute_value_cleaned,
+                            }
+                            self.errors["Attributes"].append(error)
+                            continue
 
-                            try:
-                                if attribute["prefix"] != "<cambiar_a_base":
-                                    if len(attribute_value.split(":")) > 2:
-                                        final_datatype = attribute_value.split(
-                                            ":"
-                                        )[-1].strip()
-                                        final_datatype = (
-                                            final_datatype[0].lower()
-                                            + final_datatype[1:]
-                                        )
-                                        attribute["datatype"] = final_datatype
-                                        if len(attribute_value.split(":")) > 3:
-                                            attribute[
-                                                "prefix_datatype"
-                                            ] = attribute_value.split(":")[
-                                                2
-                                            ].strip()
-                                            if (
-                                                attribute["prefix_datatype"]
-                                                == ""
-                                            ):
-                                                attribute[
-                                                    "prefix_datatype"
-                                                ] = "cambiar_a_prefijo_vacio"
-                                        else:
-                                            attribute[
-                                                "prefix_datatype"
-                                            ] = "xsd"
-                                    else:
-                                        attribute["datatype"] = None
+                        # If min_cardinality == 0 this means it is not necessary to create
+                        # a min_cardinality restrictions
+                        if attribute.min_cardinality == "0":
+                            attribute.min_cardinality = None
 
-                                else:
-                                    if len(attribute_value.split(":")) > 1:
-                                        final_datatype = attribute_value.split(
-                                            ":"
-                                        )[-1].strip()
-                                        final_datatype = (
-                                            final_datatype[0].lower()
-                                            + final_datatype[1:]
-                                        )
-                                        attribute["datatype"] = final_datatype
-                                        if len(attribute_value.split(":")) > 2:
-                                            attribute[
-                                                "prefix_datatype"
-                                            ] = attribute_value.split(":")[
-                                                1
-                                            ].strip()
-                                        else:
-                                            attribute[
-                                                "prefix_datatype"
-                                            ] = "xsd"
-                                    else:
-                                        attribute["datatype"] = None
-                            except:
-                                error = {
-                                    "message": "Problems in the datatype of the attribute",
-                                    "shape_id": id,
-                                    "value": attribute_value_cleaned,
-                                }
-                                self.errors["Attributes"].append(error)
-                                continue
-
-                            if (
-                                attribute["datatype"] is None
-                                or attribute["datatype"] == ""
-                            ):
-                                attribute["range"] = False
-                            else:
-                                attribute["range"] = True
-
-                            attribute["domain"] = domain
-
-                            # Existential Universal restriction evaluation
-                            if (
-                                "(all)" in attribute_value
-                                or "∀" in attribute_value
-                            ):
-                                attribute["allValuesFrom"] = True
-                            else:
-                                attribute["allValuesFrom"] = False
-
-                            if (
-                                "(some)" in attribute_value
-                                or "∃" in attribute_value
-                            ):
-                                attribute["someValuesFrom"] = True
-                            else:
-                                attribute["someValuesFrom"] = False
-
-                            # owl:hasValue
-                            if (
-                                "(value)" in attribute_value
-                                or "∋" in attribute_value
-                            ):
-                                # In these cases the object is a data value of the form
-                                # "data_value"^^prefix_datatype:datatype
-                                attribute["hasValue"] = True
-
-                            else:
-                                attribute["hasValue"] = False
-
-                            # class_description predicate restriction
-                            # A named class can be a subClass, an equivalentClass or disjointWith a class restriction
-                            # When the user wants to declare this relation, it is specified inside the "relation" in diagrams
-                            if "(sub)" in attribute_value:
-                                attribute[
-                                    "predicate_restriction"
-                                ] = "rdfs:subClassOf"
-                            elif "(eq)" in attribute_value:
-                                attribute[
-                                    "predicate_restriction"
-                                ] = "owl:equivalentClass"
-                            elif "(dis)" in attribute_value:
-                                attribute[
-                                    "predicate_restriction"
-                                ] = "owl:disjointWith"
-                            else:
-                                attribute[
-                                    "predicate_restriction"
-                                ] = "rdfs:subClassOf"
-
-                            attribute["functional"] = (
-                                True if "(F)" in attribute_value else False
-                            )
+                        # If max_cardinality == N this means it is not necessary to create
+                        # a max_cardinality restrictions
+                        if attribute.max_cardinality == "N":
+                            attribute.max_cardinality = None
 
-                            # Cardinality restriction evaluation
+                        # Check if min_cardinality represents a non negative integer
+                        if attribute.min_cardinality != None:
                             try:
-                                # max_min_card = re.findall("\(([0-9][^)]+)\)", attribute_value)
-                                max_min_card = re.findall(
-                                    r"\((\S*[.][.]\S*)\)", attribute_value
-                                )
-                                max_min_card = (
-                                    max_min_card[-1]
-                                    if len(max_min_card) > 0
-                                    else None
-                                )
-                                if max_min_card is None:
-                                    attribute["min_cardinality"] = None
-                                    attribute["max_cardinality"] = None
-                                else:
-                                    max_min_card = max_min_card.split("..")
-                                    attribute[
-                                        "min_cardinality"
-                                    ] = max_min_card[0]
-                                    attribute[
-                                        "max_cardinality"
-                                    ] = max_min_card[1]
-                            except:
-                                error = {
-                                    "message": "Problems in cardinality definition",
-                                    "shape_id": id,
-                                    "value": attribute_value_cleaned,
-                                }
-                                self.errors["Attributes"].append(error)
-                                continue
-
-                            # If min_cardinality == 0 this means it is not necessary to create
-                            # a min_cardinality restrictions
-                            if attribute["min_cardinality"] == "0":
-                                attribute["min_cardinality"] = None
-
-                            # If max_cardinality == N this means it is not necessary to create
-                            # a max_cardinality restrictions
-                            if attribute["max_cardinality"] == "N":
-                                attribute["max_cardinality"] = None
-
-                            # Check if min_cardinality represents a non negative integer
-                            if attribute["min_cardinality"] != None:
-                                try:
-                                    aux = float(attribute["min_cardinality"])
-                                    if not aux.is_integer() or aux < 0:
-                                        message = (
-                                            "min_cardinality is "
-                                            + attribute["min_cardinality"]
-                                            + " which is not a non negative integer, in restriction "
-                                            + attribute["prefix"]
-                                            + ":"
-                                            + attribute["uri"]
-                                        )
-                                        attribute["min_cardinality"] = None
-                                        error = {
-                                            "message": message,
-                                            "shape_id": id,
-                                            "value": attribute_value_cleaned,
-                                        }
-                                        self.errors[
-                                            "Cardinality-Restrictions"
-                                        ].append(error)
-
-                                except:
+                                aux = float(attribute.min_cardinality)
+                                if not aux.is_integer() or aux < 0:
                                     message = (
-                                        "min_cardinality is not a number, in attribute "
-                                        + attribute["prefix"]
+                                        "min_cardinality is "
+                                        + attribute.min_cardinality
+                                        + " which is not a non negative integer, in restriction "
+                                        + attribute.prefix
                                         + ":"
-                                        + attribute["uri"]
+                                        + attribute.uri
                                     )
-                                    attribute["min_cardinality"] = None
+                                    attribute.min_cardinality = None
                                     error = {
                                         "message": message,
                                         "shape_id": id,
@@ -1299,37 +1179,37 @@ class Finder:
                                         "Cardinality-Restrictions"
                                     ].append(error)
 
-                            if attribute["max_cardinality"] != None:
-                                # Check if max_cardinality represents a non negative integer
-                                try:
-                                    aux = float(attribute["max_cardinality"])
-                                    if not aux.is_integer() or aux < 0:
-                                        message = (
-                                            "max_cardinality is "
-                                            + attribute["max_cardinality"]
-                                            + " which is not a non negative integer, in restriction "
-                                            + attribute["prefix"]
-                                            + ":"
-                                            + attribute["uri"]
-                                        )
-                                        attribute["max_cardinality"] = None
-                                        error = {
-                                            "message": message,
-                                            "shape_id": id,
-                                            "value": attribute_value_cleaned,
-                                        }
-                                        self.errors[
-                                            "Cardinality-Restrictions"
-                                        ].append(error)
-
-                                except:
+                            except:
+                                message = (
+                                    "min_cardinality is not a number, in attribute "
+                                    + attribute.prefix
+                                    + ":"
+                                    + attribute.uri
+                                )
+                                attribute.min_cardinality = None
+                                error = {
+                                    "message": message,
+                                    "shape_id": id,
+                                    "value": attribute_value_cleaned,
+                                }
+                                self.errors["Cardinality-Restrictions"].append(
+                                    error
+                                )
+
+                        if attribute.max_cardinality != None:
+                            # Check if max_cardinality represents a non negative integer
+                            try:
+                                aux = float(attribute.max_cardinality)
+                                if not aux.is_integer() or aux < 0:
                                     message = (
-                                        "max_cardinality is not a number, in restriction "
-                                        + attribute["prefix"]
+                                        "max_cardinality is "
+                                        + attribute.max_cardinality
+                                        + " which is not a non negative integer, in restriction "
+                                        + attribute.prefix
                                         + ":"
-                                        + attribute["uri"]
+                                        + attribute.uri
                                     )
-                                    attribute["max_cardinality"] = None
+                                    attribute.max_cardinality = None
                                     error = {
                                         "message": message,
                                         "shape_id": id,
@@ -1339,34 +1219,14 @@ class Finder:
                                         "Cardinality-Restrictions"
                                     ].append(error)
 
-                            if (
-                                attribute["min_cardinality"]
-                                == attribute["max_cardinality"]
-                            ):
-                                attribute["cardinality"] = attribute[
-                                    "min_cardinality"
-                                ]
-                                attribute["min_cardinality"] = None
-                                attribute["max_cardinality"] = None
-                            else:
-                                attribute["cardinality"] = None
-
-                            # max_cardinality must be greater than min_cardinality
-                            if (
-                                attribute["max_cardinality"] != None
-                                and attribute["min_cardinality"] != None
-                                and float(attribute["max_cardinality"])
-                                < float(attribute["min_cardinality"])
-                            ):
+                            except:
                                 message = (
-                                    "max_cardinality is lower than min_cardinality"
-                                    + " in restriction "
-                                    + attribute["prefix"]
+                                    "max_cardinality is not a number, in restriction "
+                                    + attribute.prefix
                                     + ":"
-                                    + attribute["uri"]
+                                    + attribute.uri
                                 )
-                                attribute["max_cardinality"] = None
-                                attribute["min_cardinality"] = None
+                                attribute.max_cardinality = None
                                 error = {
                                     "message": message,
                                     "shape_id": id,
@@ -1376,15 +1236,54 @@ class Finder:
                                     error
                                 )
 
-                            attributes.append(attribute)
+                        if (
+                            attribute.min_cardinality
+                            == attribute.max_cardinality
+                        ):
+                            attribute.cardinality = attribute.min_cardinality
+                            attribute.min_cardinality = None
+                            attribute.max_cardinality = None
+                        else:
+                            attribute.cardinality = None
 
-                        attribute_block["attributes"] = attributes
-                        attribute_block["concept_associated"] = child2.attrib[
-                            "id"
-                        ]
-                        self.attribute_blocks[id] = attribute_block
-                        attributes_found = True
-                        break
+                        # max_cardinality must be greater than min_cardinality
+                        if (
+                            attribute.max_cardinality != None
+                            and attribute.min_cardinality != None
+                            and float(attribute.max_cardinality)
+                            < float(attribute.min_cardinality)
+                        ):
+                            message = (
+                                "max_cardinality is lower than min_cardinality"
+                                + " in restriction "
+                                + attribute.prefix
+                                + ":"
+                                + attribute.uri
+                            )
+                            attribute.max_cardinality = None
+                            attribute.min_cardinality = None
+                            error = {
+                                "message": message,
+                                "shape_id": id,
+                                "value": attribute_value_cleaned,
+                            }
+                            self.errors["Cardinality-Restrictions"].append(
+                                error
+                            )
+
+                        attributes.append(attribute)
+
+                    attribute_block.attributes = attributes
+                    attribute_block.concept_associated = child2.attrib["id"]
+                    self.attribute_blocks[id] = attribute_block
+                    for idx, attribute in enumerate(attributes):
+                        self.prefixes.add("attributes", attribute.prefix)
+                        self.symbols.add(
+                            "attributes",
+                            attribute.prefix + ":" + attribute.uri,
+                            (id, idx),
+                        )
+                    attributes_found = True
                 # If after a dense one to all evaluation the object selected cannot be associated
                 # to any other object it means that it is a class
                 # value = clean_html_tags(value).strip()
@@ -1404,12 +1303,8 @@ class Finder:
                         continue
 
                     # Other option is to verify things like functionality, some, all, etc.
-                    if (
-                        "(F)" in value
-                        or "(some)" in value
-                        or "(all)" in value
-                        or "∀" in value
-                        or "∃" in value
+                    if label_flags(value) & (
+                        FUNCTIONAL | SOME_VALUES_FROM | ALL_VALUES_FROM
                     ):
                         error = {
                             "message": "Attributes not attached to any concept",
@@ -1444,42 +1339,10 @@ class Finder:
 
                     value = clean_html_tags(value)
                     try:
-                        # In order to implement @base directive
-                        # If value contains ':' && value does not start with ':' => normal prefix
-                        # If value starts with ':' => empty prefix (which is the same as @base)
-                        # If value does not contain ':' => prefix is @base
-                        # If value contains ':' && value does not start with ':' => len(value_split) > 1 and value_split[0] != ""
-                        # If value starts with ':' => len(value_split) > 1 and value_split[0] == ""
-                        # If value does not contain ':' => len(value_split) == 1
-
-                        value_split = value.split(":")
-                        if len(value_split) > 1:
-                            # normal prefix || empty prefix (both are in namespace)
-                            concept["prefix"] = value_split[0].strip()
-                            if concept["prefix"] == "":
-                                concept["prefix"] = "cambiar_a_prefijo_vacio"
-                            concept["uri"] = value_split[1].strip()
-                        else:
-                            # prefix is @base
-                            # store concept["prefix"] with an auxiliar name in order
-                            # write the concepts with base directive in to write_concepts
-                            concept["prefix"] = "<cambiar_a_base"
-                            concept["uri"] = value_split[0].strip() + ">"
-
-                        """#Como estaba hecho antes
-                        concept["prefix"] = value.split(":")[0].strip()
-                        concept["uri"] = value.split(":")[1].strip()
-
-                        concept["prefix"][0] # Check if error
-                        concept["uri"][1] # Check if error"""
+                        concept.prefix, concept.uri = split_qname(value)
 
-                        # Taking into account possible spaces in the uri of the concept
-                        concept["uri"] = re.sub(" ", "", concept["uri"])
-
-                        concept["label"] = create_label(
-                            concept["uri"], "class"
-                        )
-                        concept["xml_object"] = child
+                        concept.label = create_label(concept.uri, "class")
+                        set_shape(concept, child)
                     except:
                         error = {
                             "message": "Problems in text of the concept",
@@ -1490,11 +1353,12 @@ class Finder:
                         continue
 
                     self.concepts[id] = concept
+                    self.prefixes.add("concepts", concept.prefix)
 
                 elif not attributes_found and value == "":
-                    anonymousClass = {}
-                    anonymousClass["xml_object"] = child
-                    anonymousClass["relations"] = []
+                    anonymousClass = AnonymousClass()
+                    set_shape(anonymousClass, child)
+                    anonymousClass.relations = []
                     self.anonimous_classes[id] = anonymousClass
 
             except:
@@ -1506,6 +1370,7 @@ class Finder:
     def find_elements(self):
         namespaces = self.find_namespaces()
         metadata = self.find_metadata()
+        self.snap_edge_ends()
         relations = self.find_relations()
         ellipses = self.find_ellipses()
         hexagons = self.find_hexagons()
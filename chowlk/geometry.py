@@ -1,3 +1,7 @@
+import math
+from array import array
+
+
 def get_corners(x, y, width, height):
     p1 = (x, y)
     p2 = (x, y + height)
@@ -19,6 +23,47 @@ def get_corners_rect_child(child_element):
     return p1, p2, p3, p4
 
 
+def get_geometry(child_element):
+    # Returns x, y, width and height of a shape, None for the missing values
+    try:
+        geometry = child_element[0].attrib
+    except IndexError:
+        return None, None, None, None
+
+    return tuple(
+        float(geometry[key]) if key in geometry else None
+        for key in ("x", "y", "width", "height")
+    )
+
+
+def get_corners_rect(shape):
+    # Same as get_corners_rect_child, for the geometry stored in a Shape record
+    x = shape.x if shape.x is not None else 0
+    y = shape.y if shape.y is not None else 0
+    p1, p2, p3, p4 = get_corners(x, y, shape.width, shape.height)
+
+    return p1, p2, p3, p4
+
+
+def get_edge_ends(edge_element):
+    # Returns the source and target points of an edge, which draw.io keeps
+    # for the ends that are not attached to a shape, None for the missing ones
+    ends = {}
+    try:
+        geometry = edge_element[0]
+    except IndexError:
+        return None, None
+    for point in geometry.iter("mxPoint"):
+        end = point.attrib.get("as")
+        if end in ("sourcePoint", "targetPoint"):
+            ends[end] = (
+                float(point.attrib.get("x", 0)),
+                float(point.attrib.get("y", 0)),
+            )
+
+    return ends.get("sourcePoint"), ends.get("targetPoint")
+
+
 def proximity_to_shape(point, xml_shape, thr):
     p1, _, _, p4 = get_corners_rect_child(xml_shape)
 
@@ -34,3 +79,244 @@ def proximity_to_shape(point, xml_shape, thr):
         near = False
 
     return near
+
+
+class CellGeometries:
+    """
+    x, y, width and height of every cell of a diagram, read once into arrays
+    indexed by the position of the cell in the diagram. The geometry of a
+    cell is not valid when get_corners_rect_child can not read it (a cell
+    without geometry, width or height, or with a value that is not a number).
+    """
+
+    def __init__(self, cells):
+        self.x = array("d")
+        self.y = array("d")
+        self.width = array("d")
+        self.height = array("d")
+        self.valid = bytearray()
+        for cell in cells:
+            try:
+                geometry = cell[0].attrib
+                x = float(geometry["x"]) if "x" in geometry else 0
+                y = float(geometry["y"]) if "y" in geometry else 0
+                width = float(geometry["width"])
+                height = float(geometry["height"])
+            except (IndexError, KeyError, ValueError):
+                x = y = width = height = 0
+                self.valid.append(0)
+            else:
+                self.valid.append(1)
+            self.x.append(x)
+            self.y.append(y)
+            self.width.append(width)
+            self.height.append(height)
+
+    def corners(self, position):
+        # Same as get_corners_rect_child for the cell in the position
+        if not self.valid[position]:
+            raise ValueError("The cell has no valid geometry")
+        return get_corners(
+            self.x[position],
+            self.y[position],
+            self.width[position],
+            self.height[position],
+        )
+
+    def center(self, position):
+        if not self.valid[position]:
+            raise ValueError("The cell has no valid geometry")
+        return (
+            self.x[position] + self.width[position] / 2,
+            self.y[position] + self.height[position] / 2,
+        )
+
+    def shape_index(self, positions, threshold=10):
+        """ShapeIndex of the cells in the given positions."""
+        return ShapeIndex(
+            [
+                (
+                    self.x[position],
+                    self.y[position],
+                    self.width[position],
+                    self.height[position],
+                )
+                if self.valid[position]
+                else None
+                for position in positions
+            ],
+            positions,
+            threshold,
+        )
+
+    def bottom_left_index(self, positions, threshold=5):
+        """CornerIndex of the bottom-left corners of the cells in the given
+        positions."""
+        return CornerIndex(
+            [
+                (self.x[position], self.y[position] + self.height[position])
+                if self.valid[position]
+                else None
+                for position in positions
+            ],
+            positions,
+            threshold,
+        )
+
+
+class CornerIndex:
+    """
+    Index of points, like the corners of a list of shapes, that finds the
+    first one, in the order of the list, closer than a threshold to a given
+    point in both axes. The points are kept in a grid of squares of the size
+    of the threshold, so only the points of the nine squares around the
+    given one are compared with it, instead of every point.
+
+    The shapes without a valid geometry are None. Like when the shapes were
+    compared one by one and reading the corners of one of them failed, a
+    search fails with ValueError if one of them comes before the first point
+    found.
+    """
+
+    def __init__(self, points, keys=None, threshold=5):
+        self.keys = list(range(len(points))) if keys is None else list(keys)
+        self.threshold = threshold
+        self.grid = {}
+        self.first_invalid = None
+        for order, point in enumerate(points):
+            if point is None:
+                if self.first_invalid is None:
+                    self.first_invalid = order
+                continue
+            x, y = point
+            # Points that are not finite are never close to any other
+            if not (math.isfinite(x) and math.isfinite(y)):
+                continue
+            self.grid.setdefault(self.square(x, y), []).append((order, x, y))
+
+    def square(self, x, y):
+        return math.floor(x / self.threshold), math.floor(y / self.threshold)
+
+    def first_near(self, point):
+        """Key of the first point closer than the threshold to the given one
+        in both axes, or None."""
+        found = None
+        x, y = point
+        if math.isfinite(x) and math.isfinite(y):
+            column, row = self.square(x, y)
+            for square in [
+                (column + i, row + j) for i in (-1, 0, 1) for j in (-1, 0, 1)
+            ]:
+                for order, x2, y2 in self.grid.get(square, ()):
+                    if found is not None and order > found:
+                        break
+                    if (
+                        abs(x - x2) < self.threshold
+                        and abs(y - y2) < self.threshold
+                    ):
+                        found = order
+                        break
+
+        if self.first_invalid is not None and (
+            found is None or self.first_invalid < found
+        ):
+            raise ValueError("A shape has no valid geometry")
+
+        return None if found is None else self.keys[found]
+
+
+class ShapeIndex:
+    """
+    Index of rectangles, like the shapes of a diagram, that finds the nearest
+    one to a point among those closer than a threshold to it (a point inside
+    a rectangle is at distance 0). The rectangles, grown by the threshold,
+    are kept in a grid of squares about the size of the usual rectangle, so
+    only the few rectangles of the square of the given point are compared
+    with it, instead of every rectangle.
+
+    Rectangles that would cover too many squares, like a container around
+    the whole diagram, are compared with every point instead. Among the
+    rectangles at the same distance, the last one is returned, since it is
+    drawn over the others. Rectangles that are None are never found.
+    """
+
+    # Squares covered by a rectangle above which it is compared with every
+    # point instead of being added to the grid
+    MAX_SQUARES = 16
+
+    def __init__(self, rectangles, keys=None, threshold=10):
+        self.keys = (
+            list(range(len(rectangles))) if keys is None else list(keys)
+        )
+        self.threshold = threshold
+        bounds = []
+        for order, rectangle in enumerate(rectangles):
+            if rectangle is None:
+                continue
+            x, y, width, height = rectangle
+            bound = (order, x, y, x + width, y + height)
+            # Rectangles that are not finite are never close to any point
+            if all(math.isfinite(value) for value in bound[1:]):
+                bounds.append(bound)
+
+        sizes = sorted(
+            max(right - left, bottom - top)
+            for _, left, top, right, bottom in bounds
+        )
+        median = sizes[len(sizes) // 2] if sizes else 0
+        self.size = max(median, threshold, 1)
+        self.grid = {}
+        self.large = []
+        for bound in bounds:
+            order, left, top, right, bottom = bound
+            first_column, first_row = self.square(
+                left - threshold, top - threshold
+            )
+            last_column, last_row = self.square(
+                right + threshold, bottom + threshold
+            )
+            squares = (last_column - first_column + 1) * (
+                last_row - first_row + 1
+            )
+            if squares > self.MAX_SQUARES:
+                self.large.append(bound)
+                continue
+            for column in range(first_column, last_column + 1):
+                for row in range(first_row, last_row + 1):
+                    self.grid.setdefault((column, row), []).append(bound)
+
+    def square(self, x, y):
+        return math.floor(x / self.size), math.floor(y / self.size)
+
+    def nearest(self, point, avoid=None):
+        """Key of the nearest rectangle closer than the threshold to the
+        point, or None. Rectangles that contain the point avoid, like the
+        shape at the other end of an edge, are not found."""
+        x, y = point
+        if not (math.isfinite(x) and math.isfinite(y)):
+            return None
+
+        found = None
+        found_distance = None
+        for bounds in (self.grid.get(self.square(x, y), ()), self.large):
+            for order, left, top, right, bottom in bounds:
+                if (
+                    avoid is not None
+                    and left <= avoid[0] <= right
+                    and top <= avoid[1] <= bottom
+                ):
+                    continue
+                distance = math.hypot(
+                    max(left - x, 0, x - right), max(top - y, 0, y - bottom)
+                )
+                if distance > self.threshold:
+                    continue
+                if (
+                    found is None
+                    or distance < found_distance
+                    or (distance == found_distance and order > found)
+                ):
+                    found = order
+                    found_distance = distance
+
+        return None if found is None else self.keys[found]
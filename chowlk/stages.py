@@ -0,0 +1,289 @@
+"""Hooks around the stages of a conversion.
+
+The stages of the pipeline (reading the diagram, each find_* method of the
+Finder, the associations, each write_* function, and the rdflib parse and
+serialization) run inside `stage(name)`. Hooks added with `recording` are
+entered around every stage, so anything spent in each stage can be measured
+(see StageTimes, StageProfile and MemoryProfile). Without hooks a stage only
+costs a check of the list.
+"""
+
+import contextlib
+import functools
+import os
+import time
+import tracemalloc
+
+# Functions that take the name of a stage and return a context manager,
+# entered while the stage runs
+hooks = []
+
+# Frames that tracemalloc has to keep per allocation for MemoryProfile, so
+# that the chowlk line behind an allocation made deep inside rdflib, bs4 or
+# copy is still in the traceback
+MEMORY_FRAMES = 64
+
+PACKAGE_PATH = os.path.dirname(os.path.abspath(__file__))
+STDLIB_PATH = os.path.dirname(os.path.abspath(contextlib.__file__))
+
+
+@contextlib.contextmanager
+def stage(name):
+    if not hooks:
+        yield
+        return
+
+    with contextlib.ExitStack() as stack:
+        for hook in list(hooks):
+            stack.enter_context(hook(name))
+        yield
+
+
+def staged(function):
+    """Decorator that runs a function as a stage named after it."""
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if not hooks:
+            return function(*args, **kwargs)
+        with stage(function.__name__):
+            return function(*args, **kwargs)
+
+    return wrapper
+
+
+@contextlib.contextmanager
+def recording(hook):
+    hooks.append(hook)
+    try:
+        yield hook
+    finally:
+        hooks.remove(hook)
+
+
+class StageTimes:
+    """Hook that adds up the wall time spent in each stage."""
+
+    def __init__(self):
+        self.times = {}
+
+    @contextlib.contextmanager
+    def __call__(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.times[name] = (
+                self.times.get(name, 0.0) + time.perf_counter() - start
+            )
+
+
+class StageProfile:
+    """
+    Hook that records the wall time, the CPU time and, when tracemalloc is
+    tracing, the memory allocated in each stage: the memory still allocated
+    when the stage ends and the peak reached during the stage, both relative
+    to the memory allocated when the stage started.
+    """
+
+    def __init__(self):
+        self.stages = {}
+
+    @contextlib.contextmanager
+    def __call__(self, name):
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            memory_start, _ = tracemalloc.get_traced_memory()
+            # The peak can only be measured per stage from python 3.9
+            if hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            stage = self.stages.setdefault(
+                name, {"wall": 0.0, "cpu": 0.0, "allocated": 0, "peak": 0}
+            )
+            stage["wall"] += time.perf_counter() - wall_start
+            stage["cpu"] += time.process_time() - cpu_start
+            if tracing:
+                memory, peak = tracemalloc.get_traced_memory()
+                stage["allocated"] += memory - memory_start
+                if hasattr(tracemalloc, "reset_peak"):
+                    stage["peak"] = max(stage["peak"], peak - memory_start)
+
+    def report(self):
+        """Breakdown of the stages recorded, in the order they first ran."""
+        wall = sum(stage["wall"] for stage in self.stages.values())
+        cpu = sum(stage["cpu"] for stage in self.stages.values())
+        lines = [
+            "{:<36}{:>11}{:>7}{:>11}{:>13}{:>13}".format(
+                "stage", "wall ms", "%", "cpu ms", "alloc KiB", "peak KiB"
+            )
+        ]
+        for name, stage in self.stages.items():
+            lines.append(
+                "{:<36}{:>11.2f}{:>7.1f}{:>11.2f}{:>13.1f}{:>13.1f}".format(
+                    name,
+                    stage["wall"] * 1000,
+                    stage["wall"] / (wall or 1.0) * 100,
+                    stage["cpu"] * 1000,
+                    stage["allocated"] / 1024,
+                    stage["peak"] / 1024,
+                )
+            )
+        lines.append(
+            "{:<36}{:>11.2f}{:>7.1f}{:>11.2f}".format(
+                "total", wall * 1000, 100.0, cpu * 1000
+            )
+        )
+
+        return "\n".join(lines)
+
+    def as_dict(self):
+        """The stages recorded, as a dict that can be saved as json."""
+        return {
+            "stages": {
+                name: dict(stage) for name, stage in self.stages.items()
+            }
+        }
+
+
+def short_filename(filename):
+    # Paths relative to the repository, to site-packages or to the standard
+    # library, so the reports of different machines can be aggregated
+    repository_path = os.path.dirname(PACKAGE_PATH)
+    if filename.startswith(repository_path + os.sep):
+        return os.path.relpath(filename, repository_path)
+    if "site-packages" + os.sep in filename:
+        return filename.split("site-packages" + os.sep, 1)[1]
+    if filename.startswith(STDLIB_PATH + os.sep):
+        return os.path.relpath(filename, STDLIB_PATH)
+    return filename
+
+
+class MemoryProfile(StageProfile):
+    """
+    StageProfile that also takes a tracemalloc snapshot when each stage ends,
+    to find the lines that allocated the memory the stage retained. Each
+    allocation site is the innermost chowlk line of the traceback (like the
+    deepcopy in enrich_properties) together with the line that actually
+    allocated the memory (inside copy, bs4, rdflib...).
+
+    A stage is compared with the snapshot of the stage that ended before it,
+    so the little memory allocated between two stages counts in the second.
+    tracemalloc has to be tracing with MEMORY_FRAMES frames. Snapshots are
+    slow, this is meant for profiling, not for every conversion.
+    """
+
+    def __init__(self, top=10):
+        super().__init__()
+        self.top = top
+        # Per stage, bytes and blocks retained per allocation site
+        self.sites = {}
+        # Highest memory traced while a stage ran
+        self.peak = 0
+        # Size and count of the traces of the last snapshot per traceback
+        self.last_traces = None
+
+    def take_traces(self):
+        snapshot = tracemalloc.take_snapshot()
+        return {
+            statistic.traceback: (statistic.size, statistic.count)
+            for statistic in snapshot.statistics("traceback")
+        }
+
+    def site(self, traceback):
+        """The innermost chowlk line and the line that allocated the memory
+        of a traceback, or None for the memory of the hooks themselves."""
+        frames = list(traceback)
+        if frames[-1].filename in (tracemalloc.__file__, contextlib.__file__):
+            return None
+        chowlk_frames = [
+            frame
+            for frame in frames
+            if frame.filename.startswith(PACKAGE_PATH + os.sep)
+        ]
+        if chowlk_frames and chowlk_frames[-1].filename == __file__:
+            return None
+        caller = chowlk_frames[-1] if chowlk_frames else frames[0]
+        return (
+            f"{short_filename(caller.filename)}:{caller.lineno}",
+            "{}:{}".format(
+                short_filename(frames[-1].filename), frames[-1].lineno
+            ),
+        )
+
+    @contextlib.contextmanager
+    def __call__(self, name):
+        if not tracemalloc.is_tracing():
+            with super().__call__(name):
+                yield
+            return
+
+        if self.last_traces is None:
+            self.last_traces = self.take_traces()
+        before = self.last_traces
+        try:
+            with super().__call__(name):
+                yield
+        finally:
+            _, peak = tracemalloc.get_traced_memory()
+            self.peak = max(self.peak, peak)
+            after = self.last_traces = self.take_traces()
+            sites = self.sites.setdefault(name, {})
+            for traceback, (size, count) in after.items():
+                size_before, count_before = before.get(traceback, (0, 0))
+                if size <= size_before:
+                    continue
+                # The memory of the snapshots and of the context managers of
+                # the stages is skipped here, filtering the snapshots is much
+                # slower
+                key = self.site(traceback)
+                if key is None:
+                    continue
+                site = sites.setdefault(key, [0, 0])
+                site[0] += size - size_before
+                site[1] += count - count_before
+
+    def top_sites(self, name):
+        sites = sorted(
+            self.sites.get(name, {}).items(), key=lambda x: -x[1][0]
+        )
+        return [
+            {
+                "line": line,
+                "allocated_in": allocated_in,
+                "bytes": size,
+                "blocks": blocks,
+            }
+            for (line, allocated_in), (size, blocks) in sites[: self.top]
+        ]
+
+    def report(self):
+        """Breakdown of the stages, followed by the sites that retained the
+        most memory in each stage."""
+        lines = [super().report()]
+        for name in self.stages:
+            sites = self.top_sites(name)
+            if not sites:
+                continue
+            lines.append("\n" + name)
+            for site in sites:
+                lines.append(
+                    "  {:>10.1f} KiB  {} ({})".format(
+                        site["bytes"] / 1024,
+                        site["line"],
+                        site["allocated_in"],
+                    )
+                )
+
+        return "\n".join(lines)
+
+    def as_dict(self):
+        report = super().as_dict()
+        report["peak"] = self.peak
+        for name, stage in report["stages"].items():
+            stage["sites"] = self.top_sites(name)
+        return report
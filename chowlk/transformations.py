@@ -1,16 +1,45 @@
 import sys
 import tempfile
 
-import rdflib
-
-from chowlk.anonymousClass import *
-from chowlk.associations import *
-from chowlk.finding import *
-from chowlk.utils import *
-from chowlk.writer import *
-
-
-def transform_ontology(root):
+from chowlk.anonymousClass import find_relations_anonymous_classes
+from chowlk.associations import (
+    concept_attribute_association,
+    concept_relation_association,
+    enrich_properties,
+    index_symbols,
+    individual_attribute_association,
+    individual_relation_association,
+    individual_type_identification,
+    individual_type_identification_rdf,
+    resolve_concept_reference,
+)
+from chowlk.finding import Finder
+from chowlk.stages import stage
+from chowlk.writer import (
+    get_ttl_template,
+    write_concepts,
+    write_data_properties,
+    write_general_axioms,
+    write_instances,
+    write_object_properties,
+    write_ontology_metadata,
+    write_triplets,
+)
+
+
+def transform_ontology(root, formats=("turtle", "xml"), destinations=None):
+    # The ontology is serialized only in the given rdflib formats. It returns
+    # one string per format, followed by the new namespaces and the errors.
+    # With destinations (one path per format), each ontology is written to
+    # its path instead of being kept in memory, and the paths are returned
+    # instead of the strings.
+    # The tree can be passed inside a list, which is emptied, so that this
+    # function holds the only reference to it and can release it before the
+    # associations. A tree passed as is stays alive until the conversion
+    # ends, since before Python 3.11 the caller keeps a reference to the
+    # arguments of a call while it runs
+    if isinstance(root, list):
+        root = root.pop()
     finder = Finder(root)
     (
         concepts,
@@ -48,12 +77,25 @@ def transform_ontology(root):
     values = finder.find_attribute_values()
     """print("\n values")
     print(values)"""
+
+    # The elements only keep the ids and geometry they need from the diagram,
+    # so the xml tree is released before the association and writer stages
+    finder.root = None
+    del root
+
     relations, attribute_blocks = enrich_properties(
-        rhombuses, relations, attribute_blocks, concepts, errors
+        rhombuses,
+        relations,
+        attribute_blocks,
+        concepts,
+        errors,
+        finder.prefixes,
+        finder.symbols,
     )
-    prefixes_identified = find_prefixes(
-        concepts, relations, attribute_blocks, individuals
+    symbols = index_symbols(
+        finder.symbols, concepts, relations, individuals, errors
     )
+    prefixes_identified = list(finder.prefixes)
     attribute_blocks = resolve_concept_reference(attribute_blocks, concepts)
     associations = concept_attribute_association(concepts, attribute_blocks)
     associations, relations = concept_relation_association(
@@ -93,6 +135,7 @@ def transform_ontology(root):
         hexagons,
         individuals,
         errors,
+        symbols,
     )
     file = write_data_properties(file, attribute_blocks, concepts)
     """print("\n hexagons")
@@ -107,6 +150,7 @@ def transform_ontology(root):
         errors,
         relations,
         anonimous_classes,
+        symbols,
     )
     file = write_instances(file, individuals)
     file = write_triplets(file, individuals, associations_individuals, values)
@@ -117,8 +161,10 @@ def transform_ontology(root):
     # print(file.read())
     # file.seek(os.SEEK_SET)
 
-    turtle_output_file = tempfile.NamedTemporaryFile()
-    xml_output_file = tempfile.NamedTemporaryFile()
+    if destinations is None:
+        output_files = [tempfile.NamedTemporaryFile() for _ in formats]
+    else:
+        output_files = [open(path, "w+b") for path in destinations]
 
     file.seek(0)
     file_read = file.read()
@@ -141,17 +187,23 @@ def transform_ontology(root):
     f.close()"""
 
     try:
-        g = rdflib.Graph()
-        g.parse(data=file_read, format="turtle")
-
-        g.serialize(destination=turtle_output_file, format="turtle")
-        g.serialize(destination=xml_output_file, format="xml")
-
-        turtle_output_file.seek(0)
-        xml_output_file.seek(0)
-
-        turtle_string = turtle_output_file.read().decode("utf-8")
-        xml_string = xml_output_file.read().decode("utf-8")
+        # rdflib is only imported here, as importing it (and its plugins) is
+        # a large part of the startup time of the converter
+        import rdflib
+
+        with stage("parse"):
+            g = rdflib.Graph()
+            g.parse(data=file_read, format="turtle")
+
+        ontology_strings = []
+        with stage("serialize"):
+            for format, output_file in zip(formats, output_files):
+                g.serialize(
+                    destination=output_file, format=format, encoding="utf-8"
+                )
+                if destinations is None:
+                    output_file.seek(0)
+                    ontology_strings.append(output_file.read().decode("utf-8"))
 
     except:
         errors["Syntax"] = {
@@ -160,10 +212,19 @@ def transform_ontology(root):
             + str(sys.exc_info()[1])
         }
 
-        turtle_string = file_read
-        xml_string = file_read
+        ontology_strings = [file_read for _ in formats]
+        if destinations is not None:
+            for output_file in output_files:
+                output_file.seek(0)
+                output_file.truncate()
+                output_file.write(file_read.encode("utf-8"))
+
+    for output_file in output_files:
+        output_file.close()
+    if destinations is not None:
+        ontology_strings = list(destinations)
 
-    return turtle_string, xml_string, new_namespaces, errors
+    return (*ontology_strings, new_namespaces, errors)
 
 
 """def transform_rdf(root):
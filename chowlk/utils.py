@@ -1,33 +1,40 @@
 import base64
+import functools
+import io
 import re
 import xml.etree.ElementTree as ET
 import zlib
 from urllib.parse import unquote
 
-from bs4 import BeautifulSoup
+from chowlk.stages import staged
 
+# Labels are cached for the whole process, the same uris appear many times
+# in a diagram (pages, rhombuses) and across the diagrams converted by the
+# service. The statistics are available through create_label.cache_info()
+LABEL_CACHE_SIZE = 4096
+WORDS_PATTERN = re.compile(r"^[^A-Z]+|[A-Z][^A-Z]*")
 
-def create_label(uri, type):
-    uppers_pos = []
-    for i, char in enumerate(uri):
-        if char.isupper():
-            uppers_pos.append(i)
-    uppers_pos.insert(0, 0) if 0 not in uppers_pos else uppers_pos
-    words = []
-
-    for i, current_pos in enumerate(uppers_pos):
-        if i + 1 < len(uppers_pos):
-            next_pos = uppers_pos[i + 1]
-            word = uri[current_pos:next_pos]
-        else:
-            word = uri[current_pos:]
 
-        word = word.lower() if type == "property" else word
-        words.append(word)
+@functools.lru_cache(maxsize=LABEL_CACHE_SIZE)
+def create_label(uri, type):
+    # The label is made of the words of the camelCase uri
+    if uri.isascii():
+        words = WORDS_PATTERN.findall(uri)
+    else:
+        # The pattern only knows ascii uppercase letters
+        uppers_pos = [i for i, char in enumerate(uri) if char.isupper()]
+        if 0 not in uppers_pos:
+            uppers_pos.insert(0, 0)
+        words = [
+            uri[current_pos:next_pos]
+            for current_pos, next_pos in zip(
+                uppers_pos, uppers_pos[1:] + [None]
+            )
+        ]
 
     label = " ".join(words)
 
-    return label
+    return label.lower() if type == "property" else label
 
 
 def clean_html_tags(text, metadata=False):
@@ -46,14 +53,94 @@ def clean_html_tags(text, metadata=False):
     for tag in html_tags:
         text = re.sub(tag, "", text)
 
+    # Text without tags or entities is returned as is by BeautifulSoup (unless
+    # it is only whitespace), so bs4 is only imported for values with html
+    if "<" not in text and "&" not in text and text.strip():
+        return text
+
+    from bs4 import BeautifulSoup
+
     soup = BeautifulSoup(text, "html.parser")
     text = soup.get_text("|")
     return text
 
 
-def read_drawio_xml(diagram_path):
-    tree = ET.parse(diagram_path)
-    mxfile = tree.getroot()
+class DiagramTooLarge(Exception):
+    """The compressed diagram inflates to more bytes than allowed."""
+
+
+class DiagramTooComplex(Exception):
+    """The diagram has more cells or deeper nesting than allowed."""
+
+
+class DiagramLimits:
+    """Limits checked by read_drawio_xml while it reads a diagram. None means
+    that there is no limit."""
+
+    def __init__(self, inflated_bytes=None, cells=None, depth=None):
+        self.inflated_bytes = inflated_bytes
+        self.cells = cells
+        self.depth = depth
+
+
+def parse_xml(source, limits):
+    # The cells and the nesting depth are checked while the xml is parsed, so
+    # a diagram over the limits is rejected before it has been read entirely
+    root = None
+    depth = 0
+    cells = 0
+    for event, element in ET.iterparse(source, events=("start", "end")):
+        if event == "end":
+            depth -= 1
+            continue
+
+        if root is None:
+            root = element
+        depth += 1
+        if limits.depth is not None and depth > limits.depth:
+            raise DiagramTooComplex(
+                "The diagram is nested more than {} levels deep".format(
+                    limits.depth
+                )
+            )
+        if element.tag == "mxCell":
+            cells += 1
+            if limits.cells is not None and cells > limits.cells:
+                raise DiagramTooComplex(
+                    f"The diagram has more than {limits.cells} cells"
+                )
+
+    return root
+
+
+def inflate(data, max_bytes=None):
+    if max_bytes is None:
+        return zlib.decompress(data, -15)
+
+    # The output is limited while inflating, so a small diagram that inflates
+    # massively never takes more than max_bytes of memory
+    decompressor = zlib.decompressobj(-15)
+    inflated = decompressor.decompress(data, max_bytes + 1)
+    if len(inflated) > max_bytes:
+        raise DiagramTooLarge(
+            f"The diagram inflates to more than {max_bytes} bytes"
+        )
+    if not decompressor.eof:
+        raise zlib.error(
+            "Error -5 while decompressing data: incomplete or "
+            "truncated stream"
+        )
+
+    return inflated
+
+
+@staged
+def read_drawio_xml(diagram_path, limits=None):
+    if limits is None:
+        tree = ET.parse(diagram_path)
+        mxfile = tree.getroot()
+    else:
+        mxfile = parse_xml(diagram_path, limits)
 
     try:
         diagram = mxfile[0]
@@ -64,8 +151,14 @@ def read_drawio_xml(diagram_path):
         diagram = mxfile[0]
         compressed_mxGraphModel = diagram.text
         coded_xml = base64.b64decode(compressed_mxGraphModel)
-        xml_string = unquote(zlib.decompress(coded_xml, -15).decode("utf8"))
-        mxGraphModel = ET.fromstring(xml_string)
+        if limits is None:
+            xml_string = unquote(inflate(coded_xml).decode("utf8"))
+            mxGraphModel = ET.fromstring(xml_string)
+        else:
+            xml_string = unquote(
+                inflate(coded_xml, limits.inflated_bytes).decode("utf8")
+            )
+            mxGraphModel = parse_xml(io.StringIO(xml_string), limits)
         root = mxGraphModel[0]
 
     # Eliminate children related to the whole white template
@@ -81,45 +174,260 @@ def read_drawio_xml(diagram_path):
     return root
 
 
-def find_prefixes(concepts, relations, attribute_blocks, individuals):
-    prefixes = []
+class Prefixes:
+    """
+    Prefixes used by the concepts, relations, individuals and attributes of a
+    diagram. The Finder adds them while it classifies the elements, so there
+    is no need to walk all the elements again afterwards.
+
+    Each kind of element keeps its prefixes in the order they are first found
+    (dicts are used as insertion-ordered sets). Iterating gives the prefixes of
+    the concepts first, then the ones of the relations, individuals and
+    attributes. This order matters, because get_ttl_template takes the first
+    new namespace as the ontology namespace when none has been declared.
+    """
+
+    kinds = ("concepts", "relations", "individuals", "attributes")
+
+    def __init__(self):
+        self.found = {kind: {} for kind in self.kinds}
+
+    def add(self, kind, prefix):
+        self.found[kind][prefix] = None
+
+    def reset(self, kind, prefixes):
+        # Used when elements of that kind are removed after being found
+        self.found[kind] = dict.fromkeys(prefixes)
+
+    def __iter__(self):
+        prefixes = {}
+        for kind in self.kinds:
+            prefixes.update(self.found[kind])
+        return iter(prefixes)
+
 
-    for id, concept in concepts.items():
-        prefix = concept["prefix"]
-        if prefix not in prefixes:
-            prefixes.append(prefix)
+class Symbols:
+    """
+    Qualified names (prefix:uri) of a diagram, with the ids of the elements
+    of each kind that define them. The Finder adds the properties while it
+    classifies the elements, and enrich_properties the ones it creates from
+    rhombuses, so the names are looked up in constant time and never
+    collected again from the elements. The concepts and individuals are
+    added by index_symbols, once the associations have removed the concepts
+    that are not classes.
 
-    for id, relation in relations.items():
-        if "prefix" in relation:
-            prefix = relation["prefix"]
-            if prefix not in prefixes:
-                prefixes.append(prefix)
+    The ids of an attribute are the key of its attribute block and its index
+    in the block, and the ids of the other elements are their keys. When
+    several elements of a kind define the same name, the ids are kept in the
+    order they are added and the last one is the one used.
+    """
 
-    for id, individual in individuals.items():
-        prefix = individual["prefix"]
-        if prefix not in prefixes:
-            prefixes.append(prefix)
+    kinds = ("concepts", "relations", "attributes", "individuals")
 
-    for id, attribute_block in attribute_blocks.items():
-        attributes = attribute_block["attributes"]
-        for attribute in attributes:
-            prefix = attribute["prefix"]
-            if prefix not in prefixes:
-                prefixes.append(prefix)
+    def __init__(self):
+        self.defined = {kind: {} for kind in self.kinds}
 
-    return prefixes
+    @classmethod
+    def of(cls, relations, attribute_blocks):
+        # Used when the elements have not been found by a Finder
+        symbols = cls()
+        for id, relation in relations.items():
+            if "uri" in relation:
+                symbols.add(
+                    "relations", relation.prefix + ":" + relation.uri, id
+                )
+        for id, attribute_block in attribute_blocks.items():
+            for idx, attribute in enumerate(attribute_block.attributes):
+                symbols.add(
+                    "attributes",
+                    attribute.prefix + ":" + attribute.uri,
+                    (id, idx),
+                )
+        return symbols
+
+    def add(self, kind, name, id):
+        self.defined[kind].setdefault(name, []).append(id)
+
+    def defines(self, kind, name):
+        return name in self.defined[kind]
+
+    def ids(self, kind, name):
+        return self.defined[kind].get(name, [])
+
+    def last(self, kind, name):
+        # Raises KeyError when no element of the kind defines the name
+        return self.defined[kind][name][-1]
+
+    def items(self, kind):
+        return self.defined[kind].items()
+
+
+# Cardinalities such as (1..N) are removed before the rest of the groups in
+# parentheses, because removing them first can change what the second
+# pattern finds, e.g. "(a(1..N))" is cleaned to "" and not to ")"
+CARDINALITY_PATTERN = re.compile(r"\(([0-9][^)]+)\)")
+PARENTHESES_PATTERN = re.compile(r"\(([^)]+)\)")
 
 
 def clean_uri(uri):
-    uri = re.sub(r"\(([0-9][^)]+)\)", "", uri).strip()
-    uri = re.sub(r"\(([^)]+)\)", "", uri).strip()
-    uri = re.sub(r"\(all\)", "", uri).strip()
-    uri = re.sub(r"\(some\)", "", uri).strip()
-    uri = re.sub(r"\(∀\)", "", uri).strip()
-    uri = re.sub(r"\(∃\)", "", uri).strip()
-    uri = re.sub(r"\(F\)", "", uri).strip()
-    uri = re.sub(r"\(IF\)", "", uri).strip()
-    uri = re.sub(r"\(S\)", "", uri).strip()
-    uri = re.sub(r"\(T\)", "", uri).strip()
+    # Removes the cardinality, restrictions (all), (some), (F), (IF), ...
+    # and any other text in parentheses from a label. Once every group in
+    # parentheses is removed, the restrictions can not be present anymore
+    if "(" not in uri:
+        return uri.strip()
+
+    uri = CARDINALITY_PATTERN.sub("", uri).strip()
+    uri = PARENTHESES_PATTERN.sub("", uri).strip()
 
     return uri
+
+
+# Prefixes stored for the uris written with an empty prefix (":uri") and for
+# the uris without prefix ("uri"), which are written with the @base of the
+# ontology. The writer replaces them
+EMPTY_PREFIX = "cambiar_a_prefijo_vacio"
+BASE_PREFIX = "<cambiar_a_base"
+MIN_MAX_CARDINALITY_PATTERN = re.compile(r"\((\S*[.][.]\S*)\)")
+
+
+@functools.lru_cache(maxsize=LABEL_CACHE_SIZE)
+def split_qname(text, last=False):
+    """
+    Prefix and uri of a "prefix:uri" text, without the spaces of the uri.
+    The uri is the part after the first colon, or after the last one with
+    last. An empty prefix is EMPTY_PREFIX and a text without prefix gets
+    BASE_PREFIX, with the uri ended by ">" for the @base directive.
+    """
+    parts = text.split(":")
+    if len(parts) > 1:
+        prefix = parts[0].strip() or EMPTY_PREFIX
+        uri = parts[-1 if last else 1].strip()
+    else:
+        prefix = BASE_PREFIX
+        uri = parts[0].strip() + ">"
+
+    return prefix, uri.replace(" ", "")
+
+
+@functools.lru_cache(maxsize=LABEL_CACHE_SIZE)
+def find_cardinality(text):
+    """Minimum and maximum of the last "(min..max)" of a label, as written,
+    or None and None."""
+    cardinalities = MIN_MAX_CARDINALITY_PATTERN.findall(text)
+    if not cardinalities:
+        return None, None
+    min_max = cardinalities[-1].split("..")
+
+    return min_max[0], min_max[1]
+
+
+@functools.lru_cache(maxsize=LABEL_CACHE_SIZE)
+def split_datatype(text, base=False):
+    """
+    Prefix and datatype of an attribute line ("prefix:uri: prefix:datatype"
+    or "uri: prefix:datatype" with base), or None and None. The prefix is
+    xsd when only the datatype is written. Raises IndexError when the
+    datatype is empty.
+    """
+    parts = text.split(":")
+    # Colons of the prefix:uri of the attribute and of its datatype
+    start = 1 if base else 2
+    if len(parts) <= start:
+        return None, None
+    datatype = parts[-1].strip()
+    datatype = datatype[0].lower() + datatype[1:]
+    if len(parts) > start + 1:
+        prefix = parts[start].strip()
+        if prefix == "" and not base:
+            prefix = EMPTY_PREFIX
+    else:
+        prefix = "xsd"
+
+    return prefix, datatype
+
+
+# Types of relation that the label of an edge can declare, in the order they
+# are looked for, and the flag of each one
+EDGE_TYPES = [
+    "rdfs:subClassOf",
+    "rdf:type",
+    "owl:equivalentClass",
+    "owl:disjointWith",
+    "owl:complementOf",
+    "rdfs:subPropertyOf",
+    "owl:equivalentProperty",
+    "owl:inverseOf",
+    "rdfs:domain",
+    "rdfs:range",
+    "owl:sameAs",
+    "owl:differentFrom",
+]
+EDGE_TYPE_FLAGS = {edge_type: 1 << i for i, edge_type in enumerate(EDGE_TYPES)}
+EDGE_TYPES_MASK = (1 << len(EDGE_TYPES)) - 1
+
+# Restrictions and characteristics of the labels of the relations and the
+# attributes. The names of the restrictions (allValuesFrom...) have their
+# own flags, as only the labels of the relations accept them
+ALL_VALUES_FROM = 1 << len(EDGE_TYPES)
+ALL_VALUES_FROM_NAME = ALL_VALUES_FROM << 1
+SOME_VALUES_FROM = ALL_VALUES_FROM << 2
+SOME_VALUES_FROM_NAME = ALL_VALUES_FROM << 3
+HAS_VALUE = ALL_VALUES_FROM << 4
+HAS_VALUE_NAME = ALL_VALUES_FROM << 5
+SUBCLASS_RESTRICTION = ALL_VALUES_FROM << 6
+EQUIVALENT_RESTRICTION = ALL_VALUES_FROM << 7
+DISJOINT_RESTRICTION = ALL_VALUES_FROM << 8
+FUNCTIONAL = ALL_VALUES_FROM << 9
+INVERSE_FUNCTIONAL = ALL_VALUES_FROM << 10
+TRANSITIVE = ALL_VALUES_FROM << 11
+SYMMETRIC = ALL_VALUES_FROM << 12
+
+LABEL_KEYWORDS = dict(
+    EDGE_TYPE_FLAGS,
+    **{
+        "(all)": ALL_VALUES_FROM,
+        "∀": ALL_VALUES_FROM,
+        "allValuesFrom": ALL_VALUES_FROM_NAME,
+        "(some)": SOME_VALUES_FROM,
+        "∃": SOME_VALUES_FROM,
+        "someValuesFrom": SOME_VALUES_FROM_NAME,
+        "(value)": HAS_VALUE,
+        "∋": HAS_VALUE,
+        "hasValue": HAS_VALUE_NAME,
+        "(sub)": SUBCLASS_RESTRICTION,
+        "(eq)": EQUIVALENT_RESTRICTION,
+        "(dis)": DISJOINT_RESTRICTION,
+        "(F)": FUNCTIONAL,
+        "(IF)": INVERSE_FUNCTIONAL,
+        "(T)": TRANSITIVE,
+        "(S)": SYMMETRIC,
+    },
+)
+# The only keywords that can overlap in a label are the names of the
+# restrictions right after an edge type (like in "owl:sameAsomeValuesFrom"),
+# and the rest of a label with an edge type is not used
+KEYWORDS_PATTERN = re.compile(
+    "|".join(
+        re.escape(keyword)
+        for keyword in sorted(LABEL_KEYWORDS, key=len, reverse=True)
+    )
+)
+
+
+@functools.lru_cache(maxsize=LABEL_CACHE_SIZE)
+def label_flags(label):
+    """Flags of the edge types and keywords found in a label, in one scan."""
+    flags = 0
+    for keyword in KEYWORDS_PATTERN.findall(label):
+        flags |= LABEL_KEYWORDS[keyword]
+
+    return flags
+
+
+def edge_type(flags):
+    """The first of EDGE_TYPES in the flags of a label, or None."""
+    if not flags & EDGE_TYPES_MASK:
+        return None
+    for name in EDGE_TYPES:
+        if flags & EDGE_TYPE_FLAGS[name]:
+            return name
@@ -1,8 +1,49 @@
 import tempfile
 
-from chowlk.anonymousClass import *
-
-
+from chowlk.anonymousClass import (
+    complement_of,
+    intersection_of,
+    one_of,
+    restrictions,
+    union_of,
+)
+from chowlk.stages import staged
+
+
+def merge_order(elements, kind, symbols, merged):
+    """
+    Keys of the elements in the order they are written, with whether each
+    one starts and ends its subject. The merged elements that define the
+    same name in the symbols are written together, where the first of them
+    is, as one subject. The rest of the elements are written alone.
+    """
+    order = []
+    # Keys of the elements already written with the others of their name. An
+    # element that the symbols do not have is written alone, and it does not
+    # stop the others of its name from being written
+    written = set()
+    for id, element in elements.items():
+        if symbols is None or not merged(element):
+            order.append((id, True, True))
+            continue
+        if id in written:
+            continue
+        name = element.prefix + ":" + element.uri
+        ids = [
+            other
+            for other in dict.fromkeys(symbols.ids(kind, name))
+            if other in elements and merged(elements[other])
+        ]
+        if id not in ids:
+            ids = [id]
+        for position, other in enumerate(ids):
+            order.append((other, position == 0, position == len(ids) - 1))
+        written.update(ids)
+
+    return order
+
+
+@staged
 def get_ttl_template(namespaces, prefixes_fonded, errors):
     file = tempfile.TemporaryFile(mode="w+", encoding="utf-8")
 
@@ -77,6 +118,7 @@ def get_ttl_template(namespaces, prefixes_fonded, errors):
     return file, onto_prefix, onto_uri, new_namespaces, errors
 
 
+@staged
 def write_ontology_metadata(file, metadata, onto_uri):
     file.write("<" + onto_uri + "> rdf:type owl:Ontology")
     for prefix, values in metadata.items():
@@ -94,6 +136,7 @@ def write_ontology_metadata(file, metadata, onto_uri):
     return file
 
 
+@staged
 def write_object_properties(
     file,
     relations,
@@ -103,6 +146,7 @@ def write_object_properties(
     hexagons,
     individuals,
     errors,
+    symbols=None,
 ):
     file.write(
         "#################################################################\n"
@@ -110,49 +154,62 @@ def write_object_properties(
         "#################################################################\n\n"
     )
 
-    for relation_id, relation in relations.items():
+    # The arrows of the same object property are written as one subject
+    order = merge_order(
+        relations,
+        "relations",
+        symbols,
+        lambda relation: relation.get("type") == "owl:ObjectProperty",
+    )
+    for relation_id, first, last in order:
+        relation = relations[relation_id]
         if "type" not in relation:
             continue
 
-        if relation["type"] == "owl:ObjectProperty":
-            uri = relation["uri"]
-            prefix = relation["prefix"]
-
-            file.write("### " + prefix + ":" + uri + "\n")
-            file.write(prefix + ":" + uri + " rdf:type owl:ObjectProperty")
-            if relation["functional"]:
-                file.write(" ,\n")
-                file.write("\t\t\towl:FunctionalProperty")
-
-            if relation["symmetric"]:
-                file.write(" ,\n")
-                file.write("\t\t\towl:SymmetricProperty")
-
-            if relation["transitive"]:
-                file.write(" ,\n")
-                file.write("\t\t\towl:TransitiveProperty")
-
-            if relation["inverse_functional"]:
+        if relation.type == "owl:ObjectProperty":
+            uri = relation.uri
+            prefix = relation.prefix
+
+            # The type is written once per subject, and the merged arrows
+            # only add their characteristics
+            types = []
+            if relation.functional:
+                types.append("owl:FunctionalProperty")
+            if relation.symmetric:
+                types.append("owl:SymmetricProperty")
+            if relation.transitive:
+                types.append("owl:TransitiveProperty")
+            if relation.inverse_functional:
+                types.append("owl:InverseFunctionalProperty")
+
+            if first:
+                file.write("### " + prefix + ":" + uri + "\n")
+                file.write(prefix + ":" + uri + " rdf:type owl:ObjectProperty")
+                labels = set()
+            elif types:
+                file.write(" ;\n")
+                file.write("\t\trdf:type " + types.pop(0))
+            for type in types:
                 file.write(" ,\n")
-                file.write("\t\t\towl:InverseFunctionalProperty")
+                file.write("\t\t\t" + type)
 
-            if relation["domain"]:
-                concept_id = relation["domain"]
+            if relation.domain:
+                concept_id = relation.domain
 
                 if concept_id in concepts:
                     concept = concepts[concept_id]
-                    domain_name = concept["prefix"] + ":" + concept["uri"]
+                    domain_name = concept.prefix + ":" + concept.uri
 
                 elif concept_id in attribute_blocks:
-                    concept_id = attribute_blocks[concept_id][
-                        "concept_associated"
-                    ]
+                    concept_id = attribute_blocks[
+                        concept_id
+                    ].concept_associated
                     concept = concepts[concept_id]
-                    domain_name = concept["prefix"] + ":" + concept["uri"]
+                    domain_name = concept.prefix + ":" + concept.uri
 
                 # domain owl:oneOf
-                elif relation["domain"] in hexagons:
-                    target_id = relation["domain"]
+                elif relation.domain in hexagons:
+                    target_id = relation.domain
                     complement = hexagons[target_id]
                     domain_name = "[ rdf:type owl:Class ;"
                     domain_name = domain_name + one_of(
@@ -160,7 +217,7 @@ def write_object_properties(
                     )
                     domain_name = domain_name + "\t\t]"
 
-                elif relation["domain"] in individuals:
+                elif relation.domain in individuals:
                     error = {
                         "message": "The domain of an object property is an individual",
                         "shape_id": relation_id,
@@ -178,15 +235,15 @@ def write_object_properties(
                     file.write("\t\trdfs:domain " + domain_name)
 
             # has value restrictions do not have range
-            if relation["range"] and not relation["hasValue"]:
-                if "range" in relation and relation["range"] in concepts:
-                    concept_id = relation["range"]
+            if relation.range and not relation.hasValue:
+                if "range" in relation and relation.range in concepts:
+                    concept_id = relation.range
                     concept = concepts[concept_id]
-                    range_name = concept["prefix"] + ":" + concept["uri"]
+                    range_name = concept.prefix + ":" + concept.uri
                     file.write(" ;\n")
                     file.write("\t\trdfs:range " + range_name)
 
-                elif relation["range"] in individuals:
+                elif relation.range in individuals:
                     error = {
                         "message": "The range of an object property is an individual",
                         "shape_id": relation_id,
@@ -196,8 +253,8 @@ def write_object_properties(
 
                 # range owl:oneOf
                 # For the moment is disabled
-                """elif  relation["range"] in hexagons:
-                    target_id = relation["range"]
+                """elif  relation.range in hexagons:
+                    target_id = relation.range
                     complement = hexagons[target_id]
                     file.write(" ; \n")
                     file.write("\t\trdfs:range [ rdf:type owl:Class ;")
@@ -207,14 +264,14 @@ def write_object_properties(
 
                 # For the moment is disabled
                 """else:
-                    blank_id = relation["target"]
+                    blank_id = relation.target
                     if blank_id in anonymous_concepts:
                         group_node = anonymous_concepts[blank_id]
                         try:
-                            concept_ids = group_node["group"]
-                            concept_names = [concepts[id]["prefix"] + ":" + concepts[id]["uri"] for id in concept_ids]
+                            concept_ids = group_node.group
+                            concept_names = [concepts[id].prefix + ":" + concepts[id].uri for id in concept_ids]
                             file.write(" ;\n")
-                            file.write("\t\trdfs:range [ " + group_node["type"] + " ( \n")
+                            file.write("\t\trdfs:range [ " + group_node.type + " ( \n")
                             for name in concept_names:
                                 file.write("\t\t\t\t\t\t" + name + "\n")
 
@@ -227,37 +284,41 @@ def write_object_properties(
             if "rdfs:subPropertyOf" in relation:
                 file.write(" ;\n")
                 file.write(
-                    "\t\trdfs:subPropertyOf " + relation["rdfs:subPropertyOf"]
+                    "\t\trdfs:subPropertyOf " + relation.sub_property_of
                 )
 
             if "owl:inverseOf" in relation:
                 file.write(" ;\n")
-                file.write("\t\towl:inverseOf " + relation["owl:inverseOf"])
+                file.write("\t\towl:inverseOf " + relation.inverse_of)
 
             if "owl:equivalentProperty" in relation:
                 file.write(" ;\n")
                 file.write(
                     "\t\towl:equivalentProperty "
-                    + relation["owl:equivalentProperty"]
+                    + relation.equivalent_property
                 )
 
-            file.write(" ;\n")
-            file.write('\t\trdfs:label "' + relation["label"] + '"')
-            file.write(" .\n\n")
+            if relation.label not in labels:
+                file.write(" ;\n")
+                file.write('\t\trdfs:label "' + relation.label + '"')
+                labels.add(relation.label)
+            if last:
+                file.write(" .\n\n")
 
-        elif relation["type"] == "owl:FunctionalProperty":
-            uri = relation["uri"]
-            prefix = relation["prefix"]
+        elif relation.type == "owl:FunctionalProperty":
+            uri = relation.uri
+            prefix = relation.prefix
 
             file.write("### " + prefix + ":" + uri + "\n")
             file.write(prefix + ":" + uri + " rdf:type owl:FunctionalProperty")
             file.write(" ;\n")
-            file.write('\t\trdfs:label "' + relation["label"] + '"')
+            file.write('\t\trdfs:label "' + relation.label + '"')
             file.write(" .\n\n")
 
     return file, errors
 
 
+@staged
 def write_data_properties(file, attribute_blocks, concepts):
     file.write(
         "#################################################################\n"
@@ -265,71 +326,72 @@ def write_data_properties(file, attribute_blocks, concepts):
         "#################################################################\n\n"
     )
 
-    attributes_reviewed = []
+    attributes_reviewed = set()
 
     for id, attribute_block in attribute_blocks.items():
-        for attribute in attribute_block["attributes"]:
-            uri = attribute["uri"]
-            prefix = attribute["prefix"]
+        for attribute in attribute_block.attributes:
+            uri = attribute.uri
+            prefix = attribute.prefix
             full_name = prefix + ":" + uri
             if full_name in attributes_reviewed:
                 continue
             file.write("### " + prefix + ":" + uri + "\n")
             file.write(prefix + ":" + uri + " rdf:type owl:DatatypeProperty")
 
-            if attribute["functional"]:
+            if attribute.functional:
                 file.write(" ,\n")
                 file.write("\t\t\towl:FunctionalProperty")
 
-            if attribute["domain"]:
-                concept_id = attribute["domain"]
+            if attribute.domain:
+                concept_id = attribute.domain
                 if concept_id in concepts:
                     concept = concepts[concept_id]
-                    domain_name = concept["prefix"] + ":" + concept["uri"]
+                    domain_name = concept.prefix + ":" + concept.uri
                     file.write(" ;\n")
                     file.write("\t\trdfs:domain " + domain_name)
 
             if (
-                attribute["range"]
-                and attribute["datatype"]
-                and not attribute["hasValue"]
+                attribute.range
+                and attribute.datatype
+                and not attribute.hasValue
             ):
-                if attribute["hasValue"] == False:
+                if attribute.hasValue == False:
                     file.write(" ;\n")
                     file.write(
                         "\t\trdfs:range "
-                        + attribute["prefix_datatype"]
+                        + attribute.prefix_datatype
                         + ":"
-                        + attribute["datatype"]
+                        + attribute.datatype
                     )
 
-            """elif attribute["range"]:
+            """elif attribute.range:
                 #Datatype which is declared in a rhombus
-                if attribute["hasValue"] == False:
+                if attribute.hasValue == False:
                     file.write(" ;\n")
-                    file.write("\t\trdfs:range " + attribute["prefix_datatype"] + ":" + attribute["datatype"])"""
+                    file.write("\t\trdfs:range " + attribute.prefix_datatype + ":" + attribute.datatype)"""
 
             if "rdfs:subPropertyOf" in attribute:
                 file.write(" ;\n")
                 file.write(
-                    "\t\trdfs:subPropertyOf " + attribute["rdfs:subPropertyOf"]
+                    "\t\trdfs:subPropertyOf " + attribute.sub_property_of
                 )
 
             if "owl:equivalentProperty" in attribute:
                 file.write(" ;\n")
                 file.write(
                     "\t\towl:equivalentProperty "
-                    + attribute["owl:equivalentProperty"]
+                    + attribute.equivalent_property
                 )
 
             file.write(" ;\n")
-            file.write('\t\trdfs:label "' + attribute["label"] + '"')
+            file.write('\t\trdfs:label "' + attribute.label + '"')
             file.write(" .\n\n")
-            attributes_reviewed.append(full_name)
+            attributes_reviewed.add(full_name)
 
     return file
 
 
+@staged
 def write_concepts(
     file,
     concepts,
@@ -340,6 +402,7 @@ def write_concepts(
     errors,
     all_relations,
     anonimous_classes,
+    symbols=None,
 ):
     file.write(
         "#################################################################\n"
@@ -347,19 +410,36 @@ def write_concepts(
         "#################################################################\n\n"
     )
 
-    for concept_id, association in associations.items():
+    # The shapes of the same class are written as one subject
+    order = merge_order(
+        {
+            concept_id: association["concept"]
+            for concept_id, association in associations.items()
+        },
+        "concepts",
+        symbols,
+        lambda concept: concept.uri != "",
+    )
+    for concept_id, first, last in order:
+        association = associations[concept_id]
         concept = association["concept"]
-        concept_prefix = concept["prefix"]
-        concept_uri = concept["uri"]
+        concept_prefix = concept.prefix
+        concept_uri = concept.uri
         # For now we are not considering unnamed concepts unless they are used for
         # relations of type owl:equivalentClass
         if concept_uri == "":
             continue
-        file.write("### " + concept_prefix + ":" + concept_uri + "\n")
-        file.write(
-            concept_prefix + ":" + concept_uri + " rdf:type owl:Class ;\n"
-        )
-        file.write('\trdfs:label "' + concept["label"] + '"')
+        if first:
+            file.write("### " + concept_prefix + ":" + concept_uri + "\n")
+            file.write(
+                concept_prefix + ":" + concept_uri + " rdf:type owl:Class ;\n"
+            )
+            file.write('\trdfs:label "' + concept.label + '"')
+            labels = {concept.label}
+        elif concept.label not in labels:
+            file.write(" ;\n")
+            file.write('\trdfs:label "' + concept.label + '"')
+            labels.add(concept.label)
 
         attribute_blocks = association["attribute_blocks"]
         relations = association["relations"]
@@ -369,21 +449,21 @@ def write_concepts(
                 continue
 
             # class_descriptor rdfs:subClassOf class_descriptor
-            if relation["type"] == "rdfs:subClassOf":
+            if relation.type == "rdfs:subClassOf":
                 # class1 subClassOf class2
-                if relation["target"] in concepts:
-                    target_id = relation["target"]
+                if relation.target in concepts:
+                    target_id = relation.target
                     target_name = (
-                        concepts[target_id]["prefix"]
+                        concepts[target_id].prefix
                         + ":"
-                        + concepts[target_id]["uri"]
+                        + concepts[target_id].uri
                     )
                     file.write(" ;\n")
                     file.write("\trdfs:subClassOf " + target_name)
 
                 # rdfs:subClassOf owl:oneOf (enumerated class)
-                elif relation["target"] in hexagons:
-                    target_id = relation["target"]
+                elif relation.target in hexagons:
+                    target_id = relation.target
                     complement = hexagons[target_id]
                     file.write(" ; \n")
                     file.write("\trdfs:subClassOf [ rdf:type owl:Class ;")
@@ -392,10 +472,10 @@ def write_concepts(
                     file.write("\t\t]")
 
                 # rdfs:subClassOf owl:unionOf or owl:intersectionOf
-                elif relation["target"] in anonymous_concepts:
-                    complement = anonymous_concepts[relation["target"]]
+                elif relation.target in anonymous_concepts:
+                    complement = anonymous_concepts[relation.target]
 
-                    if complement["type"] == "owl:intersectionOf":
+                    if complement.type == "owl:intersectionOf":
                         file.write(" ;")
                         file.write("\trdfs:subClassOf [ rdf:type owl:Class ;")
                         text = intersection_of(
@@ -411,7 +491,7 @@ def write_concepts(
                         file.write(text)
                         file.write("\t\t]")
 
-                    elif complement["type"] == "owl:unionOf":
+                    elif complement.type == "owl:unionOf":
                         file.write(" ;")
                         file.write("\trdfs:subClassOf [ rdf:type owl:Class ;")
                         text = union_of(
@@ -428,13 +508,13 @@ def write_concepts(
                         file.write("\t\t]")
 
                 # rdfs:subClassOf restriction or owl:complementOf
-                elif relation["target"] in anonimous_classes:
-                    complement = anonimous_classes[relation["target"]][
+                elif relation.target in anonimous_classes:
+                    complement = anonimous_classes[relation.target][
                         "relations"
                     ]
                     if len(complement) > 0:
                         complement = all_relations[complement[0]]
-                        if complement["type"] == "owl:ObjectProperty":
+                        if complement.type == "owl:ObjectProperty":
                             file.write(" ;")
                             file.write("\trdfs:subClassOf ")
                             text = restrictions(
@@ -449,7 +529,7 @@ def write_concepts(
                             )
                             file.write(text)
 
-                        elif complement["type"] == "owl:complementOf":
+                        elif complement.type == "owl:complementOf":
                             file.write(" ;")
                             file.write(
                                 "\trdfs:subClassOf [ rdf:type owl:Class ;"
@@ -468,117 +548,117 @@ def write_concepts(
                             file.write("\t\t]")
 
         for block_id, attribute_block in attribute_blocks.items():
-            for attribute in attribute_block["attributes"]:
+            for attribute in attribute_block.attributes:
                 if (
-                    attribute["allValuesFrom"]
-                    and attribute["prefix"]
-                    and attribute["uri"]
-                    and attribute["datatype"]
+                    attribute.allValuesFrom
+                    and attribute.prefix
+                    and attribute.uri
+                    and attribute.datatype
                 ):
                     file.write(" ;\n")
                     file.write("\trdfs:subClassOf \n")
                     file.write("\t\t[ rdf:type owl:Restriction ;\n")
                     file.write(
                         "\t\t  owl:onProperty "
-                        + attribute["prefix"]
+                        + attribute.prefix
                         + ":"
-                        + attribute["uri"]
+                        + attribute.uri
                         + " ;\n"
                     )
                     file.write(
                         "\t\t  owl:allValuesFrom "
-                        + attribute["prefix_datatype"]
+                        + attribute.prefix_datatype
                         + ":"
-                        + attribute["datatype"]
+                        + attribute.datatype
                         + " ]"
                     )
 
                 elif (
-                    attribute["someValuesFrom"]
-                    and attribute["prefix"]
-                    and attribute["uri"]
-                    and attribute["datatype"]
+                    attribute.someValuesFrom
+                    and attribute.prefix
+                    and attribute.uri
+                    and attribute.datatype
                 ):
                     file.write(" ;\n")
                     file.write("\trdfs:subClassOf \n")
                     file.write("\t\t[ rdf:type owl:Restriction ;\n")
                     file.write(
                         "\t\t  owl:onProperty "
-                        + attribute["prefix"]
+                        + attribute.prefix
                         + ":"
-                        + attribute["uri"]
+                        + attribute.uri
                         + " ;\n"
                     )
                     file.write(
                         "\t\t  owl:someValuesFrom "
-                        + attribute["prefix_datatype"]
+                        + attribute.prefix_datatype
                         + ":"
-                        + attribute["datatype"]
+                        + attribute.datatype
                         + " ]"
                     )
 
                 if (
-                    attribute["min_cardinality"] is not None
-                    and attribute["prefix"]
-                    and attribute["uri"]
+                    attribute.min_cardinality is not None
+                    and attribute.prefix
+                    and attribute.uri
                 ):
                     file.write(" ;\n")
                     file.write("\trdfs:subClassOf \n")
                     file.write("\t\t[ rdf:type owl:Restriction ;\n")
                     file.write(
                         "\t\t  owl:onProperty "
-                        + attribute["prefix"]
+                        + attribute.prefix
                         + ":"
-                        + attribute["uri"]
+                        + attribute.uri
                         + " ;\n"
                     )
                     file.write(
                         '\t\t  owl:minCardinality "'
-                        + attribute["min_cardinality"]
+                        + attribute.min_cardinality
                         + '"^^xsd:'
                         + "nonNegativeInteger ]\n"
                     )
 
                 if (
-                    attribute["max_cardinality"] is not None
-                    and attribute["prefix"]
-                    and attribute["uri"]
+                    attribute.max_cardinality is not None
+                    and attribute.prefix
+                    and attribute.uri
                 ):
                     file.write(" ;\n")
                     file.write("\trdfs:subClassOf \n")
                     file.write("\t\t[ rdf:type owl:Restriction ;\n")
                     file.write(
                         "\t\t  owl:onProperty "
-                        + attribute["prefix"]
+                        + attribute.prefix
                         + ":"
-                        + attribute["uri"]
+                        + attribute.uri
                         + " ;\n"
                     )
                     file.write(
                         '\t\t  owl:maxCardinality "'
-                        + attribute["max_cardinality"]
+                        + attribute.max_cardinality
                         + '"^^xsd:'
                         + "nonNegativeInteger ]\n"
                     )
 
                 if (
-                    attribute["cardinality"] is not None
-                    and attribute["prefix"]
-                    and attribute["uri"]
+                    attribute.cardinality is not None
+                    and attribute.prefix
+                    and attribute.uri
                 ):
                     file.write(" ;\n")
                     file.write("\trdfs:subClassOf \n")
                     file.write("\t\t[ rdf:type owl:Restriction ;\n")
                     file.write(
                         "\t\t  owl:onProperty "
-                        + attribute["prefix"]
+                        + attribute.prefix
                         + ":"
-                        + attribute["uri"]
+                        + attribute.uri
                         + " ;\n"
                     )
                     file.write(
                         '\t\t  owl:cardinality "'
-                        + attribute["cardinality"]
+                        + attribute.cardinality
                         + '"^^xsd:'
                         + "nonNegativeInteger ]\n"
                     )
@@ -586,28 +666,26 @@ def write_concepts(
                 # owl:hasValue
                 # the target is a data value
                 if (
-                    attribute["hasValue"]
-                    and attribute["prefix"]
-                    and attribute["uri"]
-                    and attribute["datatype"]
+                    attribute.hasValue
+                    and attribute.prefix
+                    and attribute.uri
+                    and attribute.datatype
                 ):
                     file.write(" ;\n")
-                    file.write(
-                        "\t" + attribute["predicate_restriction"] + " \n"
-                    )
+                    file.write("\t" + attribute.predicate_restriction + " \n")
                     file.write("\t\t[ rdf:type owl:Restriction ;\n")
                     file.write(
                         "\t\t  owl:onProperty "
-                        + attribute["prefix"]
+                        + attribute.prefix
                         + ":"
-                        + attribute["uri"]
+                        + attribute.uri
                         + " ;\n"
                     )
                     file.write(
                         "\t\t  owl:hasValue "
-                        + attribute["prefix_datatype"]
+                        + attribute.prefix_datatype
                         + ":"
-                        + attribute["datatype"]
+                        + attribute.datatype
                         + " ]"
                     )
 
@@ -620,7 +698,7 @@ def write_concepts(
             #   - rdfs:subClassOf (default)
             #   - owl:equivalentClass
             #   - owl:disjointWith
-            if relation["type"] == "owl:ObjectProperty":
+            if relation.type == "owl:ObjectProperty":
                 text = restrictions(
                     relation,
                     concepts,
@@ -634,77 +712,77 @@ def write_concepts(
                 # if text is "" that means that the class is not relationate with a restriction
                 if text != "":
                     file.write(" ;\n")
-                    file.write("\t" + relation["predicate_restriction"] + "\n")
+                    file.write("\t" + relation.predicate_restriction + "\n")
                     file.write(text)
-            """if relation["type"] == "owl:ObjectProperty" and (relation["target"] in concepts or \
-                relation["target"] in anonymous_concepts or relation["target"] in hexagons or relation["target"] in anonimous_classes):
+            """if relation.type == "owl:ObjectProperty" and (relation.target in concepts or \
+                relation.target in anonymous_concepts or relation.target in hexagons or relation.target in anonimous_classes):
 
-                if relation["allValuesFrom"]:
+                if relation.allValuesFrom:
                     file.write(" ;\n")
                     file.write("\trdfs:subClassOf \n")
                     text = restrictions(relation, concepts, errors, hexagons, anonymous_concepts, individuals, all_relations, anonimous_classes)
                     file.write(text)
 
-                elif relation["someValuesFrom"] :
+                elif relation.someValuesFrom :
                     file.write(" ;\n")
                     file.write("\trdfs:subClassOf \n")
                     text = restrictions(relation, concepts, errors, hexagons, anonymous_concepts, individuals, all_relations, anonimous_classes)
                     file.write(text)
 
-                if relation["min_cardinality"] is not None:
+                if relation.min_cardinality is not None:
                     file.write(" ;\n")
                     file.write("\trdfs:subClassOf \n")
                     file.write("\t\t[ rdf:type owl:Restriction ;\n")
-                    file.write("\t\t  owl:onProperty " + relation["prefix"] + ":" + relation["uri"] + " ;\n")
-                    file.write("\t\t  owl:minCardinality \"" + relation["min_cardinality"] + "\"^^xsd:" +
+                    file.write("\t\t  owl:onProperty " + relation.prefix + ":" + relation.uri + " ;\n")
+                    file.write("\t\t  owl:minCardinality \"" + relation.min_cardinality + "\"^^xsd:" +
                                "nonNegativeInteger ]")
 
-                if relation["max_cardinality"] is not None:
+                if relation.max_cardinality is not None:
                     file.write(" ;\n")
                     file.write("\trdfs:subClassOf \n")
                     file.write("\t\t[ rdf:type owl:Restriction ;\n")
-                    file.write("\t\t  owl:onProperty " + relation["prefix"] + ":" + relation["uri"] + " ;\n")
-                    file.write("\t\t  owl:maxCardinality \"" + relation["max_cardinality"] + "\"^^xsd:" +
+                    file.write("\t\t  owl:onProperty " + relation.prefix + ":" + relation.uri + " ;\n")
+                    file.write("\t\t  owl:maxCardinality \"" + relation.max_cardinality + "\"^^xsd:" +
                                "nonNegativeInteger ]")
 
-                if relation["cardinality"] is not None:
+                if relation.cardinality is not None:
                     file.write(" ;\n")
                     file.write("\trdfs:subClassOf \n")
                     file.write("\t\t[ rdf:type owl:Restriction ;\n")
-                    file.write("\t\t  owl:onProperty " + relation["prefix"] + ":" + relation["uri"] + " ;\n")
-                    file.write("\t\t  owl:cardinality \"" + relation["cardinality"] + "\"^^xsd:" +
+                    file.write("\t\t  owl:onProperty " + relation.prefix + ":" + relation.uri + " ;\n")
+                    file.write("\t\t  owl:cardinality \"" + relation.cardinality + "\"^^xsd:" +
                                "nonNegativeInteger ]")
 
             # owl:hasValue
             # The target is an individual
-            elif relation["type"] == "owl:ObjectProperty" and relation["hasValue"]:
-                if relation["target"] in individuals:
+            elif relation.type == "owl:ObjectProperty" and relation.hasValue:
+                if relation.target in individuals:
                     file.write(" ;\n")
                     file.write("\trdfs:subClassOf \n")
                     file.write("\t\t[ rdf:type owl:Restriction ;\n")
-                    file.write("\t\t  owl:onProperty " + relation["prefix"] + ":" + relation["uri"] + " ;\n")
-                    target_id = relation["target"]
-                    target_name = individuals[target_id]["prefix"] + ":" + individuals[target_id]["uri"]
+                    file.write("\t\t  owl:onProperty " + relation.prefix + ":" + relation.uri + " ;\n")
+                    target_id = relation.target
+                    target_name = individuals[target_id].prefix + ":" + individuals[target_id].uri
                     file.write("\t\t  owl:hasValue " + target_name + " ]")"""
 
         for relation_id, relation in relations.items():
             if "type" not in relation:
                 continue
 
-            if relation["type"] == "owl:disjointWith":
-                if relation["target"] in concepts:
+            if relation.type == "owl:disjointWith":
+                if relation.target in concepts:
                     file.write(" ;\n")
-                    target_id = relation["target"]
+                    target_id = relation.target
                     target_name = (
-                        concepts[target_id]["prefix"]
+                        concepts[target_id].prefix
                         + ":"
-                        + concepts[target_id]["uri"]
+                        + concepts[target_id].uri
                     )
                     file.write("\towl:disjointWith " + target_name)
 
                 # owl:disjointWith owl:oneOf
-                elif relation["target"] in hexagons:
-                    complement = hexagons[relation["target"]]
+                elif relation.target in hexagons:
+                    complement = hexagons[relation.target]
                     file.write(" ;\n")
                     file.write("\towl:disjointWith [ rdf:type owl:Class ;")
                     text = one_of(complement, individuals, errors)
@@ -712,10 +790,10 @@ def write_concepts(
                     file.write("\t\t]")
 
                 # owl:disjointWith owl:intersectionOf or owl:unionOf
-                elif relation["target"] in anonymous_concepts:
-                    complement = anonymous_concepts[relation["target"]]
+                elif relation.target in anonymous_concepts:
+                    complement = anonymous_concepts[relation.target]
 
-                    if complement["type"] == "owl:intersectionOf":
+                    if complement.type == "owl:intersectionOf":
                         file.write(" ;\n")
                         file.write("\towl:disjointWith [ rdf:type owl:Class ;")
                         text = intersection_of(
@@ -731,7 +809,7 @@ def write_concepts(
                         file.write(text)
                         file.write("\t\t]")
 
-                    elif complement["type"] == "owl:unionOf":
+                    elif complement.type == "owl:unionOf":
                         file.write(" ;\n")
                         file.write("\towl:disjointWith [ rdf:type owl:Class ;")
                         text = union_of(
@@ -748,13 +826,13 @@ def write_concepts(
                         file.write("\t\t]")
 
                 # owl:disjointWith restriction or owl:complementOf
-                elif relation["target"] in anonimous_classes:
-                    complement = anonimous_classes[relation["target"]][
+                elif relation.target in anonimous_classes:
+                    complement = anonimous_classes[relation.target][
                         "relations"
                     ]
                     if len(complement) > 0:
                         complement = all_relations[complement[0]]
-                        if complement["type"] == "owl:ObjectProperty":
+                        if complement.type == "owl:ObjectProperty":
                             file.write(" ;")
                             file.write("\towl:disjointWith ")
                             text = restrictions(
@@ -769,7 +847,7 @@ def write_concepts(
                             )
                             file.write(text)
 
-                        elif complement["type"] == "owl:complementOf":
+                        elif complement.type == "owl:complementOf":
                             file.write(" ;")
                             file.write(
                                 "\towl:disjointWith [ rdf:type owl:Class ;"
@@ -787,7 +865,7 @@ def write_concepts(
                             file.write(text)
                             file.write("\t\t]")
 
-            elif relation["type"] == "owl:complementOf":
+            elif relation.type == "owl:complementOf":
                 error = {
                     "message": "A class is connected to a owl:complementOf directly. A owl:complementOf can be connected to a class through a class axiom",
                     "shape_id": concept_id,
@@ -798,51 +876,47 @@ def write_concepts(
                 text = complement_of(relation, concepts, errors, hexagons, anonymous_concepts, individuals, all_relations, anonimous_classes)
                 file.write(text)"""
 
-            elif relation["type"] == "owl:equivalentClass":
+            elif relation.type == "owl:equivalentClass":
                 file.write(" ;\n")
-                if relation["target"] in concepts:
-                    complement = concepts[relation["target"]]
-                    complement_name = (
-                        complement["prefix"] + ":" + complement["uri"]
-                    )
+                if relation.target in concepts:
+                    complement = concepts[relation.target]
+                    complement_name = complement.prefix + ":" + complement.uri
                     if complement_name != ":":
                         file.write(
-                            "\t" + relation["type"] + " " + complement_name
+                            "\t" + relation.type + " " + complement_name
                         )
                     else:
                         file.write(
                             "\t"
-                            + relation["type"]
+                            + relation.type
                             + " [ rdf:type owl:Restriction ;\n"
                         )
-                        association = associations[relation["target"]]
+                        association = associations[relation.target]
                         relation = list(association["relations"].items())[0][1]
-                        relation_name = (
-                            relation["prefix"] + ":" + relation["uri"]
-                        )
-                        target_id = relation["target"]
+                        relation_name = relation.prefix + ":" + relation.uri
+                        target_id = relation.target
                         target_name = (
-                            concepts[target_id]["prefix"]
+                            concepts[target_id].prefix
                             + ":"
-                            + concepts[target_id]["uri"]
+                            + concepts[target_id].uri
                         )
                         file.write(
                             "\towl:onProperty " + relation_name + " ;\n"
                         )
-                        if relation["someValuesFrom"]:
+                        if relation.someValuesFrom:
                             file.write(
                                 "\towl:someValuesFrom " + target_name + " ]\n"
                             )
-                        elif relation["allValuesFrom"]:
+                        elif relation.allValuesFrom:
                             file.write(
                                 "\towl:allValuesFrom " + target_name + " ]\n"
                             )
 
                 # owl:equivalentClass owl:unionOf or owl:intersectionOf
-                elif relation["target"] in anonymous_concepts:
-                    complement = anonymous_concepts[relation["target"]]
+                elif relation.target in anonymous_concepts:
+                    complement = anonymous_concepts[relation.target]
 
-                    if complement["type"] == "owl:intersectionOf":
+                    if complement.type == "owl:intersectionOf":
                         file.write(
                             "\towl:equivalentClass [ rdf:type owl:Class ;"
                         )
@@ -859,7 +933,7 @@ def write_concepts(
                         file.write(text)
                         file.write("\t\t]")
 
-                    elif complement["type"] == "owl:unionOf":
+                    elif complement.type == "owl:unionOf":
                         file.write(
                             "\towl:equivalentClass [ rdf:type owl:Class ;"
                         )
@@ -877,21 +951,21 @@ def write_concepts(
                         file.write("\t\t]")
 
                 # owl:equivalentClass owl:oneOf (enumerated class)
-                elif relation["target"] in hexagons:
-                    complement = hexagons[relation["target"]]
+                elif relation.target in hexagons:
+                    complement = hexagons[relation.target]
                     file.write("\towl:equivalentClass [ rdf:type owl:Class ;")
                     text = one_of(complement, individuals, errors)
                     file.write(text)
                     file.write("\t\t]")
 
                 # owl:equivalentClass restriction or owl:complementOf
-                elif relation["target"] in anonimous_classes:
-                    complement = anonimous_classes[relation["target"]][
+                elif relation.target in anonimous_classes:
+                    complement = anonimous_classes[relation.target][
                         "relations"
                     ]
                     if len(complement) > 0:
                         complement = all_relations[complement[0]]
-                        if complement["type"] == "owl:ObjectProperty":
+                        if complement.type == "owl:ObjectProperty":
                             file.write(" ;")
                             file.write("\towl:equivalentClass ")
                             text = restrictions(
@@ -906,7 +980,7 @@ def write_concepts(
                             )
                             file.write(text)
 
-                        elif complement["type"] == "owl:complementOf":
+                        elif complement.type == "owl:complementOf":
                             file.write(" ;")
                             file.write(
                                 "\towl:equivalentClass [ rdf:type owl:Class ;"
@@ -925,17 +999,14 @@ def write_concepts(
                             file.write("\t\t]")
 
             # owl:oneOf (enumerated class)
-            elif (
-                relation["type"] == "rdf:type"
-                and relation["target"] in hexagons
-            ):
+            elif relation.type == "rdf:type" and relation.target in hexagons:
                 error = {
                     "message": "A class is connected to a owl:oneOf through a rdf:type. A owl:oneOf can be connected to a class through a class axiom",
                     "shape_id": concept_id,
                     "value": concept_prefix + ":" + concept_uri,
                 }
                 errors["oneOf"].append(error)
-                """target_id = relation["target"]
+                """target_id = relation.target
                 complement = hexagons[target_id]
                 file.write(" ;")
                 text =  one_of(complement, individuals, errors)
@@ -943,12 +1014,12 @@ def write_concepts(
 
             # anonymous class
             elif (
-                relation["type"] == "rdf:type"
-                and relation["target"] in anonymous_concepts
+                relation.type == "rdf:type"
+                and relation.target in anonymous_concepts
             ):
-                target_id = relation["target"]
+                target_id = relation.target
                 complement = anonymous_concepts[target_id]
-                if complement["type"] == "owl:intersectionOf":
+                if complement.type == "owl:intersectionOf":
                     error = {
                         "message": "A class is connected to a owl:intersectionOf through a rdf:type. A owl:intersectionOf can be connected to a class through a class axiom",
                         "shape_id": concept_id,
@@ -958,7 +1029,7 @@ def write_concepts(
                     """file.write(" ;")
                     text = intersection_of(complement, concepts, errors, hexagons, anonymous_concepts, individuals, all_relations, anonimous_classes)
                     file.write(text)"""
-                elif complement["type"] == "owl:unionOf":
+                elif complement.type == "owl:unionOf":
                     error = {
                         "message": "A class is connected to a owl:unionOf through a rdf:type. A owl:unionOf can be connected to a class through a class axiom",
                         "shape_id": concept_id,
@@ -970,18 +1041,15 @@ def write_concepts(
                     file.write(text)"""
 
         for blank_id, blank in anonymous_concepts.items():
-            if len(blank["group"]) > 2:
+            if len(blank.group) > 2:
                 continue
 
-            if (
-                concept_id in blank["group"]
-                and blank["type"] == "owl:disjointWith"
-            ):
+            if concept_id in blank.group and blank.type == "owl:disjointWith":
                 file.write(" ;\n")
-                if blank["group"].index(concept_id) == 0:
-                    complement_id = blank["group"][1]
+                if blank.group.index(concept_id) == 0:
+                    complement_id = blank.group[1]
                 else:
-                    complement_id = blank["group"][0]
+                    complement_id = blank.group[0]
 
                 if complement_id is None:
                     continue
@@ -989,18 +1057,16 @@ def write_concepts(
                 if complement_id in concepts:
                     complement_concept = concepts[complement_id]
                     complement_name = (
-                        complement_concept["prefix"]
+                        complement_concept.prefix
                         + ":"
-                        + complement_concept["uri"]
+                        + complement_concept.uri
                     )
-                    file.write("\t" + blank["type"] + " " + complement_name)
+                    file.write("\t" + blank.type + " " + complement_name)
 
                 # owl:disjointWith owl:oneOf
                 elif complement_id in hexagons:
                     complement = hexagons[complement_id]
-                    file.write(
-                        "\t" + blank["type"] + " [ rdf:type owl:Class ;"
-                    )
+                    file.write("\t" + blank.type + " [ rdf:type owl:Class ;")
                     text = one_of(complement, individuals, errors)
                     file.write(text)
                     file.write("\t\t]")
@@ -1009,7 +1075,7 @@ def write_concepts(
                 elif complement_id in anonymous_concepts:
                     complement = anonymous_concepts[complement_id]
 
-                    if complement["type"] == "owl:intersectionOf":
+                    if complement.type == "owl:intersectionOf":
                         file.write("\towl:disjointWith [ rdf:type owl:Class ;")
                         text = intersection_of(
                             complement,
@@ -1024,7 +1090,7 @@ def write_concepts(
                         file.write(text)
                         file.write("\t\t]")
 
-                    elif complement["type"] == "owl:unionOf":
+                    elif complement.type == "owl:unionOf":
                         file.write("\towl:disjointWith [ rdf:type owl:Class ;")
                         text = union_of(
                             complement,
@@ -1041,10 +1107,10 @@ def write_concepts(
 
                 # owl:disjointWith restriction or owl:complementOf
                 elif complement_id in anonimous_classes:
-                    complement = anonimous_classes[complement_id]["relations"]
+                    complement = anonimous_classes[complement_id].relations
                     if len(complement) > 0:
                         complement = all_relations[complement[0]]
-                        if complement["type"] == "owl:ObjectProperty":
+                        if complement.type == "owl:ObjectProperty":
                             file.write("\towl:disjointWith ")
                             text = restrictions(
                                 complement,
@@ -1058,7 +1124,7 @@ def write_concepts(
                             )
                             file.write(text)
 
-                        elif complement["type"] == "owl:complementOf":
+                        elif complement.type == "owl:complementOf":
                             file.write(
                                 "\towl:disjointWith [ rdf:type owl:Class ;"
                             )
@@ -1076,74 +1142,65 @@ def write_concepts(
                             file.write("\t\t]")
 
             elif (
-                concept_id in blank["group"]
-                and blank["type"] == "owl:complementOf"
+                concept_id in blank.group and blank.type == "owl:complementOf"
             ):
                 file.write(" ;\n")
-                if blank["group"].index(concept_id) == 0:
-                    complement_id = blank["group"][1]
+                if blank.group.index(concept_id) == 0:
+                    complement_id = blank.group[1]
                 else:
-                    complement_id = blank["group"][0]
+                    complement_id = blank.group[0]
 
                 if complement_id is None:
                     continue
 
                 complement_concept = concepts[complement_id]
                 complement_name = (
-                    complement_concept["prefix"]
-                    + ":"
-                    + complement_concept["uri"]
+                    complement_concept.prefix + ":" + complement_concept.uri
                 )
-                file.write("\t" + blank["type"] + " " + complement_name)
+                file.write("\t" + blank.type + " " + complement_name)
 
             # namedClass owl:equivalentClass elipse
             elif (
-                concept_id in blank["group"]
-                and blank["type"] == "owl:equivalentClass"
+                concept_id in blank.group
+                and blank.type == "owl:equivalentClass"
             ):
                 file.write(" ; \n")
-                if blank["group"].index(concept_id) == 0:
-                    complement_id = blank["group"][1]
+                if blank.group.index(concept_id) == 0:
+                    complement_id = blank.group[1]
                 else:
-                    complement_id = blank["group"][0]
+                    complement_id = blank.group[0]
 
                 if complement_id is None:
                     continue
 
                 if complement_id in concepts:
                     complement = concepts[complement_id]
-                    complement_name = (
-                        complement["prefix"] + ":" + complement["uri"]
-                    )
+                    complement_name = complement.prefix + ":" + complement.uri
                     if complement_name != ":":
-                        file.write(
-                            "\t" + blank["type"] + " " + complement_name
-                        )
+                        file.write("\t" + blank.type + " " + complement_name)
                     else:
                         file.write(
                             "\t"
-                            + blank["type"]
+                            + blank.type
                             + " [ rdf:type owl:Restriction ;\n"
                         )
                         association = associations[complement_id]
                         relation = list(association["relations"].items())[0][1]
-                        relation_name = (
-                            relation["prefix"] + ":" + relation["uri"]
-                        )
-                        target_id = relation["target"]
+                        relation_name = relation.prefix + ":" + relation.uri
+                        target_id = relation.target
                         target_name = (
-                            concepts[target_id]["prefix"]
+                            concepts[target_id].prefix
                             + ":"
-                            + concepts[target_id]["uri"]
+                            + concepts[target_id].uri
                         )
                         file.write(
                             "\towl:onProperty " + relation_name + " ;\n"
                         )
-                        if relation["someValuesFrom"]:
+                        if relation.someValuesFrom:
                             file.write(
                                 "\towl:someValuesFrom " + target_name + " ]\n"
                             )
-                        elif relation["allValuesFrom"]:
+                        elif relation.allValuesFrom:
                             file.write(
                                 "\towl:allValuesFrom " + target_name + " ]\n"
                             )
@@ -1152,7 +1209,7 @@ def write_concepts(
                 elif complement_id in anonymous_concepts:
                     complement = anonymous_concepts[complement_id]
 
-                    if complement["type"] == "owl:intersectionOf":
+                    if complement.type == "owl:intersectionOf":
                         file.write(
                             "\towl:equivalentClass [ rdf:type owl:Class ;"
                         )
@@ -1169,7 +1226,7 @@ def write_concepts(
                         file.write(text)
                         file.write("\t\t]")
 
-                    elif complement["type"] == "owl:unionOf":
+                    elif complement.type == "owl:unionOf":
                         file.write(
                             "\towl:equivalentClass [ rdf:type owl:Class ;"
                         )
@@ -1189,19 +1246,17 @@ def write_concepts(
                 # owl:equivalentClass owl:oneOf (enumerated class)
                 elif complement_id in hexagons:
                     complement = hexagons[complement_id]
-                    file.write(
-                        "\t" + blank["type"] + " [ rdf:type owl:Class ;"
-                    )
+                    file.write("\t" + blank.type + " [ rdf:type owl:Class ;")
                     text = one_of(complement, individuals, errors)
                     file.write(text)
                     file.write("\t\t]")
 
                 # owl:equivalentClass restriction or owl:complementOf
                 elif complement_id in anonimous_classes:
-                    complement = anonimous_classes[complement_id]["relations"]
+                    complement = anonimous_classes[complement_id].relations
                     if len(complement) > 0:
                         complement = all_relations[complement[0]]
-                        if complement["type"] == "owl:ObjectProperty":
+                        if complement.type == "owl:ObjectProperty":
                             file.write(" ;")
                             file.write("\towl:equivalentClass ")
                             text = restrictions(
@@ -1216,7 +1271,7 @@ def write_concepts(
                             )
                             file.write(text)
 
-                        elif complement["type"] == "owl:complementOf":
+                        elif complement.type == "owl:complementOf":
                             file.write(" ;")
                             file.write(
                                 "\towl:equivalentClass [ rdf:type owl:Class ;"
@@ -1234,11 +1289,13 @@ def write_concepts(
                             file.write(text)
                             file.write("\t\t]")
 
-        file.write(" .\n\n")
+        if last:
+            file.write(" .\n\n")
 
     return file
 
 
+@staged
 def write_instances(file, individuals):
     file.write(
         "#################################################################\n"
@@ -1247,9 +1304,9 @@ def write_instances(file, individuals):
     )
 
     for ind_id, individual in individuals.items():
-        prefix = individual["prefix"]
-        uri = individual["uri"]
-        types = individual["type"]
+        prefix = individual.prefix
+        uri = individual.uri
+        types = individual.type
         file.write("### " + prefix + ":" + uri + "\n")
         file.write(prefix + ":" + uri + " rdf:type owl:NamedIndividual")
         if types is None:
@@ -1263,6 +1320,7 @@ def write_instances(file, individuals):
     return file
 
 
+@staged
 def write_general_axioms(
     file, concepts, anonymous_concepts, individuals, hexagons
 ):
@@ -1273,13 +1331,13 @@ def write_general_axioms(
     )
 
     for blank_id, blank in anonymous_concepts.items():
-        if len(blank["group"]) > 2 and blank["type"] in ["owl:disjointWith"]:
+        if len(blank.group) > 2 and blank.type in ["owl:disjointWith"]:
             file.write("[ rdf:type owl:AllDisjointClasses ;\n")
             file.write("  owl:members ( \n")
 
             concept_names = [
-                concepts[id]["prefix"] + ":" + concepts[id]["uri"]
-                for id in blank["group"]
+                concepts[id].prefix + ":" + concepts[id].uri
+                for id in blank.group
             ]
             for name in concept_names:
                 file.write("\t\t" + name + "\n")
@@ -1287,15 +1345,13 @@ def write_general_axioms(
             file.write("] .")
 
     for hex_id, hexagon in hexagons.items():
-        if len(hexagon["group"]) > 2 and hexagon["type"] in [
-            "owl:AllDifferent"
-        ]:
+        if len(hexagon.group) > 2 and hexagon.type in ["owl:AllDifferent"]:
             file.write("[ rdf:type owl:AllDifferent ;\n")
             file.write("  owl:distinctMembers ( \n")
 
             individual_names = [
-                individuals[id]["prefix"] + ":" + individuals[id]["uri"]
-                for id in hexagon["group"]
+                individuals[id].prefix + ":" + individuals[id].uri
+                for id in hexagon.group
             ]
 
             for name in individual_names:
@@ -1306,49 +1362,50 @@ def write_general_axioms(
     return file
 
 
+@staged
 def write_triplets(file, individuals, associations, values):
     for id, association in associations.items():
         subject = (
-            association["individual"]["prefix"]
+            association["individual"].prefix
             + ":"
-            + association["individual"]["uri"]
+            + association["individual"].uri
         )
-        types = association["individual"]["type"]
+        types = association["individual"].type
         relations = association["relations"]
         attributes = association["attributes"]
 
         for relation_id, relation in relations.items():
-            predicate = relation["prefix"] + ":" + relation["uri"]
-            target_id = relation["target"]
+            predicate = relation.prefix + ":" + relation.uri
+            target_id = relation.target
             object = (
-                individuals[target_id]["prefix"]
+                individuals[target_id].prefix
                 + ":"
-                + individuals[target_id]["uri"]
+                + individuals[target_id].uri
             )
             file.write(subject + " " + predicate + " " + object + " .\n")
 
         for attribute_id, attribute in attributes.items():
-            predicate = attribute["prefix"] + ":" + attribute["uri"]
-            target_id = attribute["target"]
-            if values[target_id]["type"] is not None:
+            predicate = attribute.prefix + ":" + attribute.uri
+            target_id = attribute.target
+            if values[target_id].type is not None:
                 object = (
                     '"'
-                    + values[target_id]["value"]
+                    + values[target_id].value
                     + '"'
                     + "^^"
-                    + values[target_id]["type"]
+                    + values[target_id].type
                 )
 
-            elif values[target_id]["lang"] is not None:
+            elif values[target_id].lang is not None:
                 object = (
                     '"'
-                    + values[target_id]["value"]
+                    + values[target_id].value
                     + '"'
                     + "@"
-                    + values[target_id]["lang"]
+                    + values[target_id].lang
                 )
             else:
-                object = '"' + values[target_id]["value"] + '"'
+                object = '"' + values[target_id].value + '"'
             file.write(subject + " " + predicate + " " + object + " .\n")
 
     return file
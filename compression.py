@@ -0,0 +1,65 @@
+import gzip
+import zlib
+
+# Brotli is optional, without it the responses are only compressed with gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Content encodings supported, in order of preference
+ENCODINGS = ["br", "gzip"] if brotli is not None else ["gzip"]
+
+# Responses smaller than this (in bytes) are not worth compressing
+MINIMUM_SIZE = 1024
+
+
+def compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data)
+    else:
+        return gzip.compress(data)
+
+
+def compress_stream(chunks, encoding):
+    """Compress an iterable of bytes as it is consumed, so a streamed
+    response is still streamed once compressed."""
+    if encoding == "br":
+        compressor = brotli.Compressor()
+        process, finish = compressor.process, compressor.finish
+    else:
+        # 31 selects a gzip header and trailer instead of a zlib one
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        process, finish = compressor.compress, compressor.flush
+
+    for chunk in chunks:
+        compressed = process(chunk)
+        if compressed:
+            yield compressed
+    yield finish()
+
+
+def compress_response(response, accept_encodings):
+    """Compress a flask response with the best encoding accepted by the
+    client (the Accept-Encoding header of the request), if any."""
+    response.vary.add("Accept-Encoding")
+
+    encoding = accept_encodings.best_match(ENCODINGS)
+    if (
+        encoding is None
+        or response.status_code != 200
+        or response.direct_passthrough
+        or "Content-Encoding" in response.headers
+    ):
+        return response
+
+    if response.is_streamed:
+        response.response = compress_stream(response.response, encoding)
+    else:
+        data = response.get_data()
+        if len(data) < MINIMUM_SIZE:
+            return response
+        response.set_data(compress(data, encoding))
+    response.headers["Content-Encoding"] = encoding
+
+    return response
@@ -5,6 +5,46 @@ class Config:
     SECRET_KEY = os.getenv("SECRET_KEY") or "hard to guess string"
     TEMPORAL_FOLDER = os.getenv("TEMPORAL_FOLDER") or "tmp"
     TEMPLATES_AUTORELOAD = True
+    # Conversions run in a pool of processes. When all the workers are busy
+    # and the queue is full, the API answers 503 with a Retry-After header
+    CONVERSION_WORKERS = int(
+        os.getenv("CONVERSION_WORKERS") or os.cpu_count() or 1
+    )
+    CONVERSION_QUEUE_SIZE = int(os.getenv("CONVERSION_QUEUE_SIZE") or 8)
+    RETRY_AFTER = int(os.getenv("RETRY_AFTER") or 5)
+    # Limits of the diagrams accepted. Larger uploads are rejected with 413
+    # before they are read, and the other limits are checked while the
+    # diagram is parsed: inflated bytes with 413, cells and depth with 422
+    MAX_CONTENT_LENGTH = int(os.getenv("MAX_UPLOAD_BYTES") or 16 * 1024**2)
+    MAX_INFLATED_BYTES = int(os.getenv("MAX_INFLATED_BYTES") or 64 * 1024**2)
+    MAX_CELLS = int(os.getenv("MAX_CELLS") or 50000)
+    MAX_DEPTH = int(os.getenv("MAX_DEPTH") or 32)
+    # Store of the conversions submitted to /api/jobs: memory, sqlite or
+    # directory (the last two are kept in the temporal folder)
+    JOB_STORE = os.getenv("JOB_STORE") or "memory"
+    JOB_EXPIRATION = int(os.getenv("JOB_EXPIRATION") or 3600)
+    # Convert a sample diagram and start the conversion workers before
+    # serving, so the first requests do not pay for the imports
+    WARM_UP = os.getenv("WARM_UP", "").lower() in ("1", "true")
+    # /readyz answers 503 when this many conversions are waiting for a worker
+    # (by default, when the queue is full), or when the server and its
+    # workers use more memory than this (in bytes). 0 means no limit in both,
+    # so there is no limit of conversions waiting when there is no queue
+    READY_MAX_QUEUE_DEPTH = int(
+        os.getenv("READY_MAX_QUEUE_DEPTH") or CONVERSION_QUEUE_SIZE
+    )
+    READY_MAX_MEMORY = int(os.getenv("READY_MAX_MEMORY") or 0)
+    # Seconds that the server waits for the conversions in flight after a
+    # SIGTERM, while it rejects new ones (0 disables the graceful drain)
+    DRAIN_TIMEOUT = int(os.getenv("DRAIN_TIMEOUT") or 0)
+    # Seconds between the checks for dead conversion workers, which are
+    # replaced even if no conversion is requested (0 disables the checks,
+    # and the workers are only replaced by the next conversion)
+    WORKER_CHECK_INTERVAL = int(os.getenv("WORKER_CHECK_INTERVAL") or 5)
+    # Folder where the memory of each stage of every conversion is saved, as
+    # a json file per conversion. Tracing the memory makes the conversions
+    # much slower, it is only meant for profiling (empty disables it)
+    MEMORY_PROFILE_FOLDER = os.getenv("MEMORY_PROFILE_FOLDER") or ""
 
 
 class DevelopmentConfig(Config):
@@ -13,6 +53,7 @@ class DevelopmentConfig(Config):
 
 class ProductionConfig(Config):
     DEBUG = False
+    WARM_UP = True
 
 
 config = {
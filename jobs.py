@@ -0,0 +1,221 @@
+import contextlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from chowlk.utils import DiagramTooComplex, DiagramTooLarge
+
+# States of a job. A job is pending from its submission until its conversion
+# finishes, successfully (done) or not (failed)
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+FIELDS = (
+    "id",
+    "status",
+    "submitted",
+    "finished",
+    "result",
+    "error",
+    "error_status",
+)
+
+
+class MemoryJobStore:
+    """Jobs kept in a dict. They are only visible to the process that
+    created them, so it is meant for a single server process."""
+
+    def __init__(self):
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def save(self, job):
+        with self.lock:
+            self.jobs[job["id"]] = dict(job)
+
+    def get(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def purge(self, before):
+        with self.lock:
+            for job_id, job in list(self.jobs.items()):
+                if job["submitted"] < before:
+                    del self.jobs[job_id]
+
+
+class SQLiteJobStore:
+    """Jobs kept in a SQLite database, shared by the server processes of the
+    same machine."""
+
+    def __init__(self, path):
+        self.path = path
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, "
+                "status TEXT, submitted REAL, finished REAL, result TEXT, "
+                "error TEXT, error_status INTEGER)"
+            )
+
+    @contextlib.contextmanager
+    def _connect(self):
+        # One connection per operation, as they are called from the request
+        # threads and from the callbacks of the pool. The transaction is
+        # committed (or rolled back) and the connection is closed after it
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def save(self, job):
+        row = dict(job, result=json.dumps(job["result"]))
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [row[field] for field in FIELDS],
+            )
+
+    def get(self, job_id):
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT * FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(FIELDS, row))
+        job["result"] = json.loads(job["result"])
+
+        return job
+
+    def purge(self, before):
+        with self._connect() as connection:
+            connection.execute(
+                "DELETE FROM jobs WHERE submitted < ?", (before,)
+            )
+
+
+class DirectoryJobStore:
+    """Jobs kept as json files in a directory, one per job."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, job_id):
+        return os.path.join(self.path, job_id + ".json")
+
+    def save(self, job):
+        # The job is written to a temporary file first, so a reader never
+        # finds a partially written job
+        file_path = self._file(job["id"])
+        temporal_path = file_path + "." + uuid.uuid4().hex
+        with open(temporal_path, "w", encoding="utf-8") as f:
+            json.dump(job, f)
+        os.replace(temporal_path, file_path)
+
+    def get(self, job_id):
+        try:
+            with open(self._file(job_id), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def purge(self, before):
+        for filename in os.listdir(self.path):
+            if not filename.endswith(".json"):
+                continue
+            file_path = os.path.join(self.path, filename)
+            try:
+                if os.path.getmtime(file_path) < before:
+                    os.remove(file_path)
+            except FileNotFoundError:
+                pass
+
+
+def create_job_store(kind, folder):
+    if kind == "memory":
+        return MemoryJobStore()
+    elif kind == "sqlite":
+        os.makedirs(folder, exist_ok=True)
+        return SQLiteJobStore(os.path.join(folder, "jobs.sqlite3"))
+    elif kind == "directory":
+        return DirectoryJobStore(os.path.join(folder, "jobs"))
+    else:
+        raise ValueError("Unknown job store: " + kind)
+
+
+class Jobs:
+    """
+    Conversions that run in the background. A job is submitted to the
+    conversion pool and the store keeps its state and, once the conversion
+    finishes, the same response that the synchronous API returns.
+    """
+
+    def __init__(self, pool, store, response, expiration):
+        self.pool = pool
+        self.store = store
+        # Function that builds the response from the conversion result
+        self.response = response
+        # Seconds that a job is kept after its submission
+        self.expiration = expiration
+
+    def submit(self, data):
+        """Submit the conversion of a diagram. It raises PoolFull when the
+        conversion pool cannot take more work."""
+        job = self._new_job()
+        submitted, future = self.pool.submit(data)
+        self.store.save(job)
+        future.add_done_callback(
+            lambda future: self._finish(job, submitted, future)
+        )
+
+        return job
+
+    def _new_job(self):
+        now = time.time()
+        self.store.purge(now - self.expiration)
+
+        return {
+            "id": uuid.uuid4().hex,
+            "status": PENDING,
+            "submitted": now,
+            "finished": None,
+            "result": None,
+            "error": None,
+            # HTTP status of the error, depending on why the job failed
+            "error_status": None,
+        }
+
+    def _finish(self, job, submitted, future):
+        try:
+            result, _ = self.pool.result(submitted, future)
+            job["result"] = self.response(*result)
+            job["status"] = DONE
+        except DiagramTooLarge as e:
+            job["error"] = str(e)
+            job["error_status"] = 413
+            job["status"] = FAILED
+        except DiagramTooComplex as e:
+            job["error"] = str(e)
+            job["error_status"] = 422
+            job["status"] = FAILED
+        except:
+            job["error"] = "Server error, review the input diagram"
+            job["error_status"] = 500
+            job["status"] = FAILED
+        job["finished"] = time.time()
+        self.store.save(job)
+
+    def get(self, job_id):
+        # Ids are hexadecimal strings, anything else could be used to reach
+        # files outside the directory store
+        if not job_id.isalnum():
+            return None
+        return self.store.get(job_id)
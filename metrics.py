@@ -0,0 +1,221 @@
+import threading
+
+# Upper bounds (in seconds) of the buckets of the time histograms
+TIME_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+    60,
+)
+
+
+def escape_label_value(value):
+    return (
+        str(value)
+        .replace("\\", r"\\")
+        .replace('"', r"\"")
+        .replace("\n", r"\n")
+    )
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return (
+        "{"
+        + ",".join(
+            f'{name}="{escape_label_value(value)}"' for name, value in labels
+        )
+        + "}"
+    )
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help, label=None):
+        self.name = name
+        self.help = help
+        self.type = "counter"
+        self.label = label
+        self.values = {}
+
+    def inc(self, amount=1, label_value=None):
+        self.values[label_value] = self.values.get(label_value, 0) + amount
+
+    def samples(self):
+        for label_value, value in sorted(self.values.items(), key=str):
+            labels = [(self.label, label_value)] if self.label else []
+            yield self.name, labels, value
+
+
+class Histogram:
+    def __init__(self, name, help, buckets=TIME_BUCKETS, label=None):
+        self.name = name
+        self.help = help
+        self.type = "histogram"
+        self.label = label
+        self.buckets = buckets
+        # Per label value: counts per bucket, sum and count
+        self.values = {}
+
+    def observe(self, value, label_value=None):
+        values = self.values.setdefault(
+            label_value, [[0] * len(self.buckets), 0.0, 0]
+        )
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                values[0][i] += 1
+        values[1] += value
+        values[2] += 1
+
+    def samples(self):
+        for label_value, (counts, total, count) in sorted(
+            self.values.items(), key=str
+        ):
+            labels = [(self.label, label_value)] if self.label else []
+            for bound, bucket_count in zip(self.buckets, counts):
+                bound_labels = labels + [("le", format_value(float(bound)))]
+                yield self.name + "_bucket", bound_labels, bucket_count
+            yield self.name + "_bucket", labels + [("le", "+Inf")], count
+            yield self.name + "_sum", labels, total
+            yield self.name + "_count", labels, count
+
+
+class Gauge:
+    """Metric whose value is read from a function when it is exposed."""
+
+    def __init__(self, name, help, function, type="gauge"):
+        self.name = name
+        self.help = help
+        self.type = type
+        self.function = function
+
+    def samples(self):
+        yield self.name, [], self.function()
+
+
+class ServiceMetrics:
+    """
+    Metrics of the conversions made by the service, exposed in the Prometheus
+    text format. The workers measure each conversion (see workers.convert)
+    and the pool adds the measures here once the conversion finishes.
+    """
+
+    def __init__(self, pool):
+        self.lock = threading.Lock()
+        self.stage_seconds = Histogram(
+            "chowlk_stage_seconds",
+            "Time spent in each stage of the conversions.",
+            label="stage",
+        )
+        self.conversion_seconds = Histogram(
+            "chowlk_conversion_seconds",
+            "Time spent converting each diagram in a worker.",
+        )
+        self.queue_wait_seconds = Histogram(
+            "chowlk_queue_wait_seconds",
+            "Time the conversions waited for a free worker.",
+        )
+        self.conversions = Counter(
+            "chowlk_conversions_total",
+            "Conversions finished, by result.",
+            label="result",
+        )
+        self.cells = Counter(
+            "chowlk_cells_total", "Cells of the diagrams converted."
+        )
+        self.edges = Counter(
+            "chowlk_edges_total", "Edges of the diagrams converted."
+        )
+        self.errors = Counter(
+            "chowlk_errors_total",
+            "Errors found in the diagrams converted, by category.",
+            label="category",
+        )
+        self.label_cache_hits = Counter(
+            "chowlk_label_cache_hits_total",
+            "Labels found in the cache of create_label.",
+        )
+        self.label_cache_misses = Counter(
+            "chowlk_label_cache_misses_total",
+            "Labels not found in the cache of create_label.",
+        )
+        self.metrics = [
+            self.stage_seconds,
+            self.conversion_seconds,
+            self.queue_wait_seconds,
+            self.conversions,
+            self.cells,
+            self.edges,
+            self.errors,
+            self.label_cache_hits,
+            self.label_cache_misses,
+            Gauge(
+                "chowlk_queue_depth",
+                "Conversions waiting for a free worker.",
+                pool.queue_depth,
+            ),
+            Gauge(
+                "chowlk_conversions_in_flight",
+                "Conversions running or waiting for a free worker.",
+                lambda: pool.in_flight,
+            ),
+            Gauge(
+                "chowlk_conversions_rejected_total",
+                "Conversions rejected because the queue was full.",
+                lambda: pool.rejected,
+                type="counter",
+            ),
+        ]
+
+    def observe_conversion(self, wait, report, errors):
+        with self.lock:
+            self.conversions.inc(label_value="done")
+            self.queue_wait_seconds.observe(wait)
+            self.conversion_seconds.observe(report["seconds"])
+            for stage, seconds in report["stages"].items():
+                self.stage_seconds.observe(seconds, stage)
+            self.cells.inc(report["cells"])
+            self.edges.inc(report["edges"])
+            self.label_cache_hits.inc(report["label_cache_hits"])
+            self.label_cache_misses.inc(report["label_cache_misses"])
+            for category, error in errors.items():
+                # Some categories keep a list of errors, others a single one
+                count = len(error) if isinstance(error, list) else 1
+                if count:
+                    self.errors.inc(count, category)
+
+    def observe_failure(self):
+        with self.lock:
+            self.conversions.inc(label_value="failed")
+
+    def render(self):
+        lines = []
+        with self.lock:
+            for metric in self.metrics:
+                lines.append("# HELP " + metric.name + " " + metric.help)
+                lines.append("# TYPE " + metric.name + " " + metric.type)
+                for name, labels, value in metric.samples():
+                    lines.append(
+                        name
+                        + format_labels(labels)
+                        + " "
+                        + format_value(value)
+                    )
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,145 @@
+import glob
+import gzip
+import io
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# The dead workers are only replaced by the conversions in these tests
+os.environ.setdefault("WORKER_CHECK_INTERVAL", "0")
+
+from app import app, jobs, pool, serializable, wait_for_requests  # noqa: E402
+from workers import SAMPLE_DIAGRAM  # noqa: E402
+
+
+def post_diagram(client, url, close=True, **data):
+    data["data"] = (io.BytesIO(SAMPLE_DIAGRAM), "diagram.xml")
+    response = client.post(url, data=data, content_type="multipart/form-data")
+    if close:
+        # As the server does once the response has been sent
+        response.get_data()
+        response.close()
+    return response
+
+
+def kill_workers():
+    executor = pool.executor
+    for process in multiprocessing.active_children():
+        os.kill(process.pid, signal.SIGKILL)
+    # The executor notices that its workers are dead in the background
+    deadline = time.time() + 10
+    while not executor._broken and time.time() < deadline:
+        time.sleep(0.05)
+
+
+def test_request_after_worker_killed():
+    client = app.test_client()
+    assert post_diagram(client, "/api").status_code == 200
+
+    kill_workers()
+    response = client.get("/readyz")
+    response.close()
+    assert response.status_code == 503
+    # The probe does not replace the workers
+    assert pool.broken()
+
+    response = post_diagram(client, "/api")
+    assert response.status_code == 200
+    assert "ns:Class1" in response.get_json()["ttl_data"]
+    response = client.get("/readyz")
+    response.close()
+    assert response.status_code == 200
+
+
+def test_ontology_not_saved_as_job():
+    client = app.test_client()
+    saved = []
+    save = jobs.store.save
+    jobs.store.save = saved.append
+    try:
+        response = post_diagram(client, "/api/ontology")
+    finally:
+        jobs.store.save = save
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/turtle"
+    assert "ns:Class1" in response.get_data(as_text=True)
+    assert "X-Error-Count" in response.headers
+    assert saved == []
+
+
+def test_ontology_streamed():
+    client = app.test_client()
+    response = client.post(
+        "/api/ontology",
+        data={"data": (io.BytesIO(SAMPLE_DIAGRAM), "diagram.xml")},
+        content_type="multipart/form-data",
+        headers={"Accept-Encoding": "gzip"},
+    )
+
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.headers["Content-Encoding"] == "gzip"
+    ontology = gzip.decompress(response.get_data()).decode("utf-8")
+    assert "ns:Class1" in ontology
+
+    # The temporal file of the ontology is removed with the response
+    files = os.path.join(tempfile.gettempdir(), "chowlk-*.turtle")
+    assert glob.glob(files)
+    response.close()
+    assert not glob.glob(files)
+
+
+def test_json_ld_only_when_available():
+    client = app.test_client()
+    response = post_diagram(client, "/api/ontology", format="json-ld")
+
+    # rdflib 5 has no json-ld serializer unless rdflib-jsonld is installed,
+    # and then the turtle of the diagram must not be returned as json-ld
+    if serializable("json-ld"):
+        assert response.status_code == 200
+        assert response.mimetype == "application/ld+json"
+        json.loads(response.get_data(as_text=True))
+    else:
+        assert response.status_code == 406
+        assert "json-ld" in response.get_json()["error"]
+
+
+def test_drain_waits_for_responses():
+    client = app.test_client()
+    response = post_diagram(client, "/api", close=False)
+    assert response.status_code == 200
+
+    # The conversion has finished, but its response has not been sent yet
+    assert pool.in_flight == 0
+    assert not wait_for_requests(0.1)
+    response.close()
+    assert wait_for_requests(0.1)
+
+
+def test_ready_without_queue_limit():
+    client = app.test_client()
+    max_queue_depth = app.config["READY_MAX_QUEUE_DEPTH"]
+    app.config["READY_MAX_QUEUE_DEPTH"] = 0
+    try:
+        response = client.get("/readyz")
+        response.close()
+    finally:
+        app.config["READY_MAX_QUEUE_DEPTH"] = max_queue_depth
+
+    assert response.status_code == 200
+
+
+if __name__ == "__main__":
+    test_request_after_worker_killed()
+    test_ontology_not_saved_as_job()
+    test_ontology_streamed()
+    test_json_ld_only_when_available()
+    test_drain_waits_for_responses()
+    test_ready_without_queue_limit()
+    print("App tests passed")
@@ -0,0 +1,231 @@
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import sys
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chowlk.converter import print_errors  # noqa: E402
+from chowlk.transformations import transform_ontology  # noqa: E402
+from chowlk.utils import read_drawio_xml  # noqa: E402
+
+TESTS_PATH = os.path.dirname(os.path.abspath(__file__))
+INPUTS_PATH = os.path.join(TESTS_PATH, "inputs")
+DESIRED_OUTPUTS_PATH = os.path.join(TESTS_PATH, "desired_outputs")
+OUTPUTS_PATH = os.path.join(TESTS_PATH, "outputs")
+
+# Canonical hashes of the desired ontologies for each version of rdflib
+# (which computes them), so they are parsed only when they change. They are
+# only written with UPDATE_GOLDEN=1 (or --update-hashes)
+HASHES_PATH = os.path.join(TESTS_PATH, "golden_hashes.json")
+UPDATE_GOLDEN = os.getenv("UPDATE_GOLDEN", "").lower() in ("1", "true")
+
+
+def read_text(path):
+    # Some desired outputs were written on Windows with its default encoding
+    with open(path, "rb") as f:
+        data = f.read()
+    try:
+        text = data.decode("utf-8")
+    except UnicodeDecodeError:
+        text = data.decode("cp1252")
+
+    return text.replace("\r\n", "\n")
+
+
+def canonical_hash(ontology):
+    """
+    Hash of the ontology that does not depend on the order of the triples,
+    the prefixes or the blank node ids. Ontologies that rdflib cannot parse
+    (Chowlk returns the turtle as is when it has syntax errors) are hashed
+    by their text, without the trailing whitespace of the lines.
+    """
+    import rdflib
+    from rdflib.compare import to_isomorphic
+
+    try:
+        graph = rdflib.Graph().parse(data=ontology, format="turtle")
+    except Exception:
+        lines = [line.rstrip() for line in ontology.strip().splitlines()]
+        text = "\n".join(lines).encode("utf-8")
+        return "text:" + hashlib.sha256(text).hexdigest()
+
+    return "graph:" + str(to_isomorphic(graph).graph_digest())
+
+
+def file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def read_hashes_file():
+    try:
+        with open(HASHES_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def load_hashes():
+    """Hashes of the desired ontologies for the installed rdflib, or None
+    when there are none for its version."""
+    import rdflib
+
+    return read_hashes_file().get(rdflib.__version__)
+
+
+def save_hashes(hashes):
+    import rdflib
+
+    versions = read_hashes_file()
+    versions[rdflib.__version__] = hashes
+    with open(HASHES_PATH, "w") as f:
+        json.dump(versions, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def check(filename, desired_hash, write_outputs=False):
+    """Convert an input and compare the ontology and the errors printed with
+    the desired ones. The desired ontology is only hashed if desired_hash is
+    None, because it is not cached."""
+    name = filename[:-4]
+    root = read_drawio_xml(os.path.join(INPUTS_PATH, filename))
+    ontology, _, errors = transform_ontology(root, formats=("turtle",))
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        print_errors(errors)
+    log = log.getvalue()
+
+    if write_outputs:
+        with open(os.path.join(OUTPUTS_PATH, name + ".ttl"), "w") as f:
+            f.write(ontology)
+        with open(os.path.join(OUTPUTS_PATH, name + "_log.txt"), "w") as f:
+            f.write(log)
+
+    desired_ontology_path = os.path.join(DESIRED_OUTPUTS_PATH, name + ".ttl")
+    if desired_hash is None:
+        desired_hash = canonical_hash(read_text(desired_ontology_path))
+    desired_log = read_text(
+        os.path.join(DESIRED_OUTPUTS_PATH, name + "_log.txt")
+    )
+
+    return {
+        "filename": filename,
+        "desired_hash": desired_hash,
+        "ontology": canonical_hash(ontology) == desired_hash,
+        "log": log == desired_log,
+    }
+
+
+def run(jobs=None, write_outputs=False, update_hashes=False):
+    """Check every input in a pool of processes. Returns the results, and
+    with update_hashes it also updates the cache of hashes of the desired
+    ontologies if needed. The desired ontologies that are not in the cache
+    are hashed in every run."""
+    hashes = load_hashes() or {}
+    filenames = sorted(os.listdir(INPUTS_PATH))
+
+    desired_hashes = []
+    digests = {}
+    for filename in filenames:
+        golden = filename[:-4] + ".ttl"
+        digests[golden] = file_digest(
+            os.path.join(DESIRED_OUTPUTS_PATH, golden)
+        )
+        cached = hashes.get(golden)
+        if cached is not None and cached["digest"] == digests[golden]:
+            desired_hashes.append(cached["hash"])
+        else:
+            desired_hashes.append(None)
+
+    jobs = jobs or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        results = list(
+            executor.map(
+                check,
+                filenames,
+                desired_hashes,
+                [write_outputs] * len(filenames),
+                chunksize=max(1, len(filenames) // (jobs * 4)),
+            )
+        )
+
+    new_hashes = {}
+    for result in results:
+        golden = result["filename"][:-4] + ".ttl"
+        new_hashes[golden] = {
+            "digest": digests[golden],
+            "hash": result["desired_hash"],
+        }
+    if update_hashes and new_hashes != hashes:
+        save_hashes(new_hashes)
+
+    return results
+
+
+def test_golden_outputs():
+    if load_hashes() is None and not UPDATE_GOLDEN:
+        import rdflib
+
+        raise unittest.SkipTest(
+            "There are no golden hashes for rdflib {}, run the tests with "
+            "UPDATE_GOLDEN=1 to compute them".format(rdflib.__version__)
+        )
+
+    results = run(update_hashes=UPDATE_GOLDEN)
+    failed = [
+        result["filename"]
+        for result in results
+        if not (result["ontology"] and result["log"])
+    ]
+    assert not failed, "Different outputs: " + ", ".join(failed)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert the test inputs in parallel and compare them "
+        "with the desired outputs."
+    )
+    parser.add_argument(
+        "--jobs", type=int, help="number of processes (all the cpus)"
+    )
+    parser.add_argument(
+        "--write-outputs",
+        action="store_true",
+        help="also write the ontologies and logs in unit-tests/outputs",
+    )
+    parser.add_argument(
+        "--update-hashes",
+        action="store_true",
+        default=UPDATE_GOLDEN,
+        help="save the hashes of the desired ontologies that have changed "
+        "(also with UPDATE_GOLDEN=1)",
+    )
+    args = parser.parse_args()
+
+    results = run(args.jobs, args.write_outputs, args.update_hashes)
+    failed = 0
+    for result in results:
+        if result["ontology"] and result["log"]:
+            continue
+        failed += 1
+        different = [kind for kind in ("ontology", "log") if not result[kind]]
+        print(
+            "Test {} failed. Different {}".format(
+                result["filename"], " and ".join(different)
+            )
+        )
+
+    if failed:
+        print(f"\n{failed} of {len(results)} tests failed")
+        sys.exit(1)
+    print(f"All {len(results)} tests passed")
+
+
+if __name__ == "__main__":
+    main()
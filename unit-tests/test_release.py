@@ -0,0 +1,41 @@
+import contextlib
+import gc
+import os
+import sys
+import weakref
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chowlk import stages  # noqa: E402
+from chowlk.transformations import transform_ontology  # noqa: E402
+from chowlk.utils import read_drawio_xml  # noqa: E402
+
+TESTS_PATH = os.path.dirname(os.path.abspath(__file__))
+DIAGRAM_PATH = os.path.join(TESTS_PATH, "inputs", "test_relations_1.xml")
+
+
+def test_tree_released_before_associations():
+    # The tree passed inside a list must be freed once the elements are
+    # classified, whatever the version of Python (before 3.11 the caller of
+    # a function keeps its arguments alive until it returns)
+    roots = [read_drawio_xml(DIAGRAM_PATH)]
+    cell = weakref.ref(roots[0][0])
+    alive = []
+
+    @contextlib.contextmanager
+    def check(name):
+        if name == "enrich_properties":
+            gc.collect()
+            alive.append(cell() is not None)
+        yield
+
+    with stages.recording(check):
+        transform_ontology(roots, formats=("turtle",))
+
+    assert roots == []
+    assert alive == [False]
+
+
+if __name__ == "__main__":
+    test_tree_released_before_associations()
+    print("Release test passed")
@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+
+# Maximum time in milliseconds to import the converter. It can be raised in
+# slow machines with the CHOWLK_STARTUP_BUDGET environment variable
+STARTUP_BUDGET = float(os.getenv("CHOWLK_STARTUP_BUDGET") or 200)
+
+REPOSITORY_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(module):
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + module],
+        cwd=REPOSITORY_PATH,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative) / 1000
+
+    return times
+
+
+def test_startup():
+    runs = [import_times("chowlk.converter") for _ in range(3)]
+    times = min(runs, key=lambda times: times["chowlk.converter"])
+
+    # rdflib and bs4 have to be imported only when a diagram is converted
+    assert "rdflib" not in times
+    assert "bs4" not in times
+    assert times["chowlk.converter"] < STARTUP_BUDGET, (
+        "Importing chowlk.converter took {:.1f} ms, the budget is {:.1f} ms"
+    ).format(times["chowlk.converter"], STARTUP_BUDGET)
+
+
+if __name__ == "__main__":
+    test_startup()
+    print("Startup test passed")
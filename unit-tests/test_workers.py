@@ -0,0 +1,74 @@
+import multiprocessing
+import os
+import signal
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from workers import SAMPLE_DIAGRAM, ConversionPool  # noqa: E402
+
+
+def kill_workers(pool):
+    executor = pool.executor
+    for process in multiprocessing.active_children():
+        os.kill(process.pid, signal.SIGKILL)
+    # The executor notices that its workers are dead in the background
+    deadline = time.time() + 10
+    while not executor._broken and time.time() < deadline:
+        time.sleep(0.05)
+
+
+def test_conversion_after_worker_killed():
+    pool = ConversionPool(1, 2)
+    try:
+        pool.start()
+        kill_workers(pool)
+        assert pool.broken()
+
+        (ontology, _, _), _ = pool.run(SAMPLE_DIAGRAM)
+        assert "ns:Class1" in ontology
+        assert not pool.broken()
+        assert pool.stats()["in_flight"] == 0
+    finally:
+        pool.executor.shutdown()
+
+
+def test_conversion_retried_when_worker_killed():
+    # The conversions that fail because another one killed the workers
+    # are submitted again to the new workers
+    pool = ConversionPool(1, 2)
+    try:
+        pool.start()
+        submitted, future = pool.submit(SAMPLE_DIAGRAM)
+        kill_workers(pool)
+
+        (ontology, _, _), _ = pool.result(submitted, future)
+        assert "ns:Class1" in ontology
+        assert not pool.broken()
+    finally:
+        pool.executor.shutdown()
+
+
+def test_workers_replaced_without_conversions():
+    pool = ConversionPool(1, 2)
+    try:
+        pool.start()
+        pool.supervise(0.1)
+        executor = pool.executor
+        kill_workers(pool)
+
+        deadline = time.time() + 10
+        while pool.executor is executor and time.time() < deadline:
+            time.sleep(0.05)
+        assert pool.executor is not executor
+        assert not pool.broken()
+    finally:
+        pool.executor.shutdown()
+
+
+if __name__ == "__main__":
+    test_conversion_after_worker_killed()
+    test_conversion_retried_when_worker_killed()
+    test_workers_replaced_without_conversions()
+    print("Workers tests passed")
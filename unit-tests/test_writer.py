@@ -0,0 +1,56 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chowlk.elements import Relation  # noqa: E402
+from chowlk.utils import Symbols  # noqa: E402
+from chowlk.writer import merge_order  # noqa: E402
+
+
+def object_property(uri):
+    return Relation(prefix="ns", uri=uri, type="owl:ObjectProperty")
+
+
+def is_object_property(relation):
+    return relation.get("type") == "owl:ObjectProperty"
+
+
+def test_merge_order_with_unindexed_duplicate():
+    # Only the second arrow of ns:property is in the symbols. Each one is
+    # written, whichever comes first
+    relations = {
+        "1": object_property("property"),
+        "2": object_property("property"),
+    }
+    for indexed in ("1", "2"):
+        symbols = Symbols()
+        symbols.add("relations", "ns:property", indexed)
+        order = merge_order(
+            relations, "relations", symbols, is_object_property
+        )
+        assert sorted(order) == [("1", True, True), ("2", True, True)]
+
+
+def test_merge_order_merges_indexed_duplicates():
+    relations = {
+        "1": object_property("property"),
+        "2": object_property("other"),
+        "3": object_property("property"),
+    }
+    symbols = Symbols()
+    for id, relation in relations.items():
+        symbols.add("relations", "ns:" + relation.uri, id)
+
+    order = merge_order(relations, "relations", symbols, is_object_property)
+    assert order == [
+        ("1", True, False),
+        ("3", False, True),
+        ("2", True, True),
+    ]
+
+
+if __name__ == "__main__":
+    test_merge_order_with_unindexed_duplicate()
+    test_merge_order_merges_indexed_duplicates()
+    print("Writer tests passed")
@@ -0,0 +1,361 @@
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import threading
+import time
+import tracemalloc
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from chowlk import stages
+from chowlk.transformations import transform_ontology
+from chowlk.utils import create_label, read_drawio_xml
+from metrics import ServiceMetrics
+
+# Small diagram converted by warm_up. It has the main kinds of elements, so
+# the parsing and serialization plugins of rdflib are loaded when converting it
+SAMPLE_DIAGRAM = b"""\
+<mxfile><diagram name="sample"><mxGraphModel><root>
+<mxCell id="0"/><mxCell id="1" parent="0"/>
+<mxCell id="2" value="&lt;b&gt;base:&lt;/b&gt; http://example.org/sample#&lt;br&gt;&lt;b&gt;ns:&lt;/b&gt; http://example.org/sample#" style="shape=note;whiteSpace=wrap;html=1;" parent="1" vertex="1"><mxGeometry x="0" y="0" width="290" height="60" as="geometry"/></mxCell>
+<mxCell id="3" value="ns:Class1" style="rounded=0;whiteSpace=wrap;html=1;" parent="1" vertex="1"><mxGeometry x="0" y="100" width="200" height="30" as="geometry"/></mxCell>
+<mxCell id="4" value="ns:datatypeProperty (1): xsd:string" style="rounded=0;whiteSpace=wrap;html=1;dashed=1;" parent="1" vertex="1"><mxGeometry x="0" y="130" width="200" height="30" as="geometry"/></mxCell>
+<mxCell id="5" value="ns:Class2" style="rounded=0;whiteSpace=wrap;html=1;" parent="1" vertex="1"><mxGeometry x="400" y="100" width="200" height="30" as="geometry"/></mxCell>
+<mxCell id="6" value="(some) ns:objectProperty (1..3)" style="endArrow=classic;html=1;" parent="1" source="3" target="5" edge="1"><mxGeometry relative="1" as="geometry"/></mxCell>
+<mxCell id="7" value="" style="endArrow=block;endFill=0;html=1;" parent="1" source="5" target="8" edge="1"><mxGeometry relative="1" as="geometry"/></mxCell>
+<mxCell id="8" value="ns:Class3" style="rounded=0;whiteSpace=wrap;html=1;" parent="1" vertex="1"><mxGeometry x="400" y="200" width="200" height="30" as="geometry"/></mxCell>
+</root></mxGraphModel></diagram></mxfile>
+"""
+
+
+class PoolFull(Exception):
+    """Raised when a conversion is submitted while the queue is full."""
+
+
+class PoolDraining(PoolFull):
+    """Raised when a conversion is submitted while the pool is draining."""
+
+
+def convert(
+    data,
+    format="turtle",
+    limits=None,
+    memory_profile_folder=None,
+    destination=None,
+):
+    """Convert the bytes of a diagram, serializing the ontology only in the
+    given rdflib format. It runs in a worker process, and it returns the time
+    the conversion started, so the wait can be measured, and a report of the
+    conversion for the metrics of the service. With a memory_profile_folder,
+    the memory of each stage is traced and saved there (see
+    stages.MemoryProfile). With a destination, the ontology is written to
+    that path, and the path is returned instead of the ontology."""
+    started = time.time()
+    cache_before = create_label.cache_info()
+
+    with contextlib.ExitStack() as stack:
+        stage_times = stack.enter_context(
+            stages.recording(stages.StageTimes())
+        )
+        if memory_profile_folder:
+            memory_profile = stack.enter_context(
+                stages.recording(stages.MemoryProfile())
+            )
+            tracemalloc.start(stages.MEMORY_FRAMES)
+            stack.callback(tracemalloc.stop)
+        # The tree is only kept in the list until transform_ontology takes
+        # it, so it can be released once the elements are classified
+        roots = [read_drawio_xml(io.BytesIO(data), limits)]
+        cells = len(roots[0])
+        edges = sum(1 for cell in roots[0] if "edge" in cell.attrib)
+        ontology_string, new_namespaces, errors = transform_ontology(
+            roots,
+            formats=(format,),
+            destinations=None if destination is None else (destination,),
+        )
+
+    seconds = time.time() - started
+    if memory_profile_folder:
+        save_memory_profile(
+            memory_profile_folder, memory_profile, started, seconds, cells
+        )
+
+    cache_after = create_label.cache_info()
+    report = {
+        "seconds": seconds,
+        "stages": stage_times.times,
+        "cells": cells,
+        "edges": edges,
+        "label_cache_hits": cache_after.hits - cache_before.hits,
+        "label_cache_misses": cache_after.misses - cache_before.misses,
+    }
+
+    return started, report, (ontology_string, new_namespaces, errors)
+
+
+def save_memory_profile(folder, memory_profile, started, seconds, cells):
+    # One file per conversion, named so they sort by time
+    report = memory_profile.as_dict()
+    report.update(started=started, seconds=seconds, cells=cells)
+    path = os.path.join(folder, f"{started:.6f}-{os.getpid()}.json")
+    with open(path, "w") as f:
+        json.dump(report, f)
+
+
+def warm_up(formats=("turtle",)):
+    """Convert the sample diagram to the given formats, so the modules and
+    caches used by the conversions are already loaded in this process."""
+    transform_ontology(
+        [read_drawio_xml(io.BytesIO(SAMPLE_DIAGRAM))], formats=formats
+    )
+
+
+class ConversionPool:
+    """
+    Process pool that runs the conversions requested to the API, so they do
+    not compete for the GIL of the web server.
+
+    At most `workers` conversions run at the same time and at most
+    `queue_size` more wait for a free worker. Any other conversion is
+    rejected with PoolFull, so the caller can ask the client to retry later
+    instead of slowing down every request in flight.
+
+    When a worker dies (for example, killed for using too much memory), the
+    executor fails every conversion it has and rejects the new ones. It is
+    then replaced by a new one, and the conversions that failed because of
+    it are submitted again, up to `retries` times, so only the conversion
+    that keeps killing its worker fails.
+    """
+
+    # Times a conversion is submitted again when its executor breaks
+    retries = 1
+
+    def __init__(
+        self, workers, queue_size, limits=None, memory_profile_folder=None
+    ):
+        self.workers = workers
+        self.queue_size = queue_size
+        # Limits of the diagrams converted (see utils.DiagramLimits)
+        self.limits = limits
+        # Folder where a memory profile of each conversion is saved, if any
+        self.memory_profile_folder = memory_profile_folder
+        if memory_profile_folder:
+            os.makedirs(memory_profile_folder, exist_ok=True)
+        self.executor = self._new_executor()
+        self.lock = threading.Lock()
+        # Notified every time a conversion finishes, for drain
+        self.finished = threading.Condition(self.lock)
+        self.draining = False
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_last = 0.0
+        self.metrics = ServiceMetrics(self)
+
+    def _new_executor(self):
+        # The workers are forked where possible, so they start with the
+        # modules already imported by the server (see start)
+        if "fork" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("fork")
+        else:
+            context = None
+        return ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=context
+        )
+
+    def _start_workers(self, executor):
+        # The executor starts its workers for the first tasks it receives
+        return [executor.submit(time.time) for _ in range(self.workers)]
+
+    def start(self, formats=("turtle",)):
+        """Warm up this process and start the workers. As they are forked
+        from it, they do not have to import and warm up anything before their
+        first conversion."""
+        warm_up(formats)
+        for future in self._start_workers(self.executor):
+            future.result()
+
+    def broken(self):
+        """Whether a worker has died and the executor does not accept more
+        conversions until it is replaced (see replace)."""
+        return bool(getattr(self.executor, "_broken", False))
+
+    def replace(self, executor=None):
+        """Replace the executor by a new one, with new workers, if it is
+        still the given one (by default, if it is broken). It is called by
+        every conversion that finds the executor broken, so only the first
+        one replaces it, and by supervise."""
+        with self.lock:
+            if executor is None:
+                if not self.broken():
+                    return
+            elif self.executor is not executor:
+                return
+            self.executor.shutdown(wait=False)
+            self.executor = self._new_executor()
+            self._start_workers(self.executor)
+
+    def supervise(self, interval):
+        """Check every interval (in seconds) whether a worker has died, and
+        replace the executor if so, in a daemon thread. Without it, a worker
+        that dies while there are no conversions is only replaced by the
+        next one."""
+
+        def check():
+            while True:
+                time.sleep(interval)
+                self.replace()
+
+        thread = threading.Thread(target=check, daemon=True)
+        thread.start()
+        return thread
+
+    def submit(self, data, format="turtle", destination=None):
+        with self.lock:
+            if self.draining:
+                self.rejected += 1
+                raise PoolDraining()
+            if self.in_flight >= self.workers + self.queue_size:
+                self.rejected += 1
+                raise PoolFull()
+            self.in_flight += 1
+
+        submitted = time.time()
+        # The future of the conversion is not the one of the executor, so
+        # the conversion can be submitted again to a new executor
+        future = Future()
+        arguments = (
+            data,
+            format,
+            self.limits,
+            self.memory_profile_folder,
+            destination,
+        )
+        try:
+            self._submit(future, arguments, self.retries)
+        except:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+
+        return submitted, future
+
+    def _submit(self, future, arguments, retries):
+        executor = self.executor
+        try:
+            executor_future = executor.submit(convert, *arguments)
+        except BrokenProcessPool:
+            self.replace(executor)
+            if not retries:
+                raise
+            self._submit(future, arguments, retries - 1)
+            return
+
+        executor_future.add_done_callback(
+            lambda executor_future: self._finish(
+                future, arguments, retries, executor, executor_future
+            )
+        )
+
+    def _finish(self, future, arguments, retries, executor, executor_future):
+        error = executor_future.exception()
+        if isinstance(error, BrokenProcessPool):
+            self.replace(executor)
+            if retries:
+                try:
+                    self._submit(future, arguments, retries - 1)
+                    return
+                except Exception as e:
+                    error = e
+
+        if error is None:
+            future.set_result(executor_future.result())
+        else:
+            future.set_exception(error)
+
+    def run(self, data, format="turtle", destination=None):
+        """Convert a diagram, waiting for a free worker if needed. Returns the
+        result of transform_ontology and the seconds the conversion waited in
+        the queue. With a destination, the ontology is written to that path
+        instead of being returned."""
+        submitted, future = self.submit(data, format, destination)
+        return self.result(submitted, future)
+
+    def result(self, submitted, future):
+        """Wait for a conversion returned by submit and record how long it
+        waited in the queue and the rest of its metrics."""
+        try:
+            started, report, result = future.result()
+        except:
+            self.metrics.observe_failure()
+            raise
+        wait = max(0.0, started - submitted)
+        self.metrics.observe_conversion(wait, report, result[2])
+
+        with self.lock:
+            self.completed += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            self.wait_last = wait
+
+        return result, wait
+
+    def _release(self):
+        with self.lock:
+            self.in_flight -= 1
+            self.finished.notify_all()
+
+    def drain(self, timeout=None):
+        """Stop accepting conversions and wait until the ones in flight have
+        finished, or until the timeout (in seconds) expires. Returns whether
+        all of them finished."""
+        with self.lock:
+            self.draining = True
+            return self.finished.wait_for(lambda: self.in_flight == 0, timeout)
+
+    def queue_depth(self):
+        return max(0, self.in_flight - self.workers)
+
+    def memory(self):
+        """Resident memory in bytes of this process and the workers, or None
+        when it cannot be read (it needs /proc)."""
+        pids = [os.getpid()] + [
+            process.pid for process in multiprocessing.active_children()
+        ]
+        memory = 0
+        for pid in pids:
+            try:
+                with open(f"/proc/{pid}/statm") as f:
+                    memory += int(f.read().split()[1]) * os.sysconf(
+                        "SC_PAGE_SIZE"
+                    )
+            except FileNotFoundError:
+                # The process has just finished
+                if pid == os.getpid():
+                    return None
+            except (OSError, ValueError, IndexError):
+                return None
+
+        return memory
+
+    def stats(self):
+        with self.lock:
+            return {
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "in_flight": self.in_flight,
+                "queue_depth": max(0, self.in_flight - self.workers),
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "draining": self.draining,
+                "broken": self.broken(),
+                "wait_seconds_last": self.wait_last,
+                "wait_seconds_max": self.wait_max,
+                "wait_seconds_mean": (
+                    self.wait_total / self.completed if self.completed else 0.0
+                ),
+            }